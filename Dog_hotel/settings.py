@@ -51,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # najbardziej zewnętrzny, żeby mierzyć też zapytania sesji i uwierzytelniania
+    'hotel.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     "django.middleware.locale.LocaleMiddleware",
@@ -75,6 +77,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'django.template.context_processors.i18n',
+                'hotel.pagecache.template_cache',
             ],
         },
     },
@@ -96,6 +100,62 @@ DATABASES = {
     }
 }
 
+# Pula połączeń psycopg 3 w każdym procesie (workery gunicorna, outbox, komendy).
+# Połączenie jest sprawdzane przy pobraniu z puli (CONN_HEALTH_CHECKS).
+# DB_POOL=false -> zwykłe trwałe połączenia Django (CONN_MAX_AGE).
+DB_POOL = env.bool('DB_POOL', default=True)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DB_POOL:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=1),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=4),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+            'max_idle': env.float('DB_POOL_MAX_IDLE', default=300.0),
+            'max_lifetime': env.float('DB_POOL_MAX_LIFETIME', default=1800.0),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+
+# Cache współdzielony przez wszystkie workery gunicorna, np. rediscache://redis:6379/1.
+# locmemcache:// wystarcza lokalnie, ale nie unieważnia wpisów między procesami.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+AVAILABILITY_CACHE_TIMEOUT = env.int('AVAILABILITY_CACHE_TIMEOUT', default=60 * 60)
+
+# Przechowywanie zajętości: "slots" (wiersz na noc, hotel/allocation.py) albo "range" (sama rezerwacja jako zakres).
+# Przełączanie z istniejącymi danymi: manage.py convert_capacity --to range|slots
+HOTEL_CAPACITY_BACKEND = env('HOTEL_CAPACITY_BACKEND', default='slots')
+
+# cache stron publicznych dla anonimowych (hotel/pagecache.py) i fragmentów {% cache %} w szablonach; 0 wyłącza
+TEMPLATE_CACHE_TIMEOUT = env.int('TEMPLATE_CACHE_TIMEOUT', default=10 * 60)
+
+# ile dni przeszłych RoomDaySlot zostaje w tabeli; starsze przenosi manage.py archive_slots
+SLOT_RETENTION_DAYS = env.int('SLOT_RETENTION_DAYS', default=90)
+
+# kalendarz cen (hotel/pricing.py): sumy prefiksowe liczone na tyle dni naprzód od dziś
+PRICE_HORIZON_DAYS = env.int('PRICE_HORIZON_DAYS', default=2 * 365)
+
+# licznik zapytań per żądanie (hotel/middleware.py): nagłówek Server-Timing + log wolnych żądań
+PERF_INSTRUMENTATION = env.bool('PERF_INSTRUMENTATION', default=True)
+PERF_SERVER_TIMING = env.bool('PERF_SERVER_TIMING', default=DEBUG)
+PERF_SLOW_REQUEST_MS = env.int('PERF_SLOW_REQUEST_MS', default=500)
+PERF_REPEATED_QUERY_THRESHOLD = env.int('PERF_REPEATED_QUERY_THRESHOLD', default=5)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'hotel.perf': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -133,6 +193,17 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# nazwy statyk z hashem treści + manifest oraz gotowe warianty .gz/.br dla nginx (hotel/storage.py);
+# wymaga wcześniejszego collectstatic, dlatego włączane w obrazie Dockera
+STATIC_HASHED_FILES = env.bool('STATIC_HASHED_FILES', default=False)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "hotel.storage.PrecompressedManifestStaticFilesStorage" if STATIC_HASHED_FILES
+        else "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -140,6 +211,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = '/'
 WEATHER_API_KEY = config('WEATHER_API_KEY')
+WEATHER_API_URL = config('WEATHER_API_URL', default='https://api.weatherapi.com/v1/current.json')
+WEATHER_LOCATION = config('WEATHER_LOCATION', default='Warszawa')
+WEATHER_TIMEOUT = config('WEATHER_TIMEOUT', default=5, cast=int)
+# po WEATHER_TTL sekundach wpis jest odświeżany w tle, po WEATHER_MAX_STALE znika z cache
+WEATHER_TTL = config('WEATHER_TTL', default=10 * 60, cast=int)
+WEATHER_MAX_STALE = config('WEATHER_MAX_STALE', default=6 * 60 * 60, cast=int)
+# False, gdy pogodę odświeża osobny proces: manage.py refresh_weather --loop 600
+WEATHER_BACKGROUND_REFRESH = config('WEATHER_BACKGROUND_REFRESH', default=True, cast=bool)
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -178,7 +257,11 @@ else:
     EMAIL_USE_TLS = True
     EMAIL_USE_SSL = False
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# backend SMTP z pulą otwartych połączeń (hotel/mail_backends.py)
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="hotel.mail_backends.PooledSMTPBackend")
+EMAIL_POOL_SIZE = config("EMAIL_POOL_SIZE", default=2, cast=int)
+EMAIL_POOL_MAX_IDLE = config("EMAIL_POOL_MAX_IDLE", default=60, cast=int)
+EMAIL_POOL_CHECK_AFTER = config("EMAIL_POOL_CHECK_AFTER", default=5, cast=int)
 EMAIL_HOST_USER = config("OVH_EMAIL_USER")
 EMAIL_HOST_PASSWORD = config("OVH_EMAIL_PASSWORD")
 
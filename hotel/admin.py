@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import  Room, Reservation, Service
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from .admin_utils import DateRangeFilter, EstimatedCountPaginator, trigram_search
+from .models import  Room, Reservation, Service, OutboxMessage, PriceOverride, Profile, WaitlistEntry
+
+User = get_user_model()
 
 
 
@@ -24,16 +30,20 @@ class ReservationAdmin(admin.ModelAdmin):
         "end_date",
         "created_at",
     )
-    list_filter = ("room__room_type", "room", "start_date", "end_date", "created_at")
-    search_fields = ("dog_name", "user__email", "user__username", "user__first_name", "user__last_name", "user__profile__phone_number")
+    list_filter = ("room__room_type", "room", ("start_date", DateRangeFilter), ("end_date", DateRangeFilter))
+    search_fields = ("dog_name", "user__email", "user__last_name", "user__profile__phone_number")
+    search_help_text = "Początek imienia psa, e-maila, nazwiska lub numeru telefonu."
     ordering = ("-start_date", "-created_at")
-    date_hierarchy = "start_date"
+    # bez date_hierarchy (agregacja dat po całej tabeli) i bez dokładnego COUNT(*) całości
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     list_select_related = ("user", "user__profile", "room")
-    readonly_fields = ("user", "created_at")
+    readonly_fields = ("user", "created_at", "total_price")
 
     fieldsets = (
         ("Właściciel", {"fields": ("user",)}),
-        ("Szczegóły pobytu", {"fields": ("dog_name", "room", ("start_date", "end_date"), "notes")}),
+        ("Szczegóły pobytu", {"fields": ("dog_name", "room", ("start_date", "end_date"), "services", "notes")}),
+        ("Cena", {"fields": ("total_price",)}),
         ("Meta", {"fields": ("created_at",)}),
     )
 
@@ -53,9 +63,56 @@ class ReservationAdmin(admin.ModelAdmin):
 
         return getattr(getattr(obj.user, "profile", None), "phone_number", "")
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Indexed search: each term matches a dog name or the owner's e-mail,
+        surname or phone (prefix; substring when trigram indexes exist).
+
+        Owners are matched in subqueries on their own indexes, so the
+        reservation query is one OR over two indexes instead of joins, and a
+        broad term never truncates the owner list.
+        """
+        lookup = "icontains" if trigram_search() else "istartswith"
+        for term in search_term.split():
+            owners = User.objects.filter(Q(**{f"email__{lookup}": term}) | Q(**{f"last_name__{lookup}": term}))
+            phones = Profile.objects.filter(**{f"phone_number__{lookup}": term})
+            queryset = queryset.filter(
+                Q(**{f"dog_name__{lookup}": term})
+                | Q(user_id__in=owners.values("pk"))
+                | Q(user_id__in=phones.values("user_id"))
+            )
+        return queryset, False
+
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     """Admin for Service model."""
     list_display = ('name', 'price')
     list_filter = ('name',)
+
+
+@admin.register(PriceOverride)
+class PriceOverrideAdmin(admin.ModelAdmin):
+    """Admin for seasonal and holiday prices."""
+    list_display = ("label", "room", "room_type", "start_date", "end_date", "price_per_day")
+    list_filter = ("room_type", "room")
+    ordering = ("-start_date",)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """Admin for the waitlist."""
+    list_display = ("dog_name", "user", "room", "room_type", "start_date", "end_date", "status", "created_at")
+    list_filter = ("status", "room_type")
+    list_select_related = ("user", "room")
+    raw_id_fields = ("user", "reservation")
+    readonly_fields = ("created_at", "booked_at")
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Admin for queued e-mails."""
+    list_display = ("subject", "status", "attempts", "created_at", "sent_at", "delivery_ms")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    readonly_fields = ("created_at", "sent_at", "delivery_ms", "claimed_at", "last_error")
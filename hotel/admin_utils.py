@@ -0,0 +1,112 @@
+import json
+from datetime import date
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+# indeksy wyszukiwania zakłada migracja 0010 (tylko PostgreSQL)
+TRIGRAM_INDEX = "reservation_dog_name_trgm"
+_trigram = None
+
+
+def trigram_search():
+    """
+    True when migration 0010 created trigram indexes (pg_trgm was available).
+
+    Then "contains" search is indexed; otherwise only prefix search is.
+    """
+    global _trigram
+    if _trigram is None:
+        _trigram = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [TRIGRAM_INDEX])
+                _trigram = cursor.fetchone() is not None
+    return _trigram
+
+
+def estimate_rows(queryset):
+    """Planner's row estimate for a queryset (PostgreSQL), None elsewhere."""
+    if connection.vendor != "postgresql":
+        return None
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 / 0: tabela jeszcze nie analizowana
+        if row and row[0] > 0:
+            return row[0]
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts exactly up to `exact_limit` rows and estimates above that.
+
+    The exact part is a COUNT over a LIMITed subquery, so it never scans more
+    than exact_limit + 1 rows. Large result sets use the planner's estimate
+    (pg_class.reltuples when unfiltered), which is what the admin needs to
+    draw page links.
+    """
+
+    exact_limit = 10000
+
+    @cached_property
+    def count(self):
+        capped = self.object_list.order_by()[:self.exact_limit + 1].count()
+        if capped <= self.exact_limit:
+            return capped
+        return max(estimate_rows(self.object_list) or 0, capped)
+
+
+class DateRangeFilter(admin.FieldListFilter):
+    """From/to date inputs filtering with field__gte / field__lte (index range scan, no date aggregation)."""
+
+    template = "admin/date_range_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_gte = f"{field_path}__gte"
+        self.lookup_lte = f"{field_path}__lte"
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.value_gte = self._last(self.lookup_gte)
+        self.value_lte = self._last(self.lookup_lte)
+
+    def _last(self, name):
+        value = self.used_parameters.get(name)
+        if isinstance(value, list):
+            value = value[-1] if value else None
+        return value or ""
+
+    def expected_parameters(self):
+        return [self.lookup_gte, self.lookup_lte]
+
+    def queryset(self, request, queryset):
+        lookups = {}
+        for name, value in ((self.lookup_gte, self.value_gte), (self.lookup_lte, self.value_lte)):
+            if value:
+                try:
+                    lookups[name] = date.fromisoformat(value)
+                except ValueError as e:
+                    raise IncorrectLookupParameters(e)
+        return queryset.filter(**lookups)
+
+    def choices(self, changelist):
+        # formularz GET musi zachować pozostałe filtry i wyszukiwanie
+        hidden = [
+            (name, value)
+            for name, values in changelist.params.items()
+            if name not in (self.lookup_gte, self.lookup_lte, "p")
+            for value in (values if isinstance(values, list) else [values])
+        ]
+        yield {
+            "hidden": hidden,
+            "clear_url": changelist.get_query_string(remove=[self.lookup_gte, self.lookup_lte]),
+            "selected": bool(self.value_gte or self.value_lte),
+        }
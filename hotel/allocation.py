@@ -0,0 +1,120 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Room, RoomDayOccupancy, RoomDaySlot
+from .versions import bump_occupancy_version
+
+# ile razy ponawiamy cały przydział, gdy równoległa rezerwacja zajmie wybrany slot
+MAX_ATTEMPTS = 3
+
+# liczniki per proces (ponowienia po IntegrityError), odczytywane przez stress_booking
+stats = Counter()
+
+
+def iter_days(start, end):
+    """Yields every date from start to end, both inclusive."""
+    d = start
+    while d <= end:
+        yield d
+        d += timedelta(days=1)
+
+
+def lock_occupancy(room, days):
+    """
+    Returns the RoomDayOccupancy counters for the given days, locked FOR UPDATE.
+
+    Missing counters are created first, so every booking touching a day waits on the
+    same row. Rows are locked in date order to keep concurrent bookings deadlock-free.
+    """
+    RoomDayOccupancy.objects.bulk_create(
+        [RoomDayOccupancy(room=room, date=day, taken=0) for day in days],
+        ignore_conflicts=True,
+    )
+    return list(
+        RoomDayOccupancy.objects
+        .select_for_update()
+        .filter(room=room, date__gte=days[0], date__lte=days[-1])
+        .order_by("date")
+    )
+
+
+def taken_slots(room, start, end):
+    """Returns {date: set(slot numbers)} already used in the room between start and end."""
+    taken = {}
+    rows = (
+        RoomDaySlot.objects
+        .filter(room=room, date__gte=start, date__lte=end)
+        .values_list("date", "slot")
+    )
+    for day, slot in rows:
+        taken.setdefault(day, set()).add(slot)
+    return taken
+
+
+def pick_free_slots(room, days, taken):
+    """Picks the lowest free slot number for every day, in memory."""
+    picked = []
+    for day in days:
+        used = taken.get(day, ())
+        slot_no = next((n for n in range(1, room.capacity + 1) if n not in used), None)
+        if slot_no is None:
+            raise ValidationError(f"Brak wolnych miejsc w {room} dnia {day}.")
+        picked.append((day, slot_no))
+    return picked
+
+
+@transaction.atomic
+def allocate_slots(reservation):
+    """
+    Allocates one RoomDaySlot per day of the reservation.
+
+    Occupancy for the whole range is read in one query and all rows are inserted
+    with a single bulk statement. The unique_room_date_slot constraint still guards
+    against overbooking: if a concurrent booking takes one of the picked slots, the
+    bulk insert is rolled back to its savepoint and the whole pass is repeated.
+    The RoomDayOccupancy counters are checked and incremented in the same transaction.
+    """
+    days = list(iter_days(reservation.start_date, reservation.end_date))
+
+    counters = lock_occupancy(reservation.room, days)
+    # pojemność z bazy, nie z katalogu procesu (reservation.room bywa zbudowany z RoomRecord i może być nieaktualny)
+    room = Room.objects.get(pk=reservation.room_id)
+    for counter in counters:
+        if counter.taken >= room.capacity:
+            raise ValidationError(f"Brak wolnych miejsc w {room} dnia {counter.date}.")
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        taken = taken_slots(room, days[0], days[-1])
+        rows = [
+            RoomDaySlot(room=room, date=day, slot=slot_no, reservation=reservation)
+            for day, slot_no in pick_free_slots(room, days, taken)
+        ]
+        try:
+            with transaction.atomic():
+                RoomDaySlot.objects.bulk_create(rows)
+        except IntegrityError:
+            stats["integrity_retries"] += 1
+            if attempt == MAX_ATTEMPTS:
+                raise
+            continue
+
+        for counter in counters:
+            counter.taken += 1
+        RoomDayOccupancy.objects.bulk_update(counters, ["taken"])
+        bump_occupancy_version(room.pk)
+        return rows
+
+
+def release_slots(reservation):
+    """Decrements the occupancy counters for every day of a removed reservation."""
+    RoomDayOccupancy.objects.filter(
+        room_id=reservation.room_id,
+        date__gte=reservation.start_date,
+        date__lte=reservation.end_date,
+        taken__gt=0,
+    ).update(taken=F("taken") - 1)
+    bump_occupancy_version(reservation.room_id)
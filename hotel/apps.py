@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class HotelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hotel'
+
+    def ready(self):
+        from . import dbpool, signals  # noqa: F401
+
+        dbpool.register()
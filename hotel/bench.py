@@ -0,0 +1,141 @@
+import random
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from .allocation import iter_days
+from .capacity import get_backend
+from .instrumentation import QueryRecorder
+from .models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+
+BATCH_SIZE = 5000
+ROOM_TYPES = [t for t, _ in Room.ROOM_TYPE_CHOICES]
+
+
+@dataclass
+class Dataset:
+    rooms: list
+    users: list
+    reservations: int
+    slots: int
+    busiest_user: object
+
+    def summary(self):
+        return {
+            "rooms": len(self.rooms),
+            "users": len(self.users),
+            "reservations": self.reservations,
+            "slots": self.slots,
+        }
+
+
+def generate(rooms=30, users=2000, reservations=50000, days=3 * 365, seed=1, max_nights=14):
+    """
+    Bulk-loads rooms, users, reservations and, for the slot capacity backend,
+    RoomDaySlot and RoomDayOccupancy rows.
+
+    Stays are spread over `days` days ending a year from today. Slots are
+    assigned in memory, so the result respects Room.capacity and matches what
+    allocate_slots would produce.
+    """
+    rnd = random.Random(seed)
+    User = get_user_model()
+    prefix = f"bench-{seed}-{time.time_ns()}"
+
+    room_objs = Room.objects.bulk_create([
+        Room(
+            name=f"Bench {i}",
+            room_type=ROOM_TYPES[i % len(ROOM_TYPES)],
+            capacity=rnd.choice([1, 2, 5, 10]),
+            price_per_day=rnd.choice([80, 130, 180]),
+        )
+        for i in range(rooms)
+    ])
+    user_objs = User.objects.bulk_create(
+        [User(username=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com", password="!") for i in range(users)],
+        batch_size=BATCH_SIZE,
+    )
+
+    first_day = timezone.localdate() + timedelta(days=365 - days)
+    taken = {}  # (room_id, date) -> następny wolny numer slotu
+    stays = []
+    for _ in range(reservations):
+        room = rnd.choice(room_objs)
+        start = first_day + timedelta(days=rnd.randrange(days))
+        end = start + timedelta(days=rnd.randrange(max_nights))
+        stay_days = list(iter_days(start, end))
+        if any(taken.get((room.id, d), 0) >= room.capacity for d in stay_days):
+            continue
+        slots = []
+        for d in stay_days:
+            taken[(room.id, d)] = taken.get((room.id, d), 0) + 1
+            slots.append((d, taken[(room.id, d)]))
+        stays.append((Reservation(
+            user=rnd.choice(user_objs), room=room, dog_name=f"Pies {len(stays)}",
+            start_date=start, end_date=end,
+        ), slots))
+
+    created = Reservation.objects.bulk_create([r for r, _ in stays], batch_size=BATCH_SIZE)
+    if get_backend().name == "slots":
+        _bulk_slots(created, stays, taken)
+
+    per_user = Counter(r.user_id for r in created)
+    busiest = max(user_objs, key=lambda u: per_user[u.pk])
+    return Dataset(room_objs, user_objs, len(created), sum(taken.values()), busiest)
+
+
+def _bulk_slots(created, stays, taken):
+    slot_rows = (
+        RoomDaySlot(room_id=r.room_id, date=d, slot=n, reservation_id=r.pk)
+        for r, (_, slots) in zip(created, stays)
+        for d, n in slots
+    )
+    _bulk_in_batches(RoomDaySlot, slot_rows)
+    _bulk_in_batches(RoomDayOccupancy, (
+        RoomDayOccupancy(room_id=room_id, date=d, taken=n) for (room_id, d), n in taken.items()
+    ))
+
+
+def _bulk_in_batches(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def measure(fn, repeat=20, setup=None):
+    """
+    Runs fn `repeat` times; returns latency (ms), query and rows-touched statistics.
+
+    setup(i), if given, runs untimed before each call and its result is passed to fn.
+    """
+    latencies, queries, rows = [], [], []
+    for i in range(repeat):
+        arg = setup(i) if setup else i
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            t0 = time.perf_counter()
+            fn(arg)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(recorder.count)
+        rows.append(recorder.rows)
+    ordered = sorted(latencies)
+    return {
+        "runs": repeat,
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+        "queries": round(statistics.mean(queries), 2),
+        "rows": round(statistics.mean(rows), 2),
+    }
@@ -0,0 +1,209 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connection, transaction
+from django.db.models import BooleanField, Max
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .allocation import allocate_slots, iter_days, lock_occupancy, pick_free_slots, release_slots, taken_slots
+from .models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+from .retention import history_matrix
+from .versions import bump_occupancy_version
+
+
+def overlapping(queryset, start, end):
+    """
+    Narrows a queryset of date ranges (start_date/end_date, both inclusive) to
+    those overlapping [start, end].
+
+    On PostgreSQL the condition is written as a daterange overlap so that the
+    GiST indexes from migrations 0008 and 0012 are used; elsewhere it is a plain
+    date filter served by the end_date indexes.
+    """
+    if connection.vendor == "postgresql":
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        return queryset.filter(RawSQL(
+            f"daterange({table}.start_date, {table}.end_date, '[]') && daterange(%s, %s, '[]')",
+            (start, end),
+            output_field=BooleanField(),
+        ))
+    return queryset.filter(start_date__lte=end, end_date__gte=start)
+
+
+def sweep(stays, start, end):
+    """Returns per-day counts over [start, end] for (start_date, end_date) stays, in O(stays + days)."""
+    span = (end - start).days + 1
+    delta = [0] * (span + 1)
+    for stay_start, stay_end in stays:
+        first = max((stay_start - start).days, 0)
+        last = min((stay_end - start).days, span - 1)
+        if first <= last:
+            delta[first] += 1
+            delta[last + 1] -= 1
+    counts, running = [], 0
+    for d in delta[:span]:
+        running += d
+        counts.append(running)
+    return counts
+
+
+def take_fitting(reservations, taken, capacity):
+    """
+    Keeps the reservations (in order) that still fit, counting each one into `taken`.
+
+    `taken` maps date -> places already taken and is updated in place.
+    """
+    accepted = []
+    for reservation in reservations:
+        days = list(iter_days(reservation.start_date, reservation.end_date))
+        if all(taken.get(day, 0) < capacity for day in days):
+            for day in days:
+                taken[day] = taken.get(day, 0) + 1
+            accepted.append(reservation)
+    return accepted
+
+
+class SlotBackend:
+    """One RoomDaySlot row per night plus RoomDayOccupancy counters (hotel/allocation.py)."""
+
+    name = "slots"
+
+    def allocate(self, reservation):
+        return allocate_slots(reservation)
+
+    def release(self, reservation):
+        release_slots(reservation)
+
+    @transaction.atomic
+    def allocate_many(self, room, reservations):
+        start = min(r.start_date for r in reservations)
+        end = max(r.end_date for r in reservations)
+        # te same blokady liczników co przy zwykłej rezerwacji – obie ścieżki czekają na siebie
+        counters = lock_occupancy(room, list(iter_days(start, end)))
+        taken = {counter.date: counter.taken for counter in counters}
+        accepted = take_fitting(reservations, taken, room.capacity)
+        if not accepted:
+            return []
+
+        Reservation.objects.bulk_create(accepted)
+        used = taken_slots(room, start, end)
+        rows = []
+        for reservation in accepted:
+            days = list(iter_days(reservation.start_date, reservation.end_date))
+            for day, slot_no in pick_free_slots(room, days, used):
+                used.setdefault(day, set()).add(slot_no)
+                rows.append(RoomDaySlot(room=room, date=day, slot=slot_no, reservation=reservation))
+        RoomDaySlot.objects.bulk_create(rows)
+        for counter in counters:
+            counter.taken = taken[counter.date]
+        RoomDayOccupancy.objects.bulk_update(counters, ["taken"])
+        bump_occupancy_version(room.pk)
+        return accepted
+
+    def taken_matrix(self, room_ids, start, end):
+        span = (end - start).days + 1
+        matrix = {room_id: [0] * span for room_id in room_ids}
+        rows = (
+            RoomDayOccupancy.objects
+            .filter(room__in=list(matrix), date__gte=start, date__lte=end)
+            .values_list("room_id", "date", "taken")
+        )
+        for room_id, day, taken in rows:
+            matrix[room_id][(day - start).days] = taken
+        if start < timezone.localdate():
+            # dni przeniesione przez archive_slots mają już tylko podsumowanie
+            for room_id, days in history_matrix(list(matrix), start, min(end, timezone.localdate())).items():
+                for day, taken in days.items():
+                    matrix[room_id][(day - start).days] = taken
+        return matrix
+
+    def peak_taken(self, room_ids, start, end):
+        peaks = dict.fromkeys(room_ids, 0)
+        peaks.update(
+            RoomDayOccupancy.objects
+            .filter(room__in=list(peaks), date__gte=start, date__lte=end)
+            .values("room_id")
+            .annotate(peak=Max("taken"))
+            .values_list("room_id", "peak")
+        )
+        return peaks
+
+
+class RangeBackend:
+    """
+    The reservation row itself is the stored range; no per-night rows.
+
+    Bookings for a room are serialized by locking the Room row, then the
+    overlapping stays are swept into per-day counts and checked against
+    capacity. Storage and index upkeep per booking no longer grow with the
+    number of nights.
+    """
+
+    name = "range"
+
+    @transaction.atomic
+    def allocate(self, reservation):
+        room = Room.objects.select_for_update().get(pk=reservation.room_id)
+        start, end = reservation.start_date, reservation.end_date
+        stays = (
+            overlapping(Reservation.objects.filter(room=room), start, end)
+            .exclude(pk=reservation.pk)
+            .values_list("start_date", "end_date")
+        )
+        for day, taken in zip(iter_days(start, end), sweep(stays, start, end)):
+            if taken >= room.capacity:
+                raise ValidationError(f"Brak wolnych miejsc w {room} dnia {day}.")
+        bump_occupancy_version(room.pk)
+        return []
+
+    def release(self, reservation):
+        bump_occupancy_version(reservation.room_id)
+
+    @transaction.atomic
+    def allocate_many(self, room, reservations):
+        room = Room.objects.select_for_update().get(pk=room.pk)
+        start = min(r.start_date for r in reservations)
+        end = max(r.end_date for r in reservations)
+        stays = overlapping(Reservation.objects.filter(room=room), start, end).values_list("start_date", "end_date")
+        taken = dict(zip(iter_days(start, end), sweep(stays, start, end)))
+        accepted = take_fitting(reservations, taken, room.capacity)
+        if accepted:
+            Reservation.objects.bulk_create(accepted)
+            bump_occupancy_version(room.pk)
+        return accepted
+
+    def taken_matrix(self, room_ids, start, end):
+        stays = {room_id: [] for room_id in room_ids}
+        rows = overlapping(Reservation.objects.filter(room__in=list(stays)), start, end).values_list(
+            "room_id", "start_date", "end_date",
+        )
+        for room_id, stay_start, stay_end in rows:
+            stays[room_id].append((stay_start, stay_end))
+        return {room_id: sweep(room_stays, start, end) for room_id, room_stays in stays.items()}
+
+    def peak_taken(self, room_ids, start, end):
+        return {room_id: max(taken) for room_id, taken in self.taken_matrix(room_ids, start, end).items()}
+
+
+BACKENDS = {backend.name: backend for backend in (SlotBackend(), RangeBackend())}
+
+
+def get_backend():
+    """Returns the backend named by HOTEL_CAPACITY_BACKEND ("slots" or "range")."""
+    name = getattr(settings, "HOTEL_CAPACITY_BACKEND", "slots")
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown HOTEL_CAPACITY_BACKEND {name!r}, expected one of {sorted(BACKENDS)}.")
+
+
+def overbooked(room, start, end):
+    """Returns [(date, taken)] for days in [start, end] above the room's capacity."""
+    taken = get_backend().taken_matrix([room.pk], start, end)[room.pk]
+    return [
+        (start + timedelta(days=i), n)
+        for i, n in enumerate(taken)
+        if n > room.capacity
+    ]
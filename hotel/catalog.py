@@ -0,0 +1,87 @@
+import threading
+from decimal import Decimal
+from typing import NamedTuple
+
+from .models import Room
+from .versions import catalog_version
+
+ROOM_TYPE_LABELS = dict(Room.ROOM_TYPE_CHOICES)
+
+
+class RoomRecord(NamedTuple):
+    """Immutable, query-free snapshot of a Room row."""
+    id: int
+    name: str
+    room_type: str
+    capacity: int
+    price_per_day: Decimal
+    description: str
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_room_type_display(self):
+        return ROOM_TYPE_LABELS.get(self.room_type, self.room_type)
+
+    def as_room(self):
+        """Builds a Room instance (e.g. for a ForeignKey) without hitting the database."""
+        room = Room(**self._asdict())
+        room._state.adding = False
+        return room
+
+    def __str__(self):
+        return f"{self.name} ({self.get_room_type_display()})"
+
+
+class Catalog:
+    """All rooms, ordered by (room_type, name) and indexed by id and room_type."""
+
+    def __init__(self, version, records):
+        self.version = version
+        self.rooms = tuple(records)
+        self.by_id = {r.id: r for r in self.rooms}
+        by_type = {}
+        for r in self.rooms:
+            by_type.setdefault(r.room_type, []).append(r)
+        self.by_type = {t: tuple(rs) for t, rs in by_type.items()}
+        self.cheapest = {
+            t: min(rs, key=lambda r: (r.price_per_day, r.name)) for t, rs in self.by_type.items()
+        }
+
+    def get(self, room_id):
+        try:
+            return self.by_id.get(int(room_id))
+        except (TypeError, ValueError):
+            return None
+
+    def of_type(self, room_type):
+        return self.by_type.get(room_type, ())
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Returns this process' Room catalog, rebuilding it when the shared version changed.
+
+    In the steady state this costs one cache read and no Room queries; Room
+    save/delete signals bump the version so every gunicorn worker reloads.
+    """
+    global _catalog
+    version = catalog_version()
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            # wersję odczytujemy przed zapytaniem: zmiana w trakcie budowy wymusi kolejne przeładowanie
+            records = [
+                RoomRecord(*row)
+                for row in Room.objects.order_by("room_type", "name").values_list(*RoomRecord._fields)
+            ]
+            _catalog = Catalog(version, records)
+        return _catalog
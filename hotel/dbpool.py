@@ -0,0 +1,58 @@
+import os
+import threading
+
+from django.db import connections
+
+# liczniki per proces; z pulą "connects" to pobrania z puli, fizyczne połączenia liczy connections_num
+_lock = threading.Lock()
+_churn = {"connects": 0}
+
+
+def count_connection(sender, connection, **kwargs):
+    with _lock:
+        _churn["connects"] += 1
+
+
+def forget_inherited(*args, **kwargs):
+    """
+    Drops pools and connections inherited from the parent process after fork.
+
+    They are not closed: the sockets still belong to the parent, and closing
+    them here would terminate its sessions. The child opens its own pool lazily.
+    """
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+    for conn in connections.all():
+        pools = getattr(type(conn), "_connection_pools", None)
+        if pools:
+            pools.clear()
+    with _lock:
+        _churn["connects"] = 0
+
+
+def register():
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(count_connection, dispatch_uid="hotel.dbpool.count_connection")
+    os.register_at_fork(after_in_child=forget_inherited)
+
+
+def pool_stats(alias="default"):
+    """
+    Returns this process' pool state: size/available, waits and connection churn.
+
+    "connects" counts Django connects (new sockets without the pool, checkouts
+    with it). In pool mode the remaining keys come from psycopg_pool's
+    get_stats(): connections_num (sockets opened), requests_wait_ms,
+    requests_waiting, connections_lost, returns_bad, ...
+    """
+    conn = connections[alias]
+    with _lock:
+        stats = {"pid": os.getpid(), **_churn}
+    pool = conn.pool if conn.vendor == "postgresql" else None
+    if pool is None:
+        stats["mode"] = "persistent" if conn.settings_dict["CONN_MAX_AGE"] else "per-request"
+        return stats
+    stats["mode"] = "pool"
+    stats.update(pool.get_stats())
+    return stats
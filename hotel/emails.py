@@ -1,6 +1,7 @@
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
+from .outbox import enqueue
 
 def send_booking_confirmation(booking):
 
@@ -24,4 +25,4 @@ def send_booking_confirmation(booking):
         to=[getattr(booking, "customer_email", "")],
     )
     msg.attach_alternative(html_body, "text/html")
-    msg.send()
+    enqueue(msg)
@@ -94,7 +94,42 @@ class UserRegisterForm(UserCreationForm):
 from datetime import timedelta
 from django import forms
 from django.utils import timezone
-from .models import Reservation, Room
+from . import search
+from .catalog import get_catalog
+from .models import Reservation, Service, WaitlistEntry
+
+
+# jak daleko szukać innego terminu, gdy wybrane miejsce jest zajęte
+SUGGEST_WITHIN_DAYS = 90
+
+
+class RoomChoiceField(forms.ChoiceField):
+    """Room select fed from the in-process catalog; cleans to a Room without a query."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rooms = ()
+
+    def set_rooms(self, rooms, label_from_record=str):
+        self.rooms = tuple(rooms)
+        self.choices = [("", "---------")] + [(r.id, label_from_record(r)) for r in self.rooms]
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        record = next((r for r in self.rooms if str(r.id) == str(value)), None)
+        if record is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"], code="invalid_choice", params={"value": value},
+            )
+        return record.as_room()
+
+    def validate(self, value):
+        forms.Field.validate(self, value)
+
+    def has_changed(self, initial, data):
+        initial = getattr(initial, "pk", initial)
+        return str(initial or "") != str(data or "")
 
 
 class ReservationForm(forms.ModelForm):
@@ -106,18 +141,23 @@ class ReservationForm(forms.ModelForm):
             "placeholder": "Np. Burek"
         })
     )
+    room = RoomChoiceField(label="Miejsce", widget=forms.Select(attrs={"class": "form-select"}))
+    services = forms.ModelMultipleChoiceField(
+        label="Usługi dodatkowe",
+        queryset=Service.objects.order_by("name"),
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
 
     class Meta:
         model = Reservation
-        fields = ["dog_name", "room", "start_date", "end_date", "notes"]
+        fields = ["dog_name", "room", "start_date", "end_date", "services", "notes"]
         labels = {
-            "room": "Miejsce",
             "start_date": "Od",
             "end_date": "Do",
             "notes": "Uwagi",
         }
         widgets = {
-            "room": forms.Select(attrs={"class": "form-select"}),
             "start_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
             "end_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
             "notes": forms.Textarea(attrs={"class": "form-control", "rows": 3, "placeholder": "Uwagi (opcjonalnie)"}),
@@ -130,25 +170,24 @@ class ReservationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
 
-        qs = Room.objects.all().order_by("room_type", "name")
+        catalog = get_catalog()
+        rooms = catalog.rooms
 
         if preselected_room_type:
-            qs = qs.filter(room_type=preselected_room_type)
-            if qs.exists():
-                self.fields["room"].initial = qs.first().pk
+            rooms = catalog.of_type(preselected_room_type)
+            if rooms:
+                self.fields["room"].initial = rooms[0].pk
 
         # Jeśli podano konkretne ID pokoju
         if preselected_room_id:
-            qs = Room.objects.filter(pk=preselected_room_id)
-            if qs.exists():
-                self.fields["room"].initial = preselected_room_id
-
-        self.fields["room"].queryset = qs
-
+            record = catalog.get(preselected_room_id)
+            if record:
+                rooms = (record,)
+                self.fields["room"].initial = record.pk
 
-        def label_from_instance(obj: Room):
+        def label_from_record(obj):
             return f"{obj.get_room_type_display()} – {obj.price_per_day} zł/doba"
-        self.fields["room"].label_from_instance = label_from_instance
+        self.fields["room"].set_rooms(rooms, label_from_record)
 
         today = timezone.localdate()
         tomorrow = today + timedelta(days=1)
@@ -171,12 +210,61 @@ class ReservationForm(forms.ModelForm):
         if start and end and end <= start:
             self.add_error("end_date", "Data zakończenia musi być po dacie początkowej.")
 
+        room = cleaned.get("room")
+        if room and not self.errors:
+            # wcześniejsza, czytelna odmowa; ostateczną decyzję i tak podejmuje przydział miejsc przy zapisie
+            if not search.best_available(start, end, room_ids={room.pk}):
+                message = "To miejsce jest zajęte w wybranym terminie – wybierz inne."
+                window = search.earliest_window(start, SUGGEST_WITHIN_DAYS, (end - start).days + 1, room_id=room.pk)
+                if window:
+                    message += f" Najbliższy wolny termin tej długości: {window.start} – {window.end}."
+                self.add_error("room", forms.ValidationError(message, code="full"))
+
         return cleaned
 
+    @property
+    def room_full(self):
+        """True when the room was refused for lack of places (the template then offers the waitlist)."""
+        return self.has_error("room", code="full")
+
 
 
 
 
+class WaitlistForm(forms.ModelForm):
+    """Waitlist sign-up for one room or any room of a type."""
+    room = RoomChoiceField(label="Miejsce", required=False, widget=forms.Select(attrs={"class": "form-select"}))
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ["dog_name", "room", "room_type", "start_date", "end_date", "notes"]
+        labels = {
+            "dog_name": "Imię psa",
+            "room_type": "albo dowolne miejsce typu",
+            "start_date": "Od",
+            "end_date": "Do",
+            "notes": "Uwagi",
+        }
+        widgets = {
+            "dog_name": forms.TextInput(attrs={"class": "form-control"}),
+            "room_type": forms.Select(attrs={"class": "form-select"}),
+            "start_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+            "end_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+            "notes": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["room"].set_rooms(get_catalog().rooms)
+
+    def clean(self):
+        cleaned = super().clean()
+        start = cleaned.get("start_date")
+        if start and start < timezone.localdate():
+            self.add_error("start_date", "Data początkowa nie może być wcześniejsza niż dzisiaj.")
+        return cleaned
+
+
 class ContactForm(forms.Form):
     fullname = forms.CharField(label="Imię i nazwisko")
     email = forms.EmailField(label="Email")
@@ -0,0 +1,104 @@
+import hashlib
+from array import array
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .capacity import get_backend
+from .catalog import ROOM_TYPE_LABELS, get_catalog
+from .versions import occupancy_versions
+
+MAX_DAYS = 366
+# progi wypełnienia (taken / capacity) dla kolorów na stronie
+LEVELS = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+class Heatmap:
+    """
+    Rooms × days occupancy over [start, end], one compact array("H") per row.
+
+    Room-type rows are element-wise sums of their rooms' rows.
+    """
+
+    def __init__(self, start, end, rooms, taken):
+        self.start = start
+        self.end = end
+        self.rooms = rooms  # [(id, name, room_type, capacity)]
+        self.taken = taken  # {room_id: array("H")}
+        self.types = {}
+        for room_id, _, room_type, capacity in rooms:
+            total_capacity, sums = self.types.get(room_type, (0, array("H", bytes(2 * self.span))))
+            for i, n in enumerate(taken[room_id]):
+                sums[i] += n
+            self.types[room_type] = (total_capacity + capacity, sums)
+
+    @property
+    def span(self):
+        return (self.end - self.start).days + 1
+
+    def dates(self):
+        return [self.start + timedelta(days=i) for i in range(self.span)]
+
+    def rows(self):
+        """Yields (kind, label, capacity, taken array) – types first, then rooms."""
+        for room_type, (capacity, sums) in self.types.items():
+            yield "type", ROOM_TYPE_LABELS.get(room_type, room_type), capacity, sums
+        for room_id, name, _, capacity in self.rooms:
+            yield "room", name, capacity, self.taken[room_id]
+
+    def as_dict(self):
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "dates": [d.isoformat() for d in self.dates()],
+            "room_types": [
+                {"room_type": t, "capacity": capacity, "taken": list(sums)}
+                for t, (capacity, sums) in self.types.items()
+            ],
+            "rooms": [
+                {"room": room_id, "room_name": name, "room_type": t, "capacity": capacity, "taken": list(self.taken[room_id])}
+                for room_id, name, t, capacity in self.rooms
+            ],
+        }
+
+    def write_csv(self, writer):
+        writer.writerow(["typ", "miejsce", "pojemność", *[d.isoformat() for d in self.dates()]])
+        for kind, label, capacity, taken in self.rows():
+            writer.writerow([kind, label, capacity, *taken])
+
+
+def build(start, end):
+    """One capacity-backend pass over all rooms (counters or ranges), no per-room queries."""
+    rooms = [(r.id, r.name, r.room_type, r.capacity) for r in get_catalog().rooms]
+    matrix = get_backend().taken_matrix([room[0] for room in rooms], start, end)
+    return Heatmap(start, end, rooms, {room_id: array("H", row) for room_id, row in matrix.items()})
+
+
+def get_heatmap(start, end):
+    """
+    Returns the heatmap from cache, rebuilding it when any room's occupancy or the catalog changed.
+
+    Entries are keyed by today's date and expire at midnight.
+    """
+    catalog = get_catalog()
+    versions = occupancy_versions([r.id for r in catalog.rooms])
+    today = timezone.localdate()
+    digest = hashlib.md5(
+        repr((today, start, end, catalog.version, sorted(versions.items()))).encode()
+    ).hexdigest()
+    key = f"heatmap:{digest}"
+    heatmap = cache.get(key)
+    if heatmap is None:
+        heatmap = build(start, end)
+        midnight = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
+        cache.set(key, heatmap, max(int((midnight - timezone.now()).total_seconds()), 1))
+    return heatmap
+
+
+def level(taken, capacity):
+    """Colour bucket 0–4 for a cell."""
+    if not capacity or not taken:
+        return 0
+    ratio = taken / capacity
+    return max(i for i, threshold in enumerate(LEVELS) if ratio >= threshold) or 1
@@ -0,0 +1,73 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# rejestrator bieżącego żądania; kontekst przechodzi też do wątków sync_to_async
+_current = ContextVar("query_recorder", default=None)
+
+
+class QueryRecorder:
+    """
+    execute_wrapper counting queries, DB time and rows touched.
+
+    Usage::
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            ...
+
+    Rows touched is the cursor rowcount: affected rows for writes and, on
+    PostgreSQL, returned rows for SELECTs (SQLite reports -1 for SELECTs).
+    """
+
+    def __init__(self, keep_sql=False):
+        self.keep_sql = keep_sql
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            rowcount = getattr(context.get("cursor"), "rowcount", -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+            if self.keep_sql:
+                self.statements[sql] += 1
+
+
+def _record_current(execute, sql, params, many, context):
+    recorder = _current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    """
+    Adds the context-aware wrapper to a DB connection (idempotent).
+
+    Connected to connection_created, so connections opened in sync_to_async
+    threads are covered as well as the request thread's own.
+    """
+    if _record_current not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_current)
+
+
+@contextmanager
+def recording(recorder):
+    """Routes queries from this context (and threads spawned by sync_to_async) to recorder."""
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
@@ -0,0 +1,165 @@
+import os
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+
+# pula per proces: klucz (host, port, user, tls, ssl) -> [(połączenie, ostatnie użycie)]
+_pool = {}
+_pool_pid = os.getpid()
+_pool_lock = threading.Lock()
+_stats = {
+    "connections_opened": 0,
+    "connections_reused": 0,
+    "reconnects": 0,
+    "batches": 0,
+    "messages_sent": 0,
+}
+
+
+def stats():
+    """Returns this process' counters: connections opened/reused vs. messages sent."""
+    with _pool_lock:
+        return dict(_stats)
+
+
+def _count(name, n=1):
+    with _pool_lock:
+        _stats[name] += n
+
+
+def _quit(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+def _checkout(key):
+    global _pool_pid
+    max_idle = getattr(settings, "EMAIL_POOL_MAX_IDLE", 60)
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            # po forku gunicorna nie dzielimy gniazd z procesem-rodzicem
+            _pool.clear()
+            _pool_pid = os.getpid()
+        idle = _pool.get(key, [])
+        while idle:
+            connection, last_used = idle.pop()
+            if time.monotonic() - last_used <= max_idle:
+                break
+            connection.close()
+        else:
+            return None
+
+    # NOOP tylko po dłuższej przerwie – serwer mógł zamknąć bezczynne połączenie
+    if time.monotonic() - last_used > getattr(settings, "EMAIL_POOL_CHECK_AFTER", 5):
+        try:
+            if connection.noop()[0] != 250:
+                raise smtplib.SMTPServerDisconnected("NOOP rejected")
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+            return None
+    return connection
+
+
+def _checkin(key, connection):
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            return False
+        idle = _pool.setdefault(key, [])
+        if len(idle) >= getattr(settings, "EMAIL_POOL_SIZE", 2):
+            return False
+        idle.append((connection, time.monotonic()))
+        return True
+
+
+class PooledSMTPBackend(EmailBackend):
+    """
+    SMTP backend keeping authenticated connections open between send_messages calls.
+
+    close() returns the connection to a small per-process pool instead of
+    sending QUIT, so the next batch skips the TCP/TLS handshake and AUTH.
+    A connection dropped by the server while idle is replaced transparently.
+    """
+
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        connection = _checkout(self._pool_key())
+        if connection is not None:
+            self.connection = connection
+            _count("connections_reused")
+            return True
+        opened = super().open()
+        if self.connection:
+            _count("connections_opened")
+        return opened
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        if not _checkin(self._pool_key(), connection):
+            _quit(connection)
+
+    def send_messages(self, email_messages):
+        """
+        Sends the whole batch over one connection; returns the number sent.
+
+        A message the server rejects does not stop the rest of the batch:
+        its index and error are recorded in self.failures, and unless
+        fail_silently the first error is raised once the batch is done.
+        Indexes actually handed to the server are listed in self.sent. If a
+        reconnect fails, the remaining messages are recorded as failures
+        without being attempted.
+        """
+        self.failures, self.sent = {}, []
+        if not email_messages:
+            return 0
+        with self._lock:
+            new_conn_created = self.open()
+            if not self.connection or new_conn_created is None:
+                return 0
+            _count("batches")
+            try:
+                for index, message in enumerate(email_messages):
+                    if self.connection is None:
+                        self.failures[index] = smtplib.SMTPServerDisconnected("Brak połączenia z serwerem SMTP")
+                        continue
+                    try:
+                        if self._send_with_reconnect(message):
+                            self.sent.append(index)
+                    except (smtplib.SMTPException, OSError) as e:
+                        self.failures[index] = e
+            finally:
+                if new_conn_created:
+                    self.close()
+        _count("messages_sent", len(self.sent))
+        if self.failures and not self.fail_silently:
+            raise next(iter(self.failures.values()))
+        return len(self.sent)
+
+    def _send_with_reconnect(self, message):
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            try:
+                return self._send(message)
+            except smtplib.SMTPServerDisconnected:
+                self._reconnect()
+                return self._send(message)
+        finally:
+            self.fail_silently = fail_silently
+
+    def _reconnect(self):
+        # przy nieudanym open() self.connection zostaje None – send_messages nie wysyła już reszty paczki
+        self.connection.close()
+        self.connection = None
+        _count("reconnects")
+        super().open()
+        _count("connections_opened")
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from hotel import retention
+from hotel.capacity import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Przenosi RoomDaySlot sprzed okresu retencji do archiwum (RoomDaySlotArchive) i podsumowania "
+        "dziennego (RoomDayHistory), partiami po --days-per-batch dni."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", type=date.fromisoformat,
+                            help="Archiwizuje dni wcześniejsze niż ta data (domyślnie dziś - SLOT_RETENTION_DAYS).")
+        parser.add_argument("--days-per-batch", type=int, default=retention.DAYS_PER_BATCH)
+        parser.add_argument("--no-detail", action="store_true",
+                            help="Zostawia tylko podsumowanie dzienne, bez kopii wierszy slotów.")
+
+    def handle(self, *args, **options):
+        if get_backend().name != "slots":
+            raise CommandError("Sloty są używane tylko przez HOTEL_CAPACITY_BACKEND=slots.")
+        today = timezone.localdate()
+        cutoff = options["before"] or today - timedelta(days=getattr(settings, "SLOT_RETENTION_DAYS", 90))
+        if cutoff > today:
+            raise CommandError("Można archiwizować tylko dni przeszłe.")
+
+        total_days = total_rows = 0
+        for start, end, days, rows in retention.archive_before(
+            cutoff, options["days_per_batch"], keep_detail=not options["no_detail"],
+        ):
+            total_days += days
+            total_rows += rows
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"{start} – {end - timedelta(days=1)}: dni {days}, slotów {rows}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Gotowe. Przeniesiono slotów: {total_rows}, podsumowanych dni: {total_days} (przed {cutoff})."
+        ))
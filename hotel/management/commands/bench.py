@@ -0,0 +1,174 @@
+import json
+import subprocess
+from datetime import timedelta
+
+import django
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel import bench
+from hotel.capacity import get_backend
+from hotel.models import Reservation
+from hotel.pagination import KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = (
+        "Mikrobenchmarki silnika rezerwacji na wygenerowanych danych (czas, liczba zapytań, wiersze). "
+        "Dane powstają w transakcji wycofywanej na końcu; wynik w JSON do porównań między commitami."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=30)
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--reservations", type=int, default=50000)
+        parser.add_argument("--days", type=int, default=3 * 365, help="Zakres dat wygenerowanych pobytów.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output", help="Zapisz wyniki do pliku JSON.")
+        parser.add_argument("--compare", help="Porównaj z wcześniejszym plikiem JSON.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            dataset = bench.generate(
+                rooms=options["rooms"], users=options["users"], reservations=options["reservations"],
+                days=options["days"], seed=options["seed"],
+            )
+            results = self.run_suite(dataset, options["repeat"])
+            transaction.set_rollback(True)
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": timezone.now().isoformat(),
+                "vendor": connection.vendor,
+                "capacity_backend": get_backend().name,
+                "django": django.get_version(),
+                "repeat": options["repeat"],
+                "seed": options["seed"],
+            },
+            "dataset": dataset.summary(),
+            "results": results,
+        }
+
+        previous = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                previous = json.load(f)["results"]
+
+        self.stdout.write(f"dane: {report['dataset']}")
+        self.stdout.write(f"{'operacja':<28} {'śr. ms':>9} {'p95 ms':>9} {'zapytań':>8} {'wierszy':>9}  zmiana")
+        for name, r in results.items():
+            change = ""
+            if previous and name in previous and previous[name]["mean_ms"]:
+                change = f"{(r['mean_ms'] / previous[name]['mean_ms'] - 1) * 100:+.1f}%"
+            self.stdout.write(
+                f"{name:<28} {r['mean_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['queries']:>8.1f} {r['rows']:>9.1f}  {change}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Zapisano {options['output']}"))
+
+    def run_suite(self, dataset, repeat):
+        rooms = dataset.rooms
+        today = timezone.localdate()
+        client = Client(SERVER_NAME="localhost")
+        client.force_login(dataset.busiest_user)
+        results = {}
+
+        def save_reservation(i):
+            room = rooms[i % len(rooms)]
+            start = today + timedelta(days=(i * 7) % 300)
+            try:
+                with transaction.atomic():
+                    Reservation(
+                        user=dataset.busiest_user, room=room, dog_name="Bench",
+                        start_date=start, end_date=start + timedelta(days=6),
+                    ).save()
+            except ValidationError:
+                pass  # pełny termin też jest realnym przypadkiem
+
+        results["reservation_save"] = bench.measure(save_reservation, repeat)
+
+        def new_reservation(i):
+            room = rooms[i % len(rooms)]
+            start = today + timedelta(days=(i * 11) % 300)
+            (reservation,) = Reservation.objects.bulk_create([Reservation(
+                user=dataset.busiest_user, room=room, dog_name="Bench",
+                start_date=start, end_date=start + timedelta(days=13),
+            )])
+            return reservation
+
+        def allocate(reservation):
+            try:
+                with transaction.atomic():
+                    reservation.allocate_daily_slots()
+            except ValidationError:
+                pass
+
+        results["allocate_daily_slots"] = bench.measure(allocate, repeat, setup=new_reservation)
+
+        url = reverse("availability_api")
+
+        def availability(i):
+            # za każdym razem inny zakres, więc odpowiedź nie pochodzi z cache
+            start = today + timedelta(days=i)
+            client.get(url, {"room": rooms[i % len(rooms)].pk, "start": start, "end": start + timedelta(days=30)})
+
+        results["availability_api"] = bench.measure(availability, repeat)
+
+        cached_params = {"room": rooms[0].pk, "start": today, "end": today + timedelta(days=30)}
+        client.get(url, cached_params)
+        results["availability_api_cached"] = bench.measure(lambda i: client.get(url, cached_params), repeat)
+
+        batch_params = {"rooms": ",".join(str(r.pk) for r in rooms)}
+
+        def availability_batch(i):
+            start = today + timedelta(days=i)
+            client.get(url, {**batch_params, "start": start, "end": start + timedelta(days=30)})
+
+        results["availability_api_batch"] = bench.measure(availability_batch, repeat)
+
+        quote_url = reverse("quote_api")
+
+        def quote_batch(i):
+            # wszystkie pokoje, pobyt o rosnącej długości – koszt nie zależy od liczby nocy
+            start = today + timedelta(days=i)
+            client.get(quote_url, {**batch_params, "start": start, "end": start + timedelta(days=7 + 15 * i)})
+
+        results["quote_api_batch"] = bench.measure(quote_batch, repeat)
+
+        account_url = reverse("account_reservations")
+        results["account_reservations"] = bench.measure(lambda i: client.get(account_url), repeat)
+        # kursor ostatniej strony: stronicowanie po kluczu nie skanuje poprzednich wierszy
+        history = Reservation.objects.filter(user=dataset.busiest_user).order_by("-start_date", "-created_at", "-id")
+        oldest = history[max(history.count() - 11, 0)]
+        deep_cursor = KeysetPaginator(history, 10).encode(oldest)
+        results["account_reservations_deep"] = bench.measure(
+            lambda i: client.get(account_url, {"after": deep_cursor}), repeat,
+        )
+        # strony publiczne bez cache szablonów (_nocache) i z nim: gość dostaje całą stronę, zalogowany fragmenty
+        guest = Client(SERVER_NAME="localhost")
+        for name in ("room_list", "about", "terms"):
+            page_url = reverse(name)
+            for who, c in (("guest", guest), ("user", client)):
+                with override_settings(TEMPLATE_CACHE_TIMEOUT=0):
+                    results[f"page_{name}_{who}_nocache"] = bench.measure(lambda i: c.get(page_url), repeat)
+                c.get(page_url)
+                results[f"page_{name}_{who}"] = bench.measure(lambda i: c.get(page_url), repeat)
+        return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,114 @@
+import json
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from hotel import bench
+from hotel.admin import ReservationAdmin
+from hotel.admin_utils import EstimatedCountPaginator
+from hotel.models import Profile, Reservation
+
+
+class LegacyReservationAdmin(ReservationAdmin):
+    """The changelist as configured before the fast mode, for comparison."""
+
+    list_filter = ("room__room_type", "room", "start_date", "end_date", "created_at")
+    search_fields = (
+        "dog_name", "user__email", "user__username", "user__first_name", "user__last_name",
+        "user__profile__phone_number",
+    )
+    date_hierarchy = "start_date"
+    show_full_result_count = True
+    paginator = Paginator
+
+    def get_search_results(self, request, queryset, search_term):
+        return admin.ModelAdmin.get_search_results(self, request, queryset, search_term)
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje listę rezerwacji w adminie (szybki tryb vs poprzednia konfiguracja) na wygenerowanych "
+        "danych: strona 1, głęboka strona, wyszukiwanie, filtr dat. Dane są wycofywane po pomiarze."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=300)
+        parser.add_argument("--users", type=int, default=20000)
+        parser.add_argument("--reservations", type=int, default=200000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="Zapisz wyniki do pliku JSON.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            dataset = bench.generate(
+                rooms=options["rooms"], users=options["users"], reservations=options["reservations"],
+                seed=options["seed"],
+            )
+            self.add_owner_details(dataset.users)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE hotel_reservation, auth_user, hotel_profile")
+            results = self.run_suite(dataset, options["repeat"])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"dane: {dataset.summary()}")
+        self.stdout.write(f"{'scenariusz':<16} {'tryb':<7} {'śr. ms':>9} {'p95 ms':>9} {'zapytań':>8}")
+        for name, modes in results.items():
+            for mode, r in modes.items():
+                self.stdout.write(f"{name:<16} {mode:<7} {r['mean_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['queries']:>8.1f}")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"vendor": connection.vendor, "dataset": dataset.summary(), "results": results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Zapisano {options['output']}"))
+
+    def add_owner_details(self, users):
+        for i, user in enumerate(users):
+            user.last_name = f"Nazwisko{i}"
+        get_user_model().objects.bulk_update(users, ["last_name"], batch_size=bench.BATCH_SIZE)
+        Profile.objects.bulk_create(
+            [Profile(user=user, phone_number=f"5{i:08d}") for i, user in enumerate(users)],
+            batch_size=bench.BATCH_SIZE,
+        )
+
+    def run_suite(self, dataset, repeat):
+        factory = RequestFactory()
+        staff = get_user_model().objects.create(username="bench-admin", is_staff=True, is_superuser=True)
+        today = timezone.localdate()
+        probe = dataset.users[len(dataset.users) // 2]
+        scenarios = {
+            "page_1": {},
+            # poza PostgreSQL szybki tryb nie zna liczby wierszy powyżej exact_limit
+            "page_deep": {"p": str(max(min(dataset.reservations, EstimatedCountPaginator.exact_limit) // 100, 1))},
+            "search_email": {"q": probe.email.split("@")[0] + "@"},
+            "search_surname": {"q": probe.last_name},
+            "search_phone": {"q": probe.profile.phone_number},
+            "search_dog": {"q": "Pies 4242"},
+            "date_range": {"start_date__gte": today.isoformat(), "start_date__lte": (today + timedelta(days=30)).isoformat()},
+        }
+        admins = {
+            "fast": ReservationAdmin(Reservation, admin.site),
+            "legacy": LegacyReservationAdmin(Reservation, admin.site),
+        }
+
+        def view(model_admin, params):
+            def run(i):
+                request = factory.get("/admin/hotel/reservation/", params)
+                request.user = staff
+                response = model_admin.changelist_view(request)
+                if response.status_code != 200:
+                    raise CommandError(f"{type(model_admin).__name__} {params}: HTTP {response.status_code}")
+                response.render()
+            return run
+
+        return {
+            name: {mode: bench.measure(view(model_admin, params), repeat) for mode, model_admin in admins.items()}
+            for name, params in scenarios.items()
+        }
@@ -0,0 +1,75 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from hotel.allocation import allocate_slots
+from hotel.models import Reservation, Room, RoomDaySlot
+
+
+def legacy_allocate(reservation):
+    """Poprzedni algorytm: osobny INSERT i savepoint dla każdego dnia i numeru slotu."""
+    for day in reservation._iter_days():
+        for slot_no in range(1, reservation.room.capacity + 1):
+            try:
+                with transaction.atomic():
+                    RoomDaySlot.objects.create(
+                        room=reservation.room, date=day, slot=slot_no, reservation=reservation,
+                    )
+                break
+            except IntegrityError:
+                continue
+
+
+class Command(BaseCommand):
+    help = "Porównuje liczbę zapytań i czas przydziału slotów: stara pętla vs przydział zbiorczy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nights", type=int, default=14)
+        parser.add_argument("--capacity", type=int, default=10)
+        parser.add_argument("--runs", type=int, default=10,
+                            help="Liczba rezerwacji na ten sam zakres (kolejne zajmują coraz wyższe sloty).")
+
+    def handle(self, *args, **options):
+        results = {}
+        for label, allocate in (("loop", legacy_allocate), ("bulk", allocate_slots)):
+            results[label] = self._run(allocate, options)
+
+        for label, (queries, latencies) in results.items():
+            self.stdout.write(
+                f"{label:>5}: zapytania/rezerwację śr. {statistics.mean(queries):.1f} (max {max(queries)}), "
+                f"czas śr. {statistics.mean(latencies):.2f} ms, p95 {_p95(latencies):.2f} ms"
+            )
+
+    def _run(self, allocate, options):
+        queries, latencies = [], []
+        # wszystko w jednej transakcji wycofywanej na końcu – benchmark nie zostawia danych
+        with transaction.atomic():
+            user = get_user_model().objects.create(username=f"bench-{time.time_ns()}")
+            room = Room.objects.create(name="Bench", room_type="yard", capacity=options["capacity"])
+            start = timezone.localdate() + timedelta(days=1)
+            end = start + timedelta(days=options["nights"] - 1)
+
+            for i in range(min(options["runs"], options["capacity"])):
+                # bulk_create omija Reservation.save, więc mierzymy wyłącznie przydział slotów
+                (reservation,) = Reservation.objects.bulk_create([
+                    Reservation(user=user, room=room, dog_name=f"Pies {i}", start_date=start, end_date=end)
+                ])
+                with CaptureQueriesContext(connection) as ctx:
+                    t0 = time.perf_counter()
+                    allocate(reservation)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                queries.append(len(ctx.captured_queries))
+
+            transaction.set_rollback(True)
+        return queries, latencies
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
@@ -0,0 +1,60 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+async def _load(url, total, concurrency, timeout):
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        async def one():
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.get(url)
+                    if resp.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+def _pct(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generator obciążenia HTTP do porównania wdrożeń, np. WSGI (:8000) i ASGI (:8001): "
+        "bench_http --target wsgi=http://localhost:8000/ --target asgi=http://localhost:8001/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", required=True, metavar="NAZWA=URL")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'cel':<10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'błędy':>7}")
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            url = url or name
+            elapsed, latencies, errors = asyncio.run(
+                _load(url, options["requests"], options["concurrency"], options["timeout"])
+            )
+            self.stdout.write(
+                f"{name:<10} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies):>9.1f} "
+                f"{_pct(latencies, 0.99):>9.1f} {errors:>7}"
+            )
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from hotel.allocation import iter_days
+from hotel.capacity import get_backend
+from hotel.models import Reservation, Room, RoomDayHistory, RoomDayOccupancy, RoomDaySlot
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Przenosi dane zajętości między backendami. --to range: sprawdza zakresy rezerwacji i usuwa "
+        "RoomDaySlot/RoomDayOccupancy; --to slots: odtwarza sloty i liczniki z rezerwacji (bez dni już "
+        "przeniesionych przez archive_slots)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--to", choices=["range", "slots"], required=True)
+        parser.add_argument("--keep-slots", action="store_true",
+                            help="Przy --to range nie usuwa wierszy slotów (np. na czas próbnego przełączenia).")
+
+    def handle(self, *args, **options):
+        target = options["to"]
+        if get_backend().name != target:
+            self.stdout.write(self.style.WARNING(
+                f"HOTEL_CAPACITY_BACKEND={get_backend().name}: ustaw {target} we wszystkich procesach, "
+                f"zanim nowe rezerwacje zaczną korzystać z przeniesionych danych."
+            ))
+
+        with transaction.atomic():
+            # blokada pokoi wstrzymuje nowe rezerwacje w obu backendach na czas konwersji
+            rooms = list(Room.objects.select_for_update().order_by("pk"))
+            # dni przeniesione przez archive_slots mają już podsumowanie w RoomDayHistory – nie wracają do slotów
+            last_archived = RoomDayHistory.objects.aggregate(last=Max("date"))["last"]
+            live_from = last_archived + timedelta(days=1) if last_archived else None
+            write = target == "slots"
+            if write:
+                self.live(RoomDaySlot.objects.all(), live_from).delete()
+                self.live(RoomDayOccupancy.objects.all(), live_from).delete()
+
+            problems, stays, counters = [], 0, 0
+            for room in rooms:
+                problem, room_stays, room_counters = self.convert_room(room, live_from, write)
+                stays += room_stays
+                counters += room_counters
+                if problem:
+                    problems.append(problem)
+            if problems:
+                for line in problems:
+                    self.stdout.write(line)
+                raise CommandError(
+                    f"Rezerwacje przekraczają pojemność w {len(problems)} pokojach – popraw je przed konwersją."
+                )
+
+            if target == "range":
+                self.to_range(options["keep_slots"])
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Gotowe. Rezerwacji: {stays}, liczników: {counters}"))
+
+    @staticmethod
+    def live(queryset, live_from):
+        return queryset.filter(date__gte=live_from) if live_from else queryset
+
+    def convert_room(self, room, live_from, write):
+        """
+        Checks (and with write, rebuilds slots and counters for) one room's stays from live_from on.
+
+        Stays are streamed in start_date order, so a day before the current
+        stay's start is final: its counter is emitted and it is dropped from
+        memory. Returns (problem or None, stays read, counters written).
+        """
+        queryset = Reservation.objects.filter(room=room).order_by("start_date", "pk")
+        if live_from:
+            queryset = queryset.filter(end_date__gte=live_from)
+        # najniższy wolny numer slotu na każdy dzień, jak w allocation.pick_free_slots
+        used, slots, counters = {}, [], []
+        stays = written = 0
+
+        def flush(force=False):
+            nonlocal slots, counters, written
+            if write and (force or len(slots) >= BATCH_SIZE):
+                RoomDaySlot.objects.bulk_create(slots, batch_size=BATCH_SIZE)
+                slots = []
+            if write and (force or len(counters) >= BATCH_SIZE):
+                RoomDayOccupancy.objects.bulk_create(counters, batch_size=BATCH_SIZE)
+                written += len(counters)
+                counters = []
+
+        for pk, start, end in queryset.values_list("pk", "start_date", "end_date").iterator(chunk_size=BATCH_SIZE):
+            stays += 1
+            if live_from:
+                start = max(start, live_from)
+            for day in [day for day in used if day < start]:
+                counters.append(RoomDayOccupancy(room=room, date=day, taken=len(used.pop(day))))
+            for day in iter_days(start, end):
+                taken = used.setdefault(day, set())
+                slot_no = next((n for n in range(1, room.capacity + 1) if n not in taken), None)
+                if slot_no is None:
+                    return f"{room}: więcej pobytów niż pojemność {room.capacity} dnia {day}", stays, written
+                taken.add(slot_no)
+                if write:
+                    slots.append(RoomDaySlot(room=room, date=day, slot=slot_no, reservation_id=pk))
+            flush()
+        counters.extend(RoomDayOccupancy(room=room, date=day, taken=len(taken)) for day, taken in used.items())
+        flush(force=True)
+        return None, stays, written
+
+    def to_range(self, keep_slots):
+        if keep_slots:
+            self.stdout.write(self.style.SUCCESS("Zakresy zgodne z pojemnością; sloty pozostawione."))
+            return
+        slots, _ = RoomDaySlot.objects.all().delete()
+        counters, _ = RoomDayOccupancy.objects.all().delete()
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Usunięto slotów: {slots}, liczników: {counters}"))
@@ -0,0 +1,45 @@
+import signal
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hotel import dbpool, mail_backends, outbox
+
+
+class Command(BaseCommand):
+    help = "Wysyła e-maile z OutboxMessage w pętli (SELECT ... FOR UPDATE SKIP LOCKED, ponowienia z opóźnieniem)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Opróżnij kolejkę raz i zakończ.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--poll", type=float, default=2.0, help="Przerwa (s), gdy kolejka jest pusta.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options["once"]:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+
+        while not self.stopping:
+            close_old_connections()
+            batch = outbox.claim_batch(options["batch_size"])
+            if not batch:
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+                continue
+
+            sent, failed = outbox.deliver(batch)
+            latencies = [m.delivery_ms for m in batch if m.delivery_ms is not None and m.status == m.SENT]
+            line = f"Wysłano: {sent}, błędy: {failed}"
+            if latencies:
+                line += f", opóźnienie dostarczenia śr. {statistics.mean(latencies):.0f} ms (max {max(latencies)} ms)"
+            self.stdout.write(line)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"SMTP: {mail_backends.stats()}")
+                self.stdout.write(f"DB: {dbpool.pool_stats()}")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
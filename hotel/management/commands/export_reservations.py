@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hotel import transfer
+
+
+class Command(BaseCommand):
+    help = "Strumieniowy eksport rezerwacji lub slotów do CSV/NDJSON (pamięć niezależna od rozmiaru tabeli)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(transfer.EXPORTS))
+        parser.add_argument("--format", choices=transfer.FORMATS, default="csv")
+        parser.add_argument("--output", default="-", help="Plik wynikowy; '-' = standardowe wyjście.")
+        parser.add_argument("--start", type=date.fromisoformat, help="Od dnia (YYYY-MM-DD).")
+        parser.add_argument("--end", type=date.fromisoformat, help="Do dnia (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        lines = transfer.export_lines(options["kind"], options["format"], options["start"], options["end"])
+        if options["output"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+        else:
+            try:
+                with open(options["output"], "w", encoding="utf-8", newline="") as out:
+                    out.writelines(lines)
+            except OSError as e:
+                raise CommandError(f"Nie można zapisać {options['output']}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"Zapisano {options['output']}"))
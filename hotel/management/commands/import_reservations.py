@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hotel import transfer
+
+# ile problemów wypisać, zanim skrócimy listę
+MAX_REPORTED = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Importuje rezerwacje z CSV/NDJSON (kolumny jak w export_reservations). Cały plik jest sprawdzany "
+        "z zajętością przed zapisem; rezerwacje i sloty zapisywane są wsadowo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=transfer.FORMATS,
+                            help="Domyślnie według rozszerzenia pliku (.ndjson/.jsonl albo CSV).")
+        parser.add_argument("--dry-run", action="store_true", help="Tylko walidacja, bez zapisu.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+        try:
+            with open(path, encoding="utf-8", newline="") as lines:
+                result = transfer.import_reservations(lines, fmt, dry_run=options["dry_run"])
+        except OSError as e:
+            raise CommandError(f"Nie można odczytać {path}: {e}")
+        except ValueError as e:
+            raise CommandError(f"Nieprawidłowy plik {fmt}: {e}")
+        except transfer.ImportErrors as e:
+            for line in e.problems[:MAX_REPORTED]:
+                self.stderr.write(line)
+            if len(e.problems) > MAX_REPORTED:
+                self.stderr.write(f"… i {len(e.problems) - MAX_REPORTED} więcej")
+            raise CommandError(f"{e} – nic nie zapisano.")
+
+        prefix = "Walidacja poprawna (bez zapisu)" if options["dry_run"] else "Zaimportowano"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: rezerwacji {result['reservations']}, slotów {result['slots']}."
+        ))
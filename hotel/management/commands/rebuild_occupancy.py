@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from hotel.capacity import get_backend
+from hotel.models import RoomDayOccupancy, RoomDaySlot
+
+
+class Command(BaseCommand):
+    help = "Przelicza liczniki RoomDayOccupancy na podstawie RoomDaySlot (z --verify tylko sprawdza zgodność)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true",
+                            help="Nie zapisuje zmian, kończy się błędem przy rozbieżnościach.")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        if get_backend().name != "slots":
+            raise CommandError("Liczniki są używane tylko przez HOTEL_CAPACITY_BACKEND=slots.")
+        # rezerwacje czekają na koniec przeliczenia – także te, które dopiero tworzą licznik (INSERT),
+        # więc na PostgreSQL blokujemy całą tabelę; EXCLUSIVE nie wstrzymuje zwykłych odczytów
+        current_counters = RoomDayOccupancy.objects.all()
+        if connection.vendor == "postgresql":
+            table = connection.ops.quote_name(RoomDayOccupancy._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+        else:
+            current_counters = current_counters.select_for_update()
+        current = {
+            (room_id, day): taken
+            for room_id, day, taken in current_counters.values_list("room_id", "date", "taken")
+        }
+        expected = {
+            (row["room_id"], row["date"]): row["taken"]
+            for row in RoomDaySlot.objects.values("room_id", "date").annotate(taken=Count("id")).order_by()
+        }
+
+        diff = {
+            key: (current.get(key, 0), expected.get(key, 0))
+            for key in current.keys() | expected.keys()
+            if current.get(key, 0) != expected.get(key, 0)
+        }
+
+        if options["verify"]:
+            for (room_id, day), (have, want) in sorted(diff.items()):
+                self.stdout.write(f"pokój {room_id} {day}: licznik {have}, sloty {want}")
+            if diff:
+                raise CommandError(f"Rozbieżności: {len(diff)}")
+            self.stdout.write(self.style.SUCCESS(f"Liczniki zgodne ({len(expected)} dni z rezerwacjami)."))
+            return
+
+        RoomDayOccupancy.objects.bulk_create(
+            [RoomDayOccupancy(room_id=room_id, date=day, taken=want) for (room_id, day), (_, want) in diff.items()],
+            update_conflicts=True,
+            unique_fields=["room", "date"],
+            update_fields=["taken"],
+            batch_size=1000,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Poprawiono liczników: {len(diff)}"))
@@ -0,0 +1,30 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hotel import weather
+
+
+class Command(BaseCommand):
+    help = "Odświeża pogodę w cache (jednorazowo lub w pętli z --loop); kilka lokalizacji pobiera równolegle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", action="append", default=None,
+                            help="Lokalizacja (można podać kilka razy).")
+        parser.add_argument("--loop", type=int, default=0, metavar="SEKUNDY",
+                            help="Odświeżaj co podaną liczbę sekund, aż do przerwania.")
+
+    def handle(self, *args, **options):
+        locations = options["location"] or [settings.WEATHER_LOCATION]
+        while True:
+            results = async_to_sync(weather.arefresh)(*locations)
+            missing = [location for location, data in results.items() if data is None]
+            for location in results.keys() - set(missing):
+                self.stdout.write(f"Pogoda dla {location} zapisana w cache.")
+            if missing and not options["loop"]:
+                raise CommandError(f"Nie udało się pobrać pogody dla: {', '.join(missing)}.")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from hotel import stress
+
+
+class Command(BaseCommand):
+    help = (
+        "Test obciążeniowy: wiele procesów jednocześnie rezerwuje nakładające się terminy w jednym pokoju. "
+        "Raportuje przepustowość, p50/p99, ponowienia i zakleszczenia; kończy się błędem przy przepełnieniu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--bookings", type=int, default=50, help="Rezerwacji na proces.")
+        parser.add_argument("--capacity", type=int, default=3)
+        parser.add_argument("--days", type=int, default=14, help="Okno dat, w którym losowane są początki pobytów.")
+        parser.add_argument("--max-nights", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Nie usuwa danych po teście.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(
+                f"Baza {connection.vendor}: wynik nie odzwierciedla zachowania produkcji (PostgreSQL)."
+            ))
+        report = stress.run(
+            workers=options["workers"], bookings=options["bookings"], capacity=options["capacity"],
+            days=options["days"], max_nights=options["max_nights"], seed=options["seed"], keep=options["keep"],
+        )
+
+        self.stdout.write(f"backend zajętości: {report['backend']}")
+        self.stdout.write(
+            f"{report['attempts']} prób w {report['seconds']} s ({report['throughput']}/s), "
+            f"p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms"
+        )
+        self.stdout.write(
+            f"przyjęte {report['ok']}, odrzucone (brak miejsc) {report['rejected']}, "
+            f"ponowienia IntegrityError {report['integrity_retries']}, zakleszczenia {report['deadlocks']}, "
+            f"konflikty serializacji {report['serialization']}, inne błędy {report['errors']}"
+        )
+        if report["overbooked"] or report["counter_drift"]:
+            for day, n in report["overbooked"]:
+                self.stdout.write(f"{day}: {n} pobytów ponad pojemność {options['capacity']}")
+            raise CommandError(
+                f"Przepełnione dni: {len(report['overbooked'])}, rozbieżne liczniki: {report['counter_drift']}"
+            )
+        self.stdout.write(self.style.SUCCESS("Brak przepełnień, liczniki zgodne ze slotami."))
@@ -0,0 +1,84 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from .instrumentation import QueryRecorder, install, recording
+
+logger = logging.getLogger("hotel.perf")
+
+
+class QueryStatsMiddleware:
+    """
+    Counts queries and DB time per request and flags repeated identical SQL.
+
+    Adds a Server-Timing header (db / app / total) and logs a JSON line to the
+    "hotel.perf" logger when a request is slower than PERF_SLOW_REQUEST_MS or
+    runs one statement at least PERF_REPEATED_QUERY_THRESHOLD times (N+1).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_INSTRUMENTATION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "PERF_SLOW_REQUEST_MS", 500)
+        self.repeated_threshold = getattr(settings, "PERF_REPEATED_QUERY_THRESHOLD", 5)
+        self.server_timing = getattr(settings, "PERF_SERVER_TIMING", settings.DEBUG)
+        connection_created.connect(install, dispatch_uid="hotel.instrumentation.install")
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        install(connection)
+        start = time.perf_counter()
+        with recording(QueryRecorder(keep_sql=True)) as recorder:
+            response = self.get_response(request)
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with recording(QueryRecorder(keep_sql=True)) as recorder:
+            response = await self.get_response(request)
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def report(self, request, response, recorder, elapsed):
+        total_ms = elapsed * 1000
+        db_ms = recorder.duration * 1000
+        if self.server_timing:
+            response.headers["Server-Timing"] = (
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+                f"app;dur={max(total_ms - db_ms, 0):.1f}, total;dur={total_ms:.1f}"
+            )
+
+        repeated = [
+            {"sql": sql[:300], "count": n}
+            for sql, n in recorder.statements.most_common(5)
+            if n >= self.repeated_threshold
+        ]
+        if total_ms < self.slow_ms and not repeated:
+            return
+        match = request.resolver_match
+        logger.warning(json.dumps({
+            "event": "slow_request" if total_ms >= self.slow_ms else "repeated_queries",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": recorder.count,
+            "repeated": repeated,
+        }, ensure_ascii=False))
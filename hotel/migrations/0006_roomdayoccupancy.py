@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_occupancy(apps, schema_editor):
+    RoomDaySlot = apps.get_model('hotel', 'RoomDaySlot')
+    RoomDayOccupancy = apps.get_model('hotel', 'RoomDayOccupancy')
+    rows = RoomDaySlot.objects.values('room_id', 'date').annotate(taken=Count('id')).order_by()
+    RoomDayOccupancy.objects.bulk_create(
+        (RoomDayOccupancy(room_id=r['room_id'], date=r['date'], taken=r['taken']) for r in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0005_roomdayslot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomDayOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('taken', models.PositiveIntegerField(default=0)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='hotel.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'date'), name='unique_room_date_occupancy')],
+            },
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+GIST_INDEX = 'reservation_room_range_gist'
+
+
+def create_gist_index(apps, schema_editor):
+    # tylko PostgreSQL: indeks zakresów dla capacity.overlapping()
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'")
+        has_btree_gist = cursor.fetchone() is not None
+    columns = "daterange(start_date, end_date, '[]')"
+    if has_btree_gist:
+        # z btree_gist room_id trafia do tego samego indeksu
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        columns = f'room_id, {columns}'
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {GIST_INDEX} ON hotel_reservation USING gist ({columns})')
+
+
+def drop_gist_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {GIST_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0007_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'end_date'], name='reservation_room_end_idx'),
+        ),
+        migrations.RunPython(create_gist_index, drop_gist_index),
+    ]
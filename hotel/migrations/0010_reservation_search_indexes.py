@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+# (nazwa, tabela, kolumna) – wyrażenie UPPER(kolumna::text) odpowiada temu, co Django generuje
+# dla istartswith/icontains w PostgreSQL, więc wyszukiwanie w adminie trafia w te indeksy
+SEARCH_COLUMNS = [
+    ('reservation_dog_name', 'hotel_reservation', 'dog_name'),
+    ('user_email', 'auth_user', 'email'),
+    ('user_last_name', 'auth_user', 'last_name'),
+    ('profile_phone', 'hotel_profile', 'phone_number'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        has_trgm = cursor.fetchone() is not None
+    if has_trgm:
+        # trigramy obsługują zarówno prefiks, jak i wyszukiwanie w środku tekstu
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in SEARCH_COLUMNS:
+        if has_trgm:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name}_trgm ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+            )
+        else:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name}_prefix ON {table} (UPPER({column}::text) text_pattern_ops)'
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}_trgm')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}_prefix')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0009_reservation_user_start_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['-start_date', '-created_at'], name='reservation_start_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0010_reservation_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='services',
+            field=models.ManyToManyField(blank=True, related_name='reservations', to='hotel.service'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='PriceOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('room_type', models.CharField(blank=True, choices=[('indoor', 'Pokój w domu'), ('kennel', 'Pojedynczy kojec'), ('yard', 'Wspólny wybieg')], max_length=100)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('price_per_day', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_overrides', to='hotel.room')),
+            ],
+            options={
+                'ordering': ['start_date', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+GIST_INDEX = 'waitlist_waiting_range_gist'
+
+
+def create_gist_index(apps, schema_editor):
+    # tylko PostgreSQL: indeks zakresów oczekujących wpisów dla capacity.overlapping()
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIST_INDEX} ON hotel_waitlistentry "
+        f"USING gist (daterange(start_date, end_date, '[]')) WHERE status = 'waiting'"
+    )
+
+
+def drop_gist_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {GIST_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0011_pricing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(blank=True, choices=[('indoor', 'Pokój w domu'), ('kennel', 'Pojedynczy kojec'), ('yard', 'Wspólny wybieg')], max_length=100)),
+                ('dog_name', models.CharField(max_length=50)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('notes', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('waiting', 'Oczekuje'), ('booked', 'Zarezerwowano'), ('cancelled', 'Anulowano')], default='waiting', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booked_at', models.DateTimeField(blank=True, null=True)),
+                ('reservation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='hotel.reservation')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='hotel.room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'waiting')), fields=['end_date', 'start_date'], name='waitlist_waiting_end_idx')],
+            },
+        ),
+        migrations.RunPython(create_gist_index, drop_gist_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0012_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomDaySlotArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_id', models.BigIntegerField()),
+                ('date', models.DateField(db_index=True)),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('reservation_id', models.BigIntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomDayHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('taken', models.PositiveIntegerField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='hotel.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'date'), name='unique_room_date_history')],
+            },
+        ),
+    ]
@@ -1,8 +1,13 @@
 from django.conf import settings
-from django.db import models, transaction, IntegrityError
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from datetime import timedelta
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .functions import DaysBetween
 
 
 
@@ -48,9 +53,55 @@ class Service(models.Model):
         return f"{self.name} - {self.price} zł"
 
 
+class PriceOverride(models.Model):
+    """
+    Per-day price for a date range (season, holiday), replacing Room.price_per_day.
+
+    Applies to one room, to every room of a type, or (neither set) to all rooms.
+    Where overrides overlap, a room override beats a type override, which beats
+    a hotel-wide one; within a level the most recently added wins.
+    """
+    label = models.CharField(max_length=100, blank=True)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, null=True, blank=True, related_name="price_overrides")
+    room_type = models.CharField(max_length=100, choices=Room.ROOM_TYPE_CHOICES, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    price_per_day = models.DecimalField(max_digits=8, decimal_places=2)
+
+    class Meta:
+        ordering = ["start_date", "id"]
+
+    def __str__(self):
+        target = self.room or self.get_room_type_display() or "wszystkie miejsca"
+        return f"{self.label or 'Cena'}: {target}, {self.start_date}–{self.end_date}, {self.price_per_day} zł"
+
+    def clean(self):
+        super().clean()
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            raise ValidationError("Data zakończenia nie może być wcześniejsza niż data rozpoczęcia.")
+        if self.room_id and self.room_type:
+            raise ValidationError("Wybierz konkretne miejsce albo typ miejsca, nie oba.")
+
+
 
 
 
+class ReservationQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotates nights (both end days inclusive, as on the confirmation page) and total price."""
+        return self.annotate(
+            nights=DaysBetween(F("end_date"), F("start_date")) + 1,
+            # cena zapisana przy rezerwacji; starsze wiersze – stawka bazowa pokoju
+            total=Coalesce(
+                F("total_price"),
+                ExpressionWrapper(
+                    F("nights") * F("room__price_per_day"),
+                    output_field=models.DecimalField(max_digits=10, decimal_places=2),
+                ),
+            ),
+        )
+
+
 class Reservation(models.Model):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reservations")
@@ -59,10 +110,23 @@ class Reservation(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     notes = models.TextField(blank=True)
+    services = models.ManyToManyField(Service, blank=True, related_name="reservations")
+    # wycena z chwili rezerwacji (hotel/pricing.py), razem z usługami
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ReservationQuerySet.as_manager()
+
     class Meta:
         ordering = ["-start_date", "-created_at"]
+        indexes = [
+            # domyślne sortowanie i filtr zakresu dat w adminie
+            models.Index(fields=["-start_date", "-created_at"], name="reservation_start_idx"),
+            # historia klienta: stronicowanie po kluczu (-start_date, -created_at, -id)
+            models.Index(fields=["user", "start_date", "created_at"], name="reservation_user_start_idx"),
+            # zapytania o nakładające się pobyty (capacity.overlapping) pomijają historię
+            models.Index(fields=["room", "end_date"], name="reservation_room_end_idx"),
+        ]
 
     def __str__(self):
         return f"{self.dog_name} • {self.room} • {self.start_date}–{self.end_date}"
@@ -90,6 +154,10 @@ class Reservation(models.Model):
     def save(self, *args, **kwargs):
         is_new = self.pk is None
         self.full_clean()
+        if is_new and self.total_price is None:
+            from .pricing import quote
+
+            self.total_price = quote(self.room_id, self.start_date, self.end_date).total
         super().save(*args, **kwargs)
 
 
@@ -102,28 +170,9 @@ class Reservation(models.Model):
 
     @transaction.atomic
     def allocate_daily_slots(self):
+        from .capacity import get_backend
 
-        for day in self._iter_days():
-            allocated = False
-            for slot_no in range(1, self.room.capacity + 1):
-                try:
-                    with transaction.atomic():
-                        RoomDaySlot.objects.create(
-                            room=self.room,
-                            date=day,
-                            slot=slot_no,
-                            reservation=self,
-                        )
-                    allocated = True
-                    break
-                except IntegrityError:
-
-                    continue
-
-            if not allocated:
-
-                RoomDaySlot.objects.filter(reservation=self).delete()
-                raise ValidationError(f"Brak wolnych miejsc w {self.room} dnia {day}.")
+        return get_backend().allocate(self)
 
     @transaction.atomic
     def delete(self, *args, **kwargs):
@@ -153,4 +202,143 @@ class RoomDaySlot(models.Model):
         return f"{self.room.name} @ {self.date} [slot {self.slot}] -> {self.reservation_id}"
 
 
+class RoomDayOccupancy(models.Model):
+    """Denormalized number of taken slots per room and day, kept in step with RoomDaySlot."""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="occupancy")
+    date = models.DateField()
+    taken = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "date"], name="unique_room_date_occupancy"),
+        ]
+
+    def __str__(self):
+        return f"{self.room.name} @ {self.date}: {self.taken}/{self.room.capacity}"
+
 
+class RoomDayHistory(models.Model):
+    """Per-room, per-day occupancy kept for past days after their RoomDaySlot rows are archived."""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="history")
+    date = models.DateField()
+    taken = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "date"], name="unique_room_date_history"),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} @ {self.date}: {self.taken}/{self.capacity}"
+
+
+class RoomDaySlotArchive(models.Model):
+    """
+    Detail rows moved out of RoomDaySlot by manage.py archive_slots.
+
+    Plain ids instead of foreign keys: the archive is write-once and must not
+    slow down deleting rooms or reservations.
+    """
+    room_id = models.BigIntegerField()
+    date = models.DateField(db_index=True)
+    slot = models.PositiveSmallIntegerField()
+    reservation_id = models.BigIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.room_id} @ {self.date} [slot {self.slot}] -> {self.reservation_id}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    Request for a place that was full: one room, or any room of a type.
+
+    When a cancellation frees places, hotel/waitlist.py books the entries that
+    now fit (oldest first) and e-mails their owners.
+    """
+    WAITING = "waiting"
+    BOOKED = "booked"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (WAITING, "Oczekuje"),
+        (BOOKED, "Zarezerwowano"),
+        (CANCELLED, "Anulowano"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, null=True, blank=True, related_name="waitlist_entries")
+    room_type = models.CharField(max_length=100, choices=Room.ROOM_TYPE_CHOICES, blank=True)
+    dog_name = models.CharField(max_length=50)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    notes = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=WAITING)
+    reservation = models.OneToOneField(
+        Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name="waitlist_entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    booked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            # dopasowanie po anulowaniu czyta tylko oczekujące wpisy kończące się po zwolnionym dniu
+            models.Index(
+                fields=["end_date", "start_date"],
+                condition=models.Q(status="waiting"),
+                name="waitlist_waiting_end_idx",
+            ),
+        ]
+
+    def __str__(self):
+        target = self.room or self.get_room_type_display()
+        return f"{self.dog_name} • {target} • {self.start_date}–{self.end_date} [{self.status}]"
+
+    def clean(self):
+        super().clean()
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            raise ValidationError("Data zakończenia nie może być wcześniejsza niż data rozpoczęcia.")
+        if bool(self.room_id) == bool(self.room_type):
+            raise ValidationError("Wybierz konkretne miejsce albo typ miejsca.")
+
+
+class OutboxMessage(models.Model):
+    """E-mail written in the request transaction and delivered later by manage.py deliver_outbox."""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Oczekuje"),
+        (SENDING, "Wysyłanie"),
+        (SENT, "Wysłano"),
+        (FAILED, "Błąd"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    delivery_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} [{self.status}]"
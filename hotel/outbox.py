@@ -0,0 +1,153 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(message):
+    """
+    Stores an EmailMessage/EmailMultiAlternatives in the outbox instead of sending it.
+
+    Call it inside the transaction that produced the e-mail: the message is
+    delivered only if that transaction commits.
+    """
+    html_body = next(
+        (content for content, mimetype in getattr(message, "alternatives", []) if mimetype == "text/html"),
+        "",
+    )
+    return OutboxMessage.objects.create(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=message.from_email or "",
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+def to_email(outbox_message, connection=None):
+    msg = EmailMultiAlternatives(
+        subject=outbox_message.subject,
+        body=outbox_message.body,
+        from_email=outbox_message.from_email or None,
+        to=outbox_message.to,
+        cc=outbox_message.cc,
+        bcc=outbox_message.bcc,
+        reply_to=outbox_message.reply_to,
+        headers=outbox_message.headers,
+        connection=connection,
+    )
+    if outbox_message.html_body:
+        msg.attach_alternative(outbox_message.html_body, "text/html")
+    return msg
+
+
+def backoff(attempts):
+    """Delay before the next attempt: 30 s, 1 min, 2 min, ... capped at one hour."""
+    base = _setting("OUTBOX_RETRY_BASE", 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), _setting("OUTBOX_RETRY_MAX", 60 * 60)))
+
+
+def claim_batch(size=None):
+    """
+    Claims up to `size` due messages for this worker.
+
+    SELECT ... FOR UPDATE SKIP LOCKED lets several workers claim disjoint
+    batches. Messages stuck in "sending" longer than OUTBOX_LEASE seconds
+    (a worker died mid-batch) are claimed again.
+    """
+    size = size or _setting("OUTBOX_BATCH_SIZE", 50)
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("OUTBOX_LEASE", 5 * 60))
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutboxMessage.PENDING, next_attempt_at__lte=now)
+                | Q(status=OutboxMessage.SENDING, claimed_at__lt=stale)
+            )
+            .order_by("next_attempt_at", "id")[:size]
+        )
+        OutboxMessage.objects.filter(pk__in=[m.pk for m in batch]).update(
+            status=OutboxMessage.SENDING, claimed_at=now,
+        )
+    return batch
+
+
+def deliver(batch, connection=None):
+    """
+    Sends a claimed batch with one send_messages() call; returns (sent, failed) counts.
+
+    Per-message results come from the backend's `failures` ({index: error})
+    and `sent` (indexes handed to the server), see PooledSMTPBackend. Any
+    other error requeues every message not confirmed as sent, so a backend
+    without those reports that raises fails the whole batch.
+    """
+    max_attempts = _setting("OUTBOX_MAX_ATTEMPTS", 8)
+    connection = connection or get_connection()
+
+    try:
+        connection.open()
+    except Exception as e:
+        # bez połączenia cała paczka wraca do kolejki z opóźnieniem
+        for message in batch:
+            _mark_failed(message, e, max_attempts)
+        return 0, len(batch)
+
+    error = None
+    try:
+        connection.send_messages([to_email(message, connection) for message in batch])
+    except Exception as e:
+        error = e
+    finally:
+        connection.close()
+    failures = dict(getattr(connection, "failures", None) or {})
+    if error is not None and not any(error is failure for failure in failures.values()):
+        # błąd spoza raportu backendu przerwał paczkę: wraca wszystko, czego backend nie potwierdził
+        confirmed = set(getattr(connection, "sent", None) or ())
+        for index in range(len(batch)):
+            if index not in confirmed:
+                failures.setdefault(index, error)
+
+    now = timezone.now()
+    delivered = []
+    for index, message in enumerate(batch):
+        if index in failures:
+            _mark_failed(message, failures[index], max_attempts)
+            continue
+        message.status = OutboxMessage.SENT
+        message.sent_at = now
+        message.attempts += 1
+        message.delivery_ms = int((now - message.created_at).total_seconds() * 1000)
+        message.last_error = ""
+        delivered.append(message)
+    OutboxMessage.objects.bulk_update(delivered, ["status", "sent_at", "attempts", "delivery_ms", "last_error"])
+    return len(delivered), len(failures)
+
+
+def _mark_failed(message, error, max_attempts):
+    message.attempts += 1
+    message.last_error = f"{type(error).__name__}: {error}"[:2000]
+    if message.attempts >= max_attempts:
+        message.status = OutboxMessage.FAILED
+    else:
+        message.status = OutboxMessage.PENDING
+        message.next_attempt_at = timezone.now() + backoff(message.attempts)
+    message.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+    logger.warning("Outbox message %s failed (attempt %s): %s", message.pk, message.attempts, message.last_error)
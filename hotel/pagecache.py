@@ -0,0 +1,44 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import translation
+
+from .versions import catalog_version
+
+PAGE_KEY = "page:{}:{}:{}"
+
+
+def template_cache(request):
+    """Context processor: expiry for the {% cache %} fragments in the layout and public pages."""
+    return {"fragment_cache_timeout": getattr(settings, "TEMPLATE_CACHE_TIMEOUT", 600)}
+
+
+def cache_public_page(name):
+    """
+    Serves the rendered page to anonymous GET/HEAD requests from the shared cache.
+
+    The key holds the page name, the active language and the Room catalog
+    version, so saving or deleting a room switches every page to a new key
+    and the old copies just expire. Logged-in users always get a fresh render
+    (their navbar is personal and carries a CSRF token); the shared parts of
+    it still come from fragment caches. TEMPLATE_CACHE_TIMEOUT = 0 turns both off.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, "TEMPLATE_CACHE_TIMEOUT", 600)
+            if not timeout or request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = PAGE_KEY.format(name, translation.get_language(), catalog_version())
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, response.content, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over a descending (field, field, ..., "id") ordering.
+
+    Instead of COUNT(*) and OFFSET, each page continues from the key of the
+    last row shown ("after") or of the first one ("before"), so with an index
+    on the ordering every page costs the same as the first. Cursors are opaque
+    strings for the query string; an invalid cursor gives the first page.
+    """
+
+    def __init__(self, queryset, per_page, fields=("start_date", "created_at", "id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = fields
+
+    def encode(self, obj):
+        key = [getattr(obj, f) for f in self.fields]
+        raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in key])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if len(values) != len(self.fields):
+                return None
+            return [
+                self.queryset.model._meta.get_field(f).to_python(v)
+                for f, v in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _seek(self, key, older):
+        # (a, b, c) < (x, y, z)  ==  a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)
+        op = "lt" if older else "gt"
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            equal = {f: v for f, v in zip(self.fields[:i], key[:i])}
+            condition |= Q(**equal, **{f"{field}__{op}": key[i]})
+        # ograniczenie na pierwszej kolumnie zawęża skan indeksu
+        bound = {f"{self.fields[0]}__{op}e": key[0]}
+        return self.queryset.filter(condition, **bound)
+
+    def get_page(self, after=None, before=None):
+        descending = [f"-{f}" for f in self.fields]
+        ascending = list(self.fields)
+        after_key = self.decode(after) if after else None
+        before_key = self.decode(before) if before else None
+
+        if before_key is not None:
+            rows = list(self._seek(before_key, older=False).order_by(*ascending)[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(
+                rows,
+                next_cursor=self.encode(rows[-1]) if rows else None,
+                previous_cursor=self.encode(rows[0]) if rows and has_more else None,
+            )
+
+        qs = self._seek(after_key, older=True) if after_key is not None else self.queryset
+        rows = list(qs.order_by(*descending)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode(rows[-1]) if rows and has_more else None,
+            previous_cursor=self.encode(rows[0]) if rows and after_key is not None else None,
+        )
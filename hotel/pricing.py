@@ -0,0 +1,162 @@
+import threading
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .catalog import get_catalog
+from .models import PriceOverride, Room
+from .versions import price_version
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount):
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_cents(cents):
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+class Quote(NamedTuple):
+    """Price of one stay: nights (both end days inclusive), stay and add-on totals."""
+    room_id: int
+    start: object
+    end: object
+    nights: int
+    stay: Decimal
+    services: Decimal
+
+    @property
+    def total(self):
+        return self.stay + self.services
+
+    def as_dict(self):
+        return {
+            "room": self.room_id,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "nights": self.nights,
+            "stay": self.stay,
+            "services": self.services,
+            "total": self.total,
+        }
+
+
+class PriceCalendar:
+    """
+    Nightly prices of every room over [first, last] as cumulative sums in cents.
+
+    prefix[room][i] is the price of the first i days, so a stay costs
+    prefix[end + 1] - prefix[start] whatever its length. Stays reaching past
+    the horizon are priced day by day from the same overrides.
+    """
+
+    def __init__(self, key, first, days, rooms, overrides):
+        self.key = key
+        self.first = first
+        self.last = first + timedelta(days=days - 1)
+        self.rooms = {room.id: room for room in rooms}
+        # (poziom, id) rosnąco: późniejsze nadpisują wcześniejsze
+        self.overrides = sorted(overrides, key=lambda o: (_level(o), o[0]))
+        self.prefix = {}
+        for room in rooms:
+            prefix, running = array("q", [0]), 0
+            for cents in self._daily(room, self.first, self.last):
+                running += cents
+                prefix.append(running)
+            self.prefix[room.id] = prefix
+
+    def _daily(self, room, start, end):
+        span = (end - start).days + 1
+        daily = [to_cents(room.price_per_day)] * span
+        for _, room_id, room_type, o_start, o_end, cents in self.overrides:
+            if (room_id and room_id != room.id) or (room_type and room_type != room.room_type):
+                continue
+            lo = max((o_start - start).days, 0)
+            hi = min((o_end - start).days, span - 1)
+            if lo <= hi:
+                daily[lo:hi + 1] = [cents] * (hi - lo + 1)
+        return daily
+
+    def stay_cents(self, room_id, start, end):
+        room = self.rooms.get(room_id)
+        if room is None:
+            # pokój spoza katalogu tego procesu: dodany w bieżącej transakcji albo katalog jeszcze nieodświeżony
+            room = Room.objects.only("id", "room_type", "price_per_day").filter(pk=room_id).first()
+            if room is None:
+                raise Room.DoesNotExist(f"Nie ma pokoju o id {room_id}.")
+            return sum(self._daily(room, start, end))
+        if self.first <= start and end <= self.last:
+            prefix = self.prefix[room_id]
+            return prefix[(end - self.first).days + 1] - prefix[(start - self.first).days]
+        return sum(self._daily(room, start, end))
+
+
+def _level(override):
+    _, room_id, room_type, *_ = override
+    return 2 if room_id else 1 if room_type else 0
+
+
+_calendar = None
+_lock = threading.Lock()
+
+
+def get_calendar():
+    """
+    Returns this process' price calendar, rebuilt when prices, rooms or the day change.
+
+    Like the Room catalog, the steady state costs cache reads only; PriceOverride
+    and Room signals bump the shared versions so every worker rebuilds.
+    """
+    global _calendar
+    catalog = get_catalog()
+    first = timezone.localdate()
+    days = getattr(settings, "PRICE_HORIZON_DAYS", 2 * 365)
+    key = (price_version(), catalog.version, first, days)
+    calendar = _calendar
+    if calendar is not None and calendar.key == key:
+        return calendar
+
+    with _lock:
+        if _calendar is None or _calendar.key != key:
+            overrides = [
+                (pk, room_id, room_type, start, end, to_cents(price))
+                for pk, room_id, room_type, start, end, price in PriceOverride.objects.values_list(
+                    "pk", "room_id", "room_type", "start_date", "end_date", "price_per_day",
+                )
+            ]
+            _calendar = PriceCalendar(key, first, days, catalog.rooms, overrides)
+        return _calendar
+
+
+def quote_many(stays, services=()):
+    """
+    Prices (room_id, start, end) stays with one calendar lookup; returns a list of Quote.
+
+    `services` are Service instances added once to every stay.
+    """
+    calendar = get_calendar()
+    services_total = sum((s.price for s in services), Decimal(0)).quantize(CENT)
+    quotes = []
+    for room_id, start, end in stays:
+        if end < start:
+            raise ValueError("Data zakończenia nie może być wcześniejsza niż data rozpoczęcia.")
+        quotes.append(Quote(
+            room_id=room_id,
+            start=start,
+            end=end,
+            nights=(end - start).days + 1,
+            stay=from_cents(calendar.stay_cents(room_id, start, end)),
+            services=services_total,
+        ))
+    return quotes
+
+
+def quote(room_id, start, end, services=()):
+    """Prices a single stay; see quote_many()."""
+    return quote_many([(room_id, start, end)], services)[0]
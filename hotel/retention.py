@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import RoomDayHistory, RoomDayOccupancy, RoomDaySlot, RoomDaySlotArchive
+
+DAYS_PER_BATCH = 31
+
+
+def _copy_to_archive(start, end):
+    # INSERT … SELECT: wiersze nie przechodzą przez Pythona
+    qn = connection.ops.quote_name
+    slots = qn(RoomDaySlot._meta.db_table)
+    archive = qn(RoomDaySlotArchive._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {archive} (room_id, date, slot, reservation_id, archived_at) "
+            f"SELECT room_id, date, slot, reservation_id, %s FROM {slots} WHERE date >= %s AND date < %s",
+            [connection.ops.adapt_datetimefield_value(timezone.now()), start, end],
+        )
+        return cursor.rowcount
+
+
+def archive_batch(start, end, keep_detail=True):
+    """
+    Moves RoomDaySlot rows dated [start, end) out of the live table in one transaction.
+
+    Per-room, per-day counts go to RoomDayHistory (with the room's capacity at
+    archive time), the detail rows to RoomDaySlotArchive unless keep_detail is
+    False, and the matching RoomDayOccupancy counters are dropped.
+    Returns (days summarized, slot rows moved).
+    """
+    with transaction.atomic():
+        counts = (
+            RoomDaySlot.objects.filter(date__gte=start, date__lt=end)
+            .values("room_id", "date", "room__capacity").annotate(taken=Count("id")).order_by()
+        )
+        summary = [
+            RoomDayHistory(
+                room_id=row["room_id"], date=row["date"], taken=row["taken"], capacity=row["room__capacity"],
+            )
+            for row in counts
+        ]
+        RoomDayHistory.objects.bulk_create(
+            summary, update_conflicts=True, unique_fields=["room", "date"], update_fields=["taken", "capacity"],
+        )
+        if keep_detail:
+            _copy_to_archive(start, end)
+        moved, _ = RoomDaySlot.objects.filter(date__gte=start, date__lt=end).delete()
+        RoomDayOccupancy.objects.filter(date__gte=start, date__lt=end).delete()
+    return len(summary), moved
+
+
+def archive_before(cutoff, days_per_batch=DAYS_PER_BATCH, keep_detail=True):
+    """
+    Archives every RoomDaySlot dated before cutoff, oldest first, in batches of days.
+
+    Each batch is its own short transaction, so bookings are never blocked
+    for the whole run. Yields (batch start, batch end, days, rows) per batch.
+    """
+    oldest = RoomDaySlot.objects.filter(date__lt=cutoff).aggregate(first=Min("date"))["first"]
+    if oldest is None:
+        return
+    start = oldest
+    while start < cutoff:
+        end = min(start + timedelta(days=days_per_batch), cutoff)
+        days, rows = archive_batch(start, end, keep_detail)
+        yield start, end, days, rows
+        start = end
+
+
+def history_matrix(room_ids, start, end):
+    """Returns {room_id: {date: taken}} from RoomDayHistory for archived days in [start, end]."""
+    history = {room_id: {} for room_id in room_ids}
+    rows = (
+        RoomDayHistory.objects
+        .filter(room__in=list(history), date__gte=start, date__lte=end)
+        .values_list("room_id", "date", "taken")
+    )
+    for room_id, day, taken in rows:
+        history[room_id][day] = taken
+    return history
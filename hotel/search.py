@@ -0,0 +1,114 @@
+from datetime import timedelta
+from typing import NamedTuple
+
+from .capacity import get_backend
+from .catalog import RoomRecord, get_catalog
+from .pricing import Quote, quote_many
+
+
+class Match(NamedTuple):
+    """A room with `free` places on every night of the searched range, priced for one dog."""
+    room: RoomRecord
+    free: int
+    quote: Quote
+
+    def as_dict(self, dogs=1):
+        return {
+            "room": self.room.id,
+            "room_name": self.room.name,
+            "room_type": self.room.room_type,
+            "capacity": self.room.capacity,
+            "free": self.free,
+            "nights": self.quote.nights,
+            "price": self.quote.total,
+            "total": self.quote.total * dogs,
+        }
+
+
+def best_available(start, end, room_type=None, dogs=1, room_ids=None):
+    """
+    Rooms with at least `dogs` free places on every night of [start, end], cheapest first.
+
+    Occupancy is read with one grouped query (peak taken per room over the
+    range); rooms come from the in-process catalog and prices from the price
+    calendar, so neither costs a query.
+    """
+    catalog = get_catalog()
+    rooms = catalog.of_type(room_type) if room_type else catalog.rooms
+    if room_ids is not None:
+        rooms = [room for room in rooms if room.id in room_ids]
+    rooms = [room for room in rooms if room.capacity >= dogs]
+    if not rooms:
+        return []
+
+    peaks = get_backend().peak_taken([room.id for room in rooms], start, end)
+    fitting = [(room, room.capacity - peaks[room.id]) for room in rooms if room.capacity - peaks[room.id] >= dogs]
+    quotes = quote_many([(room.id, start, end) for room, _ in fitting])
+    matches = [Match(room, free, q) for (room, free), q in zip(fitting, quotes)]
+    matches.sort(key=lambda m: (m.quote.total, m.room.name, m.room.id))
+    return matches
+
+
+class Window(NamedTuple):
+    """First stay of the requested length that fits in `room`."""
+    room: RoomRecord
+    start: object
+    end: object
+    quote: Quote
+
+    def as_dict(self):
+        return {
+            "room": self.room.id,
+            "room_name": self.room.name,
+            "room_type": self.room.room_type,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "nights": self.quote.nights,
+            "price": self.quote.total,
+        }
+
+
+def first_fit(free, nights, places):
+    """Index of the first run of `nights` days with at least `places` free each, or None (single pass)."""
+    run = 0
+    for i, n in enumerate(free):
+        run = run + 1 if n >= places else 0
+        if run == nights:
+            return i - nights + 1
+    return None
+
+
+def earliest_window(start, within, nights, room_id=None, room_type=None, places=1):
+    """
+    Earliest `nights`-night stay (both end days counted) starting in [start, start + within).
+
+    Occupancy of all candidate rooms over the whole search span comes from the
+    capacity backend in one query; each room's free-places row is then scanned
+    once. Ties on the start date go to the cheaper room.
+    """
+    catalog = get_catalog()
+    if room_id is not None:
+        room = catalog.get(room_id)
+        rooms = [room] if room else []
+    else:
+        rooms = catalog.of_type(room_type) if room_type else catalog.rooms
+    rooms = [room for room in rooms if room.capacity >= places]
+    if not rooms:
+        return None
+
+    end = start + timedelta(days=within + nights - 2)
+    taken = get_backend().taken_matrix([room.id for room in rooms], start, end)
+    fits = []
+    for room in rooms:
+        offset = first_fit([room.capacity - n for n in taken[room.id]], nights, places)
+        if offset is not None:
+            day = start + timedelta(days=offset)
+            fits.append((room, day, day + timedelta(days=nights - 1)))
+    if not fits:
+        return None
+
+    first = min(day for _, day, _ in fits)
+    fits = [fit for fit in fits if fit[1] == first]
+    quotes = quote_many([(room.id, day, last) for room, day, last in fits])
+    windows = [Window(room, day, last, q) for (room, day, last), q in zip(fits, quotes)]
+    return min(windows, key=lambda w: (w.quote.total, w.room.name, w.room.id))
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import waitlist
+from .capacity import get_backend
+from .models import PriceOverride, Reservation, Room
+from .versions import bump_catalog_version, bump_occupancy_version, bump_price_version
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    # działa też przy usuwaniu zbiorczym (akcja w adminie, kaskada z User)
+    get_backend().release(instance)
+    # zwolnione miejsca od razu trafiają do listy oczekujących (po zatwierdzeniu transakcji)
+    waitlist.schedule_match(instance)
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, **kwargs):
+    # zmiana pojemności zmienia liczbę wolnych miejsc
+    bump_occupancy_version(instance.pk)
+    bump_catalog_version()
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=PriceOverride)
+@receiver(post_delete, sender=PriceOverride)
+def price_override_changed(sender, instance, **kwargs):
+    bump_price_version()
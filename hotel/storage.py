@@ -0,0 +1,51 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # bez pakietu Brotli powstają tylko pliki .gz
+    brotli = None
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Content-hashed static files with a manifest, plus .gz and .br copies of text assets.
+
+    The compressed files sit next to each hashed file so nginx can serve them
+    with gzip_static / brotli_static instead of compressing on every request.
+    A hashed name fixes the content, so a variant that already exists is kept
+    as is: repeated collectstatic runs only compress files that changed.
+    """
+
+    compress_extensions = (".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".xml", ".html", ".ico")
+    min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception) and self._compress(hashed_name):
+                processed = True
+            yield name, hashed_name, processed
+
+    def _compress(self, name):
+        """Writes missing .gz/.br variants of a hashed file; returns whether anything was written."""
+        if not name.lower().endswith(self.compress_extensions):
+            return False
+        encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+        missing = [(suffix, encode) for suffix, encode in encoders if not self.exists(name + suffix)]
+        if not missing or self.size(name) < self.min_size:
+            return False
+
+        with self.open(name) as f:
+            data = f.read()
+        written = False
+        for suffix, encode in missing:
+            compressed = encode(data)
+            # nie zapisujemy wariantu, który niczego nie oszczędza
+            if len(compressed) < len(data):
+                self._save(name + suffix, ContentFile(compressed))
+                written = True
+        return written
@@ -0,0 +1,158 @@
+import multiprocessing
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, connections
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import allocation
+from .capacity import get_backend, sweep
+from .models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+
+DEADLOCK = "40P01"
+SERIALIZATION_FAILURE = "40001"
+
+
+def _sqlstate(error):
+    cause = error.__cause__
+    return getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+
+
+def _worker(worker_id, room_id, user_id, bookings, days, max_nights, seed, barrier, results):
+    # po forku każdy proces otwiera własne połączenie
+    connections.close_all()
+    allocation.stats.clear()
+    rnd = random.Random(seed * 1000 + worker_id)
+    room = Room.objects.get(pk=room_id)
+    first_day = timezone.localdate() + timedelta(days=30)
+    outcome = {"ok": 0, "rejected": 0, "deadlocks": 0, "serialization": 0, "errors": 0, "latencies": []}
+
+    barrier.wait()
+    for _ in range(bookings):
+        start = first_day + timedelta(days=rnd.randrange(days))
+        reservation = Reservation(
+            user_id=user_id, room=room, dog_name=f"Stress {worker_id}",
+            start_date=start, end_date=start + timedelta(days=rnd.randrange(max_nights)),
+        )
+        t0 = time.perf_counter()
+        try:
+            reservation.save()
+            outcome["ok"] += 1
+        except ValidationError:
+            outcome["rejected"] += 1
+        except OperationalError as e:
+            state = _sqlstate(e)
+            if state == DEADLOCK:
+                outcome["deadlocks"] += 1
+            elif state == SERIALIZATION_FAILURE:
+                outcome["serialization"] += 1
+            else:
+                outcome["errors"] += 1
+        except IntegrityError:
+            outcome["errors"] += 1
+        outcome["latencies"].append((time.perf_counter() - t0) * 1000)
+
+    outcome["integrity_retries"] = allocation.stats["integrity_retries"]
+    connection.close()
+    results.put(outcome)
+
+
+def overbooked(room):
+    """
+    Returns [(date, booked)] for days where the room holds more stays than its capacity.
+
+    Checks the reservations themselves (independent of the capacity backend)
+    as well as the slot rows and counters of the slot backend.
+    """
+    stays = list(Reservation.objects.filter(room=room).values_list("start_date", "end_date"))
+    found = set()
+    if stays:
+        start = min(s for s, _ in stays)
+        end = max(e for _, e in stays)
+        found.update(
+            (start + timedelta(days=i), n) for i, n in enumerate(sweep(stays, start, end)) if n > room.capacity
+        )
+    found.update(
+        RoomDaySlot.objects.filter(room=room)
+        .values("date").annotate(n=Count("id")).filter(n__gt=room.capacity)
+        .values_list("date", "n")
+    )
+    found.update(
+        RoomDayOccupancy.objects.filter(room=room, taken__gt=F("room__capacity")).values_list("date", "taken")
+    )
+    return sorted(found)
+
+
+def run(workers=8, bookings=50, capacity=3, days=14, max_nights=5, seed=1, keep=False):
+    """
+    Fires `workers` processes, each saving `bookings` reservations for random
+    overlapping ranges in one shared room, all starting at the same moment.
+
+    Needs a database that other processes can see (committed data, no test
+    transaction) – in practice PostgreSQL. Returns a report dict; the check
+    that matters is report["overbooked"] == [].
+    """
+    User = get_user_model()
+    tag = f"stress-{time.time_ns()}"
+    room = Room.objects.create(name=tag, room_type=Room.ROOM_TYPE_CHOICES[0][0], capacity=capacity, price_per_day=100)
+    user = User.objects.create(username=tag, email=f"{tag}@example.com", password="!")
+
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    connections.close_all()
+    processes = [
+        ctx.Process(target=_worker, args=(i, room.pk, user.pk, bookings, days, max_nights, seed, barrier, results))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - t0
+    for p in processes:
+        p.join()
+
+    latencies = sorted(ms for o in outcomes for ms in o["latencies"])
+    totals = {
+        key: sum(o[key] for o in outcomes)
+        for key in ("ok", "rejected", "deadlocks", "serialization", "errors", "integrity_retries")
+    }
+    report = {
+        "vendor": connection.vendor,
+        "backend": get_backend().name,
+        "workers": workers,
+        "attempts": len(latencies),
+        **totals,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2) if latencies else None,
+        "overbooked": [(day.isoformat(), n) for day, n in overbooked(room)],
+        "counter_drift": _counter_drift(room),
+    }
+
+    if not keep:
+        for reservation in Reservation.objects.filter(room=room):
+            reservation.delete()
+        room.delete()
+        user.delete()
+    return report
+
+
+def _counter_drift(room):
+    """Number of days whose RoomDayOccupancy counter differs from the slot count."""
+    slots = dict(
+        RoomDaySlot.objects.filter(room=room).values("date").annotate(n=Count("id")).values_list("date", "n")
+    )
+    counters = {
+        day: taken for day, taken in
+        RoomDayOccupancy.objects.filter(room=room).values_list("date", "taken") if taken
+    }
+    return sum(1 for day in slots.keys() | counters.keys() if slots.get(day, 0) != counters.get(day, 0))
@@ -0,0 +1,264 @@
+import csv
+import json
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+
+from .allocation import iter_days, lock_occupancy, pick_free_slots
+from .capacity import get_backend, sweep
+from .catalog import get_catalog
+from .models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+from .pricing import quote_many
+from .versions import bump_occupancy_version
+
+CHUNK_SIZE = 2000
+ASYNC_BATCH_LINES = 500
+BATCH_SIZE = 5000
+FORMATS = ("csv", "ndjson")
+
+# kolumny eksportu; import czyta user, room_id, dog_name, start_date, end_date i opcjonalnie notes, total_price
+EXPORTS = {
+    "reservations": (
+        Reservation.objects.order_by("pk"),
+        ("id", "user__email", "user__username", "room_id", "room__name", "dog_name",
+         "start_date", "end_date", "notes", "total_price", "created_at"),
+        ("id", "user_email", "user", "room_id", "room_name", "dog_name",
+         "start_date", "end_date", "notes", "total_price", "created_at"),
+    ),
+    "slots": (
+        RoomDaySlot.objects.order_by("pk"),
+        ("room_id", "date", "slot", "reservation_id"),
+        ("room_id", "date", "slot", "reservation_id"),
+    ),
+}
+
+
+class _Echo:
+    """File-like object handing csv.writer's output straight back (no buffering)."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(kind, start=None, end=None):
+    """
+    Yields export rows (tuples) for "reservations" or "slots", optionally limited to dates.
+
+    Reads with a server-side cursor in CHUNK_SIZE chunks, so memory use does
+    not depend on the table size.
+    """
+    queryset, fields, _ = EXPORTS[kind]
+    date_field = "date" if kind == "slots" else "start_date"
+    if start:
+        queryset = queryset.filter(**{f"{date_field}__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{date_field}__lte": end})
+    return queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def export_lines(kind, fmt, start=None, end=None):
+    """Yields the export as text lines: a CSV header and rows, or one JSON object per line."""
+    columns = EXPORTS[kind][2]
+    rows = export_rows(kind, start, end)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+async def aexport_lines(kind, fmt, start=None, end=None, batch=None):
+    """
+    export_lines for ASGI: yields joined batches of lines, each pulled in the sync thread.
+
+    StreamingHttpResponse buffers a sync iterator whole under ASGI (sync_to_async(list)),
+    so the async view streams through this generator instead.
+    """
+    lines = export_lines(kind, fmt, start, end)
+    batch = batch or ASYNC_BATCH_LINES
+    # kursor serwerowy żyje na połączeniu wątku sync – tam też generator jest przesuwany i zamykany
+    take = sync_to_async(lambda: "".join(islice(lines, batch)))
+    try:
+        while chunk := await take():
+            yield chunk
+    finally:
+        await sync_to_async(lines.close)()
+
+
+class ImportErrors(Exception):
+    """Raised with every problem found in an import file; nothing is written."""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} błędów w pliku importu")
+        self.problems = problems
+
+
+def read_rows(lines, fmt):
+    """Parses CSV (with a header) or NDJSON lines into dicts."""
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+    else:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _parse(row, users, catalog):
+    try:
+        start = date.fromisoformat(row["start_date"])
+        end = date.fromisoformat(row["end_date"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("nieprawidłowe start_date/end_date (oczekiwano YYYY-MM-DD)")
+    if end < start:
+        raise ValueError("end_date wcześniejsza niż start_date")
+    room = catalog.get(row.get("room_id"))
+    if room is None:
+        raise ValueError(f"nie ma pokoju {row.get('room_id')!r}")
+    user_id = users.get(row.get("user") or row.get("user_email"))
+    if user_id is None:
+        raise ValueError(f"nie ma użytkownika {row.get('user') or row.get('user_email')!r}")
+    dog_name = (row.get("dog_name") or "").strip()
+    if not dog_name or len(dog_name) > Reservation._meta.get_field("dog_name").max_length:
+        raise ValueError("brak lub zbyt długie dog_name")
+    total_price = None
+    if row.get("total_price") not in (None, ""):
+        try:
+            total_price = Decimal(str(row["total_price"]))
+        except InvalidOperation:
+            raise ValueError(f"nieprawidłowe total_price {row['total_price']!r}")
+    return Reservation(
+        user_id=user_id, room_id=room.id, dog_name=dog_name, start_date=start, end_date=end,
+        notes=row.get("notes") or "", total_price=total_price,
+    )
+
+
+def _resolve_users(rows):
+    keys = {row.get("user") or row.get("user_email") for row in rows} - {None, ""}
+    users = {}
+    User = get_user_model()
+    for pk, username, email in User.objects.filter(Q(username__in=keys) | Q(email__in=keys)).values_list(
+        "pk", "username", "email",
+    ):
+        users[username] = pk
+        if email in keys:
+            users.setdefault(email, pk)
+    return users
+
+
+def import_reservations(lines, fmt, dry_run=False):
+    """
+    Validates a whole file and writes its reservations in bulk; returns {"reservations", "slots"}.
+
+    Every row is parsed first; then, under the same locks ordinary bookings
+    take (occupancy counters for the slot backend, Room rows for the range
+    backend), existing occupancy of all affected rooms is read in one query
+    and the file's stays are swept on top of it, so a capacity problem
+    anywhere in the file is reported before anything is written.
+    Reservations, slots and counters are then written with bulk_create in
+    BATCH_SIZE batches.
+    Raises ImportErrors listing every problem; with dry_run the transaction
+    is rolled back after validation.
+    """
+    rows = list(read_rows(lines, fmt))
+    users = _resolve_users(rows)
+    catalog = get_catalog()
+    problems, reservations = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            reservations.append(_parse(row, users, catalog))
+        except ValueError as e:
+            problems.append(f"wiersz {number}: {e}")
+    if problems:
+        raise ImportErrors(problems)
+    if not reservations:
+        return {"reservations": 0, "slots": 0}
+
+    by_room = defaultdict(list)
+    for reservation in reservations:
+        by_room[reservation.room_id].append(reservation)
+    spans = {
+        room_id: (min(r.start_date for r in stays), max(r.end_date for r in stays))
+        for room_id, stays in by_room.items()
+    }
+
+    backend = get_backend()
+    with transaction.atomic():
+        rooms = {room.pk: room for room in Room.objects.select_for_update().filter(pk__in=spans).order_by("pk")}
+        # katalog procesu mógł jeszcze nie zauważyć usunięcia pokoju – rozstrzyga zablokowany odczyt
+        problems = [
+            f"wiersz {number}: nie ma pokoju {reservation.room_id!r}"
+            for number, reservation in enumerate(reservations, start=1)
+            if reservation.room_id not in rooms
+        ]
+        if problems:
+            raise ImportErrors(problems)
+        if backend.name == "slots":
+            for room_id, (start, end) in sorted(spans.items()):
+                lock_occupancy(rooms[room_id], list(iter_days(start, end)))
+
+        # jeden odczyt zajętości wszystkich pokoi z pliku, potem jedno przejście po dniach każdego pokoju
+        first = min(start for start, _ in spans.values())
+        last = max(end for _, end in spans.values())
+        existing = backend.taken_matrix(list(spans), first, last)
+        for room_id, stays in by_room.items():
+            room = rooms[room_id]
+            incoming = sweep([(r.start_date, r.end_date) for r in stays], first, last)
+            for offset, (have, new) in enumerate(zip(existing[room_id], incoming)):
+                if new and have + new > room.capacity:
+                    day = date.fromordinal(first.toordinal() + offset)
+                    problems.append(f"{room} {day}: zajęte {have} + z pliku {new} > pojemność {room.capacity}")
+        if problems:
+            raise ImportErrors(problems)
+
+        unpriced = [r for r in reservations if r.total_price is None]
+        for reservation, q in zip(unpriced, quote_many([(r.room_id, r.start_date, r.end_date) for r in unpriced])):
+            reservation.total_price = q.total
+
+        Reservation.objects.bulk_create(reservations, batch_size=BATCH_SIZE)
+        slots = 0
+        if backend.name == "slots":
+            slots = _write_slots(rooms, by_room, spans)
+        for room_id in spans:
+            bump_occupancy_version(room_id)
+
+        if dry_run:
+            transaction.set_rollback(True)
+    return {"reservations": len(reservations), "slots": slots}
+
+
+def _write_slots(rooms, by_room, spans):
+    batch, written, counters = [], 0, []
+    for room_id, stays in by_room.items():
+        room = rooms[room_id]
+        start, end = spans[room_id]
+        used = defaultdict(set)
+        for day, slot_no in RoomDaySlot.objects.filter(
+            room_id=room_id, date__gte=start, date__lte=end,
+        ).values_list("date", "slot"):
+            used[day].add(slot_no)
+        for reservation in stays:
+            days = list(iter_days(reservation.start_date, reservation.end_date))
+            for day, slot_no in pick_free_slots(room, days, used):
+                used[day].add(slot_no)
+                batch.append(RoomDaySlot(room_id=room_id, date=day, slot=slot_no, reservation_id=reservation.pk))
+            if len(batch) >= BATCH_SIZE:
+                RoomDaySlot.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        counters.extend(RoomDayOccupancy(room_id=room_id, date=day, taken=len(taken)) for day, taken in used.items())
+    RoomDaySlot.objects.bulk_create(batch)
+    RoomDayOccupancy.objects.bulk_create(
+        counters, update_conflicts=True, unique_fields=["room", "date"], update_fields=["taken"], batch_size=BATCH_SIZE,
+    )
+    return written + len(batch)
@@ -9,6 +9,7 @@ urlpatterns = [
     path('register/', views.register, name='register'),
 
     path('reservations/new/', views.create_reservation, name='create_reservation'),
+    path('reservations/waitlist/', views.join_waitlist, name='join_waitlist'),
     path('rooms/', views.room_list, name='room_list'),
     path('contact/', views.contact_view, name='contact'),
     path('about/', views.about_view, name='about'),
@@ -49,6 +50,12 @@ urlpatterns = [
          ),
          name="password_reset_complete"),
     path("api/availability/", views.availability_api, name="availability_api"),
+    path("api/quote/", views.quote_api, name="quote_api"),
+    path("api/rooms/search/", views.room_search_api, name="room_search_api"),
+    path("api/rooms/earliest/", views.earliest_window_api, name="earliest_window_api"),
+    path("ops/db-pool/", views.db_pool_stats, name="db_pool_stats"),
+    path("staff/occupancy/", views.staff_occupancy, name="staff_occupancy"),
+    path("staff/export/<str:kind>/", views.staff_export, name="staff_export"),
 
     path("reservations/<int:pk>/confirmation/", views.reservation_confirmation, name="reservation_confirmation"),
     path("payments/checkout/<int:reservation_id>/", views.checkout_payment, name="checkout_payment"),
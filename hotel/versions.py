@@ -0,0 +1,71 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+OCCUPANCY_KEY = "occupancy:v:{}"
+CATALOG_KEY = "rooms:catalog:v"
+PRICES_KEY = "prices:v"
+
+
+def _token():
+    return uuid.uuid4().hex[:12]
+
+
+def occupancy_versions(room_ids):
+    """
+    Returns {room_id: version} for the given rooms.
+
+    A version is an opaque token kept in the shared cache. A room without one
+    (first use, eviction, cache restart) gets a fresh token, which simply
+    invalidates everything cached for it.
+    """
+    keys = {OCCUPANCY_KEY.format(room_id): room_id for room_id in room_ids}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, _token(), None)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def aoccupancy_versions(room_ids):
+    """Async variant of occupancy_versions() for async views."""
+    keys = {OCCUPANCY_KEY.format(room_id): room_id for room_id in room_ids}
+    found = await cache.aget_many(keys)
+    for key in keys.keys() - found.keys():
+        await cache.aadd(key, _token(), None)
+        found[key] = await cache.aget(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_occupancy_version(room_id):
+    """Gives the room a new occupancy version once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(OCCUPANCY_KEY.format(room_id), _token(), None))
+
+
+def catalog_version():
+    """Returns the current Room catalog version shared by all workers."""
+    version = cache.get(CATALOG_KEY)
+    if version is None:
+        cache.add(CATALOG_KEY, _token(), None)
+        version = cache.get(CATALOG_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Makes every worker rebuild its Room catalog once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(CATALOG_KEY, _token(), None))
+
+
+def price_version():
+    """Returns the current price calendar version (PriceOverride changes)."""
+    version = cache.get(PRICES_KEY)
+    if version is None:
+        cache.add(PRICES_KEY, _token(), None)
+        version = cache.get(PRICES_KEY)
+    return version
+
+
+def bump_price_version():
+    """Makes every worker rebuild its price calendar once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(PRICES_KEY, _token(), None))
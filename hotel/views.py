@@ -1,64 +1,65 @@
+import asyncio
+import csv
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth import login
-import requests
 from django.core.mail import EmailMessage
 from django.shortcuts import render, redirect, get_object_or_404
 
 from users.emails import send_activation_email
-from .models import Profile, Room, Reservation, RoomDaySlot
-from .forms import UserRegisterForm, ReservationForm, ContactForm
+from .models import Profile, Reservation, Room, Service
+from .forms import UserRegisterForm, ReservationForm, ContactForm, WaitlistForm
+from .capacity import get_backend
+from .catalog import get_catalog
+from .pagination import KeysetPaginator
+from .versions import aoccupancy_versions, occupancy_versions, price_version
+from . import dbpool, heatmap, outbox, pricing, search, transfer, weather
+from .pagecache import cache_public_page
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 
 from django.contrib.auth.views import LoginView
 from .forms import CustomAuthenticationForm, ProfileForm
-from django.core.paginator import Paginator
 from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError, transaction
 from datetime import date, timedelta
 from django.utils import timezone
 from django.views.decorators.http import require_GET
-from django.http import JsonResponse
-from django.db.models import Count
-
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+import hashlib
 
 
-def home(request):
-    def cheapest(room_type):
-        return (Room.objects
-                .filter(room_type=room_type)
-                .order_by("price_per_day", "name")
-                .first())
 
+async def home(request):
+    # katalog pokoi i pogoda (oba z cache) pobierane równolegle
+    catalog, weather_data = await asyncio.gather(
+        sync_to_async(get_catalog)(),
+        weather.aget_weather(),
+    )
+    cheapest = catalog.cheapest
     offer = {
-        "yard":   cheapest("yard"),
-        "indoor": cheapest("indoor"),
-        "kennel": cheapest("kennel"),
+        "yard":   cheapest.get("yard"),
+        "indoor": cheapest.get("indoor"),
+        "kennel": cheapest.get("kennel"),
     }
 
-
-    weather_data = None
-    try:
-        resp = requests.get(
-            "https://api.weatherapi.com/v1/current.json",
-            params={"key": settings.WEATHER_API_KEY, "q": "Warszawa", "lang": "pl"},
-            timeout=5
-        )
-        if resp.status_code == 200:
-            weather_data = resp.json()
-    except requests.RequestException:
-        pass
-
-    return render(request, "home.html", {
+    return await sync_to_async(render)(request, "home.html", {
         "offer": offer,
         "weather_data": weather_data,
         "current_time": timezone.localtime(),
     })
 
 
+@cache_public_page("about")
 def about_view(request):
     return render(request, 'hotel/about.html')
 
+@cache_public_page("terms")
 def terms_view(request):
     return render(request, 'terms.html')
 
@@ -66,21 +67,22 @@ def register(request):
     if request.method == 'POST':
         form = UserRegisterForm(request.POST)
         if form.is_valid():
-            user = form.save(commit=False)
-            user.username = form.cleaned_data['email']
-            user.is_active = False
-            user.save()
-
-            Profile.objects.create(
-                user=user,
-                phone_number=form.cleaned_data['phone_number'],
-                street=form.cleaned_data['street'],
-                city=form.cleaned_data['city'],
-                zip_code=form.cleaned_data['zip_code']
-            )
+            with transaction.atomic():
+                user = form.save(commit=False)
+                user.username = form.cleaned_data['email']
+                user.is_active = False
+                user.save()
+
+                Profile.objects.create(
+                    user=user,
+                    phone_number=form.cleaned_data['phone_number'],
+                    street=form.cleaned_data['street'],
+                    city=form.cleaned_data['city'],
+                    zip_code=form.cleaned_data['zip_code']
+                )
 
 
-            send_activation_email(user, request)
+                send_activation_email(user, request)
 
             messages.success(
                 request,
@@ -107,6 +109,29 @@ class CustomLoginView(LoginView):
         return super().form_valid(form)
 
 
+def _booking_email(request, reservation, quote, services):
+    extras = ""
+    if services:
+        extras = f"Usługi: {', '.join(s.name for s in services)} ({quote.services:.2f} zł)\n"
+    body = (
+        f"Dziękujemy za rezerwację #{reservation.id}.\n\n"
+        f"Pies: {reservation.dog_name}\n"
+        f"Miejsce: {reservation.room.name} ({reservation.room.get_room_type_display()})\n"
+        f"Termin: {reservation.start_date} → {reservation.end_date} ({quote.nights} doby)\n"
+        f"Pobyt: {quote.stay:.2f} zł\n"
+        f"{extras}"
+        f"Razem: {quote.total:.2f} zł\n\n"
+        f"Podsumowanie online: "
+        f"{request.build_absolute_uri(redirect('reservation_confirmation', pk=reservation.pk).url)}\n"
+    )
+    return EmailMessage(
+        subject=f"Potwierdzenie rezerwacji #{reservation.id}",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[reservation.user.email],
+    )
+
+
 @login_required
 def create_reservation(request):
     room_type = request.GET.get("room_type") or None
@@ -122,37 +147,21 @@ def create_reservation(request):
         if form.is_valid():
             reservation = form.save(commit=False)
             reservation.user = request.user
+            services = list(form.cleaned_data["services"])
+            quote = pricing.quote(reservation.room_id, reservation.start_date, reservation.end_date, services)
+            reservation.total_price = quote.total
             try:
-
-                reservation.save()
+                # rezerwacja i e-mail w jednej transakcji – wiadomość trafia do outboxa tylko po udanym zapisie
+                with transaction.atomic():
+                    reservation.save()
+                    form.save_m2m()
+                    if reservation.user.email:
+                        outbox.enqueue(_booking_email(request, reservation, quote, services))
             except ValidationError as e:
                 form.add_error(None, e)
             except IntegrityError:
                 form.add_error(None, "Nie udało się zapisać rezerwacji. Spróbuj ponownie.")
             else:
-
-                nights = (reservation.end_date - reservation.start_date).days + 1
-                total = reservation.room.price_per_day * nights
-                if reservation.user.email:
-                    subject = f"Potwierdzenie rezerwacji #{reservation.id}"
-                    body = (
-                        f"Dziękujemy za rezerwację #{reservation.id}.\n\n"
-                        f"Pies: {reservation.dog_name}\n"
-                        f"Miejsce: {reservation.room.name} ({reservation.room.get_room_type_display()})\n"
-                        f"Termin: {reservation.start_date} → {reservation.end_date} ({nights} doby)\n"
-                        f"Cena za dobę: {reservation.room.price_per_day} zł\n"
-                        f"Razem: {total:.2f} zł\n\n"
-                        f"Podsumowanie online: "
-                        f"{request.build_absolute_uri(redirect('reservation_confirmation', pk=reservation.pk).url)}\n"
-                    )
-                    EmailMessage(
-                        subject=subject,
-                        body=body,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[reservation.user.email],
-                    ).send(fail_silently=True)
-
-
                 return redirect("reservation_confirmation", pk=reservation.pk)
     else:
         form = ReservationForm(
@@ -164,14 +173,36 @@ def create_reservation(request):
     return render(request, "hotel/create_reservation.html", {"form": form})
 
 
+@login_required
+def join_waitlist(request):
+    if request.method == "POST":
+        form = WaitlistForm(request.POST)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.user = request.user
+            entry.save()
+            messages.success(
+                request, "Zapisano na listę oczekujących – gdy zwolni się miejsce, zarezerwujemy je i wyślemy e-mail.",
+            )
+            return redirect("account_overview")
+    else:
+        # wypełnione danymi z formularza rezerwacji, z którego przyszedł klient
+        form = WaitlistForm(initial={
+            key: request.GET[key] for key in ("dog_name", "room", "room_type", "start_date", "end_date")
+            if request.GET.get(key)
+        })
+    return render(request, "hotel/waitlist_form.html", {"form": form})
+
+
+@cache_public_page("room_list")
 def room_list(request):
-    rooms = Room.objects.all().order_by('room_type', 'name')
+    catalog = get_catalog()
     grouped={
-        'Pokój w domu': rooms.filter(room_type='indoor'),
-        'Wspólny wybieg': rooms.filter(room_type='yard'),
-        'Pojedynczy kojec': rooms.filter(room_type='kennel'),
+        'Pokój w domu': catalog.of_type('indoor'),
+        'Wspólny wybieg': catalog.of_type('yard'),
+        'Pojedynczy kojec': catalog.of_type('kennel'),
     }
-    return render(request, 'hotel/room_list.html', {'grouped_rooms': grouped})
+    return render(request, 'hotel/room_list.html', {'grouped_rooms': grouped, 'catalog_version': catalog.version})
 
 
 
@@ -194,7 +225,7 @@ def contact_view(request):
                 to=[getattr(settings, "CONTACT_TO_EMAIL", "kontakt@psihotel.pl")],
                 reply_to=[data["email"]],
             )
-            msg.send(fail_silently=False)
+            outbox.enqueue(msg)
 
             messages.success(request, "Dziękujemy! Wiadomość została wysłana.")
             return redirect("contact")
@@ -232,36 +263,15 @@ def account_profile(request):
 
 @login_required
 def account_reservations(request):
-    qs = (
-        Reservation.objects.filter(user=request.user)
-        .select_related("room")
-        .order_by("-start_date", "-created_at")
-    )
-    page = request.GET.get("page")
-    paginator = Paginator(qs, 10)
-    reservations_page = paginator.get_page(page)
-
-    rows = []
-    for r in reservations_page:
-        days = (r.end_date - r.start_date).days
-        price = (r.room.price_per_day or 0)
-        total = days * price if days > 0 else 0
-        rows.append({"obj": r, "days": days, "total": total})
+    qs = Reservation.objects.filter(user=request.user).select_related("room").with_totals()
+    page = KeysetPaginator(qs, 10).get_page(after=request.GET.get("after"), before=request.GET.get("before"))
 
     return render(request, "account/reservations.html", {
-        "reservations": reservations_page,
-        "rows": rows,
+        "reservations": page,
     })
 
-@require_GET
-def availability_api(request):
-
-    room_id = request.GET.get("room")
-    if not room_id:
-        return JsonResponse({"error": "Parametr 'room' jest wymagany."}, status=400)
-
-    room = get_object_or_404(Room, pk=room_id)
-
+def _parse_range(request, max_days=92, default_days=30):
+    """Reads start/end (YYYY-MM-DD) from the query string; returns (start, end, error)."""
     def parse_date(s, default):
         if not s:
             return default
@@ -271,76 +281,392 @@ def availability_api(request):
             raise ValidationError(f"Nieprawidłowy format daty: {s} (oczekiwano YYYY-MM-DD)")
 
     today = timezone.localdate()
-    start = parse_date(request.GET.get("start"), today)
-    end = parse_date(request.GET.get("end"), today + timedelta(days=30))
+    try:
+        start = parse_date(request.GET.get("start"), today)
+        end = parse_date(request.GET.get("end"), start + timedelta(days=default_days))
+    except ValidationError as e:
+        return None, None, e.message
 
     if end < start:
-        return JsonResponse({"error": "Parametr 'end' nie może być wcześniejszy niż 'start'."}, status=400)
+        return None, None, "Parametr 'end' nie może być wcześniejszy niż 'start'."
 
     # twarde ograniczenie zakresu
-    if (end - start).days > 92:
-        return JsonResponse({"error": "Zakres nie może przekraczać 92 dni."}, status=400)
-
-    # policz zajęte sloty per dzień
-    taken_per_day = (
-        RoomDaySlot.objects
-        .filter(room=room, date__gte=start, date__lte=end)
-        .values("date")
-        .annotate(taken=Count("id"))
-    )
-    taken_map = {row["date"]: row["taken"] for row in taken_per_day}
-
-    # zbuduj listę dni
-    days = []
-    d = start
-    while d <= end:
-        taken = taken_map.get(d, 0)
-        free = max(room.capacity - taken, 0)
-        days.append({"date": d.isoformat(), "taken": taken, "free": free})
-        d += timedelta(days=1)
-
-    return JsonResponse({
+    if (end - start).days > max_days:
+        return None, None, f"Zakres nie może przekraczać {max_days} dni."
+
+    return start, end, None
+
+
+async def _taken_matrix(rooms, start, end):
+    """Returns {room_id: [taken per day]} for the given rooms from the capacity backend."""
+    backend = get_backend()
+    return await sync_to_async(backend.taken_matrix)([room.id for room in rooms], start, end)
+
+
+@require_GET
+async def availability_api(request):
+    """
+    Per-day availability.
+
+    ``?room=<id>`` returns the single-room ``days`` list. ``?rooms=1,2,3`` or
+    ``?room_type=<type>`` switch to batch mode and return a rooms × days matrix
+    (``taken``/``free`` lists aligned with ``dates``) in one response.
+    """
+    room_ids = request.GET.get("rooms")
+    room_type = request.GET.get("room_type")
+    batch = bool(room_ids or room_type)
+
+    catalog = await sync_to_async(get_catalog)()
+    if batch:
+        rooms = catalog.of_type(room_type) if room_type else catalog.rooms
+        if room_ids:
+            try:
+                wanted = {int(x) for x in room_ids.split(",") if x.strip()}
+            except ValueError:
+                return JsonResponse({"error": "Parametr 'rooms' musi być listą identyfikatorów."}, status=400)
+            rooms = [room for room in rooms if room.id in wanted]
+    else:
+        room_id = request.GET.get("room")
+        if not room_id:
+            return JsonResponse({"error": "Parametr 'room' jest wymagany."}, status=400)
+        room = catalog.get(room_id)
+        if room is None:
+            raise Http404("Nie ma takiego pokoju.")
+        rooms = [room]
+
+    start, end, error = _parse_range(request)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+
+    # wersja zajętości zmienia się tylko przy przydziale/zwolnieniu slotów,
+    # więc ETag i klucz cache można policzyć bez sięgania do tabel zajętości
+    versions = await aoccupancy_versions([room.id for room in rooms])
+    fingerprint = repr((batch, start, end, [(room.id, versions[room.id]) for room in rooms]))
+    digest = hashlib.md5(fingerprint.encode()).hexdigest()
+    etag = f'"{digest}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+
+    cache_key = f"availability:{digest}"
+    payload = await cache.aget(cache_key)
+    if payload is None:
+        payload = await _availability_payload(rooms, start, end, batch)
+        await cache.aset(cache_key, payload, settings.AVAILABILITY_CACHE_TIMEOUT)
+
+    response = JsonResponse(payload)
+    response["ETag"] = etag
+    # przeglądarka zawsze pyta ponownie, ale z If-None-Match dostaje 304
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+async def _availability_payload(rooms, start, end, batch):
+    matrix = await _taken_matrix(rooms, start, end)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+    if batch:
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "dates": dates,
+            "rooms": [
+                {
+                    "room": room.id,
+                    "room_name": room.name,
+                    "room_type": room.room_type,
+                    "capacity": room.capacity,
+                    "taken": matrix[room.id],
+                    "free": [max(room.capacity - t, 0) for t in matrix[room.id]],
+                }
+                for room in rooms
+            ],
+        }
+
+    room = rooms[0]
+    days = [
+        {"date": d, "taken": taken, "free": max(room.capacity - taken, 0)}
+        for d, taken in zip(dates, matrix[room.id])
+    ]
+    return {
         "room": room.id,
         "room_name": room.name,
         "capacity": room.capacity,
         "start": start.isoformat(),
         "end": end.isoformat(),
         "days": days,
-    })
+    }
+
+MAX_QUOTE_ITEMS = 200
+MAX_QUOTE_DAYS = 365
+
+
+def _parse_quote_items(values):
+    """Parses repeated ``items=<room>:<start>:<end>`` values into (room_id, start, end) tuples."""
+    stays = []
+    for value in values:
+        for item in value.split(","):
+            try:
+                room_id, start, end = item.split(":")
+                stays.append((int(room_id), date.fromisoformat(start), date.fromisoformat(end)))
+            except ValueError:
+                raise ValidationError(f"Nieprawidłowa pozycja: {item} (oczekiwano <pokój>:<YYYY-MM-DD>:<YYYY-MM-DD>)")
+            if (stays[-1][2] - stays[-1][1]).days > MAX_QUOTE_DAYS:
+                raise ValidationError(f"Zakres nie może przekraczać {MAX_QUOTE_DAYS} dni.")
+    return stays
+
+
+@require_GET
+def quote_api(request):
+    """
+    Prices many stays in one response.
+
+    ``?rooms=1,2,3`` (or ``?room_type=<type>``) with ``start``/``end`` quotes
+    every listed room for one range, as the reservation form needs;
+    ``?items=<room>:<start>:<end>`` (repeatable, comma-separated) quotes
+    arbitrary pairs. ``?services=1,2`` adds Service add-ons to every quote.
+    """
+    try:
+        service_ids = {int(x) for x in request.GET.get("services", "").split(",") if x.strip()}
+    except ValueError:
+        return JsonResponse({"error": "Parametr 'services' musi być listą identyfikatorów."}, status=400)
+    services = list(Service.objects.filter(pk__in=service_ids)) if service_ids else []
+
+    items = request.GET.getlist("items")
+    if items:
+        try:
+            stays = _parse_quote_items(items)
+        except ValidationError as e:
+            return JsonResponse({"error": e.message}, status=400)
+    else:
+        catalog = get_catalog()
+        rooms = catalog.of_type(request.GET["room_type"]) if request.GET.get("room_type") else catalog.rooms
+        if request.GET.get("rooms"):
+            try:
+                wanted = {int(x) for x in request.GET["rooms"].split(",") if x.strip()}
+            except ValueError:
+                return JsonResponse({"error": "Parametr 'rooms' musi być listą identyfikatorów."}, status=400)
+            rooms = [room for room in rooms if room.id in wanted]
+        start, end, error = _parse_range(request, max_days=MAX_QUOTE_DAYS)
+        if error:
+            return JsonResponse({"error": error}, status=400)
+        stays = [(room.id, start, end) for room in rooms]
+
+    if len(stays) > MAX_QUOTE_ITEMS:
+        return JsonResponse({"error": f"Najwyżej {MAX_QUOTE_ITEMS} pozycji w jednym zapytaniu."}, status=400)
+    try:
+        quotes = pricing.quote_many(stays, services)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Room.DoesNotExist:
+        raise Http404("Nie ma takiego pokoju.")
+    return JsonResponse({"quotes": [q.as_dict() for q in quotes]})
+
+
+@require_GET
+def room_search_api(request):
+    """
+    Rooms with free places on every night of ``start``–``end``, cheapest first.
+
+    ``?room_type=<type>`` and ``?rooms=1,2,3`` narrow the candidates, ``?dogs=N``
+    (default 1) is the number of places needed.
+    """
+    try:
+        dogs = int(request.GET.get("dogs") or 1)
+        room_ids = (
+            {int(x) for x in request.GET["rooms"].split(",") if x.strip()} if request.GET.get("rooms") else None
+        )
+    except ValueError:
+        return JsonResponse({"error": "Parametry 'dogs' i 'rooms' muszą być liczbami."}, status=400)
+    if dogs < 1:
+        return JsonResponse({"error": "Parametr 'dogs' musi być dodatni."}, status=400)
+    room_type = request.GET.get("room_type") or None
+    start, end, error = _parse_range(request, max_days=MAX_QUOTE_DAYS)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+
+    def build():
+        matches = search.best_available(start, end, room_type=room_type, dogs=dogs, room_ids=room_ids)
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "dogs": dogs,
+            "rooms": [m.as_dict(dogs) for m in matches],
+        }
+
+    catalog = get_catalog()
+    rooms = catalog.of_type(room_type) if room_type else catalog.rooms
+    return _versioned_json(request, "room_search", rooms, (start, end, room_type, dogs, sorted(room_ids or ())), build)
+
+
+@require_GET
+def earliest_window_api(request):
+    """
+    Earliest stay of ``nights`` nights starting within ``within`` days of ``start``.
+
+    ``?room=<id>`` or ``?room_type=<type>`` (default: any room) picks the
+    candidates and ``?places=N`` (default 1) the free places needed on every
+    night. Returns ``{"window": null}`` when nothing fits.
+    """
+    try:
+        nights = int(request.GET["nights"])
+        within = int(request.GET.get("within") or 60)
+        places = int(request.GET.get("places") or 1)
+        room_id = int(request.GET["room"]) if request.GET.get("room") else None
+        start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else timezone.localdate()
+    except (KeyError, ValueError):
+        return JsonResponse(
+            {"error": "Wymagany parametr 'nights'; 'within', 'places' i 'room' muszą być liczbami, 'start' datą."},
+            status=400,
+        )
+    if not (1 <= nights <= MAX_QUOTE_DAYS and 1 <= within <= heatmap.MAX_DAYS and places >= 1):
+        return JsonResponse(
+            {"error": f"Dozwolone: 1–{MAX_QUOTE_DAYS} nocy, 1–{heatmap.MAX_DAYS} dni wyszukiwania."}, status=400,
+        )
+    room_type = request.GET.get("room_type") or None
+    start = max(start, timezone.localdate())
+
+    catalog = get_catalog()
+    if room_id is not None:
+        room = catalog.get(room_id)
+        if room is None:
+            raise Http404("Nie ma takiego pokoju.")
+        rooms = [room]
+    else:
+        rooms = catalog.of_type(room_type) if room_type else catalog.rooms
+
+    def build():
+        window = search.earliest_window(
+            start, within, nights, room_id=room_id, room_type=room_type, places=places,
+        )
+        return {"window": window.as_dict() if window else None}
+
+    return _versioned_json(request, "earliest", rooms, (start, within, nights, room_id, room_type, places), build)
+
+
+def _versioned_json(request, name, rooms, params, build):
+    """
+    JSON response cached and ETagged by params plus the occupancy, catalog and price versions.
+
+    build() runs only on a cache miss; a matching If-None-Match gets a 304.
+    """
+    versions = occupancy_versions([room.id for room in rooms])
+    fingerprint = repr((name, params, get_catalog().version, price_version(), sorted(versions.items())))
+    digest = hashlib.md5(fingerprint.encode()).hexdigest()
+    etag = f'"{digest}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+
+    cache_key = f"{name}:{digest}"
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = build()
+        cache.set(cache_key, payload, settings.AVAILABILITY_CACHE_TIMEOUT)
+
+    response = JsonResponse(payload)
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
 
 @login_required
-def reservation_confirmation(request, pk):
+async def reservation_confirmation(request, pk):
 
-    reservation = get_object_or_404(
-        Reservation.objects.select_related("room"),
-        pk=pk,
-        user=request.user,
-    )
-    nights = (reservation.end_date - reservation.start_date).days + 1
-    nights = max(nights, 1)
-    total = reservation.room.price_per_day * nights
+    user = await request.auser()
+    try:
+        reservation = await (
+            Reservation.objects.select_related("room").prefetch_related("services").with_totals()
+            .aget(pk=pk, user=user)
+        )
+    except Reservation.DoesNotExist:
+        raise Http404("Nie znaleziono rezerwacji.")
 
     context = {
         "reservation": reservation,
-        "nights": nights,
-        "total": total,
+        "nights": reservation.nights,
+        "total": reservation.total,
     }
-    return render(request, "hotel/reservation_confirmation.html", context)
+    # render() odczytuje request.user w procesorach kontekstu – synchronicznie
+    return await sync_to_async(render)(request, "hotel/reservation_confirmation.html", context)
 
 
 @login_required
 def checkout_payment(request, reservation_id):
 
     reservation = get_object_or_404(
-        Reservation.objects.select_related("room"),
+        Reservation.objects.select_related("room").with_totals(),
         pk=reservation_id,
         user=request.user,
     )
-    nights = (reservation.end_date - reservation.start_date).days + 1
-    nights = max(nights, 1)
-    amount = reservation.room.price_per_day * nights
 
     return render(request, "hotel/payments/checkout.html", {
         "reservation": reservation,
-        "amount": amount,
-    })
\ No newline at end of file
+        "amount": reservation.total,
+    })
+
+@staff_member_required
+@require_GET
+def db_pool_stats(request):
+    """Pool state of the worker process that served this request (each gunicorn worker has its own)."""
+    return JsonResponse(dbpool.pool_stats())
+
+
+@staff_member_required
+@require_GET
+def staff_occupancy(request):
+    """Occupancy of every room and room type, up to a year; ?format=json or ?format=csv for export."""
+    start, end, error = _parse_range(request, max_days=heatmap.MAX_DAYS, default_days=90)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    data = heatmap.get_heatmap(start, end)
+
+    export = request.GET.get("format")
+    if export == "json":
+        return JsonResponse(data.as_dict())
+    if export == "csv":
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="oblozenie-{start}-{end}.csv"'
+        data.write_csv(csv.writer(response))
+        return response
+
+    rows = [
+        {
+            "kind": kind,
+            "label": label,
+            "capacity": capacity,
+            "cells": [(n, heatmap.level(n, capacity)) for n in taken],
+        }
+        for kind, label, capacity, taken in data.rows()
+    ]
+    return render(request, "hotel/staff/occupancy.html", {
+        "start": start,
+        "end": end,
+        "dates": data.dates(),
+        "rows": rows,
+    })
+
+
+@staff_member_required
+@require_GET
+def staff_export(request, kind):
+    """Streams reservations or slots as ?format=csv (default) or ndjson; ?start/?end filter by date."""
+    fmt = request.GET.get("format") or "csv"
+    if kind not in transfer.EXPORTS or fmt not in transfer.FORMATS:
+        raise Http404("Nieznany eksport.")
+    try:
+        start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else None
+        end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else None
+    except ValueError:
+        return JsonResponse({"error": "Nieprawidłowy format daty (oczekiwano YYYY-MM-DD)."}, status=400)
+
+    content_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson; charset=utf-8"
+    # pod ASGI synchroniczny iterator zostałby zebrany do listy przed wysłaniem pierwszego bajtu
+    export = transfer.aexport_lines if isinstance(request, ASGIRequest) else transfer.export_lines
+    response = StreamingHttpResponse(export(kind, fmt, start, end), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{kind}.{fmt}"'
+    return response
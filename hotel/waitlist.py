@@ -0,0 +1,103 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from users.emails import _absolute_url
+
+from . import outbox
+from .capacity import get_backend, overlapping
+from .models import Reservation, Room, WaitlistEntry
+from .pricing import quote_many
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_match(reservation):
+    """Runs match() for the reservation's room and dates once the cancelling transaction commits."""
+    room_id, start, end = reservation.room_id, reservation.start_date, reservation.end_date
+    transaction.on_commit(lambda: match(room_id, start, end), robust=True)
+
+
+@transaction.atomic
+def match(room_id, start, end):
+    """
+    Books waiting entries that fit into places freed in the room on [start, end].
+
+    Only waiting entries for this room or its type that have not started yet
+    and overlap the freed range are read (partial index / GiST on PostgreSQL),
+    locked in id order so concurrent matchers for other rooms of the same type
+    never book an entry twice. Capacity is then checked and allocated for all
+    of them in bulk by the capacity backend, under the same locks ordinary
+    bookings take; entries are served oldest first. Owners are e-mailed through the
+    outbox, so nothing is sent if the transaction rolls back.
+
+    Returns the booked entries.
+    """
+    room = Room.objects.filter(pk=room_id).first()
+    if room is None:
+        return []
+    # wpisy na pobyty, które już się zaczęły, nie zamieniają się w rezerwacje wstecz
+    waiting = WaitlistEntry.objects.filter(
+        Q(room=room) | Q(room__isnull=True, room_type=room.room_type),
+        status=WaitlistEntry.WAITING,
+        start_date__gte=timezone.localdate(),
+    )
+    entries = list(
+        overlapping(waiting, start, end).select_related("user").select_for_update(of=("self",)).order_by("id")
+    )
+    if not entries:
+        return []
+    entries.sort(key=lambda e: (e.created_at, e.id))
+
+    candidates = [
+        Reservation(
+            user_id=entry.user_id, room=room, dog_name=entry.dog_name,
+            start_date=entry.start_date, end_date=entry.end_date, notes=entry.notes,
+        )
+        for entry in entries
+    ]
+    for reservation, q in zip(candidates, quote_many([(room.pk, r.start_date, r.end_date) for r in candidates])):
+        reservation.total_price = q.total
+    by_reservation = {id(reservation): entry for reservation, entry in zip(candidates, entries)}
+
+    booked = []
+    now = timezone.now()
+    for reservation in get_backend().allocate_many(room, candidates):
+        entry = by_reservation[id(reservation)]
+        entry.status = WaitlistEntry.BOOKED
+        entry.reservation = reservation
+        entry.booked_at = now
+        booked.append(entry)
+    if not booked:
+        return []
+
+    WaitlistEntry.objects.bulk_update(booked, ["status", "reservation", "booked_at"])
+    for entry in booked:
+        if entry.user.email:
+            outbox.enqueue(_booked_email(entry))
+    logger.info("waitlist: room %s, %s–%s: booked %d of %d entries", room.pk, start, end, len(booked), len(entries))
+    return booked
+
+
+def _booked_email(entry):
+    reservation = entry.reservation
+    url = _absolute_url(reverse("reservation_confirmation", kwargs={"pk": reservation.pk}))
+    body = (
+        f"Zwolniło się miejsce z listy oczekujących – rezerwacja #{reservation.pk} jest potwierdzona.\n\n"
+        f"Pies: {reservation.dog_name}\n"
+        f"Miejsce: {reservation.room.name} ({reservation.room.get_room_type_display()})\n"
+        f"Termin: {reservation.start_date} → {reservation.end_date}\n"
+        f"Razem: {reservation.total_price:.2f} zł\n\n"
+        f"Podsumowanie online: {url}\n"
+    )
+    return EmailMessage(
+        subject=f"Potwierdzenie rezerwacji #{reservation.pk} z listy oczekujących",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[entry.user.email],
+    )
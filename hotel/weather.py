@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "weather:{}"
+LOCK_KEY = "weather:refresh:{}"
+
+
+async def afetch(client, location):
+    """Calls the weather API; returns the decoded JSON or None on any failure."""
+    try:
+        resp = await client.get(
+            settings.WEATHER_API_URL,
+            params={"key": settings.WEATHER_API_KEY, "q": location, "lang": "pl"},
+            timeout=settings.WEATHER_TIMEOUT,
+        )
+        if resp.status_code == 200:
+            return resp.json()
+        logger.warning("Weather API returned %s for %s", resp.status_code, location)
+    except (httpx.HTTPError, ValueError):
+        logger.warning("Weather API request failed for %s", location, exc_info=True)
+    return None
+
+
+async def arefresh(*locations):
+    """Fetches the weather for all locations concurrently and stores it in the shared cache."""
+    locations = locations or (settings.WEATHER_LOCATION,)
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(*(afetch(client, location) for location in locations))
+    for location, data in zip(locations, results):
+        if data is not None:
+            await cache.aset(
+                CACHE_KEY.format(location),
+                {"data": data, "fetched_at": time.time()},
+                settings.WEATHER_MAX_STALE,
+            )
+    return dict(zip(locations, results))
+
+
+def refresh(location=None):
+    """Synchronous wrapper around arefresh() for threads and management commands."""
+    location = location or settings.WEATHER_LOCATION
+    return async_to_sync(arefresh)(location)[location]
+
+
+def _needs_refresh(entry):
+    return entry is None or time.time() - entry["fetched_at"] > settings.WEATHER_TTL
+
+
+def get_weather(location=None):
+    """
+    Returns cached weather data without waiting for the upstream API.
+
+    Fresh entries are returned as is. Entries older than WEATHER_TTL are still
+    returned (stale-while-revalidate) while one background refresh runs. With
+    nothing cached the result is None and the page renders without weather.
+    """
+    location = location or settings.WEATHER_LOCATION
+    entry = cache.get(CACHE_KEY.format(location))
+    if _needs_refresh(entry):
+        refresh_in_background(location)
+    return entry["data"] if entry else None
+
+
+async def aget_weather(location=None):
+    """Async variant of get_weather() for async views."""
+    location = location or settings.WEATHER_LOCATION
+    entry = await cache.aget(CACHE_KEY.format(location))
+    if (
+        _needs_refresh(entry)
+        and settings.WEATHER_BACKGROUND_REFRESH
+        and await cache.aadd(LOCK_KEY.format(location), 1, settings.WEATHER_TIMEOUT * 2)
+    ):
+        _start_refresh_thread(location)
+    return entry["data"] if entry else None
+
+
+def refresh_in_background(location):
+    """Starts a refresh thread unless another worker is already refreshing this location."""
+    if not settings.WEATHER_BACKGROUND_REFRESH:
+        return None
+    # blokada w cache współdzielonym – jedno odświeżenie na wszystkie workery
+    if not cache.add(LOCK_KEY.format(location), 1, settings.WEATHER_TIMEOUT * 2):
+        return None
+    return _start_refresh_thread(location)
+
+
+def _start_refresh_thread(location):
+    # osobny wątek, bo pętla zdarzeń widoku (np. pod WSGI) kończy się razem z odpowiedzią
+    def run():
+        try:
+            refresh(location)
+        finally:
+            cache.delete(LOCK_KEY.format(location))
+
+    thread = threading.Thread(target=run, name="weather-refresh", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,109 @@
+import socketserver
+import threading
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # wersje zajętości i katalogu żyją w cache – identyfikatory pokoi powtarzają się między testami
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server recording delivered messages (no TLS, no AUTH)."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail_data = False
+        self.drop_idle = False
+        self.reject = set()
+        self.drop_after_messages = None
+        self.refuse_new = False
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        if server.refuse_new:
+            self.reply("421 Service not available")
+            return
+        server.connections += 1
+        self.reply("220 localhost stand-in")
+        mail_from, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if server.drop_idle:
+                # jak serwer zamykający bezczynne połączenie
+                server.drop_idle = False
+                return
+            cmd = line.decode().strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpts = cmd, []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                if any(address in cmd for address in server.reject):
+                    self.reply("550 No such user")
+                    continue
+                rcpts.append(cmd)
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data.append(chunk)
+                if server.fail_data:
+                    self.reply("451 Try again later")
+                else:
+                    server.messages.append({"from": mail_from, "rcpts": rcpts, "data": b"".join(data)})
+                    self.reply("250 Queued")
+                    if len(server.messages) == server.drop_after_messages:
+                        # serwer pada po tej wiadomości i nie przyjmuje nowych połączeń
+                        server.refuse_new = True
+                        return
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = SMTPStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST = "127.0.0.1"
+    settings.EMAIL_PORT = server.port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_USE_SSL = False
+    settings.EMAIL_HOST_USER = ""
+    settings.EMAIL_HOST_PASSWORD = ""
+    settings.EMAIL_TIMEOUT = 5
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,74 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel.models import Reservation, Room
+from hotel.pagination import KeysetPaginator
+
+User = get_user_model()
+
+
+@pytest.fixture
+def history():
+    user = User.objects.create_user("stały", "staly@example.com", "pass")
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=50, price_per_day=Decimal("120.50"))
+    created = timezone.now()
+    # trzy pobyty z tą samą datą i created_at – o kolejności decyduje id
+    rows = [
+        Reservation(user=user, room=room, dog_name=f"Pies {i}", created_at=created,
+                    start_date=dt.date(2030, 1, 1) + dt.timedelta(days=i // 3 * 7),
+                    end_date=dt.date(2030, 1, 3) + dt.timedelta(days=i // 3 * 7))
+        for i in range(25)
+    ]
+    Reservation.objects.bulk_create(rows)
+    Reservation.objects.update(created_at=created)
+    return user
+
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_history_once_in_order(history):
+    qs = Reservation.objects.filter(user=history)
+    expected = list(qs.order_by("-start_date", "-created_at", "-id").values_list("id", flat=True))
+    paginator = KeysetPaginator(qs, 10)
+
+    seen, page = [], paginator.get_page()
+    while True:
+        seen += [r.id for r in page]
+        if not page.has_next():
+            break
+        page = paginator.get_page(after=page.next_cursor)
+    assert seen == expected
+
+    back = paginator.get_page(before=page.previous_cursor)
+    assert [r.id for r in back] == expected[10:20]
+    assert back.has_previous() and back.has_next()
+    assert [r.id for r in paginator.get_page(after="zepsuty")] == expected[:10]
+
+
+@pytest.mark.django_db
+def test_account_page_uses_sql_totals(client, history):
+    client.force_login(history)
+
+    page = client.get(reverse("account_reservations")).context["reservations"]
+
+    first = page.object_list[0]
+    assert first.nights == 3
+    assert first.total == Decimal("361.50")
+    assert page.has_next() and not page.has_previous()
+
+
+@pytest.mark.django_db
+def test_deep_page_query_count_matches_first_page(client, history, django_assert_max_num_queries):
+    client.force_login(history)
+    url = reverse("account_reservations")
+    client.get(url)
+    paginator = KeysetPaginator(Reservation.objects.filter(user=history), 10)
+    deep = paginator.get_page(after=paginator.get_page(after=paginator.get_page().next_cursor).next_cursor)
+
+    with django_assert_max_num_queries(3):  # sesja, użytkownik, strona – bez COUNT(*)
+        response = client.get(url, {"before": deep.previous_cursor})
+    assert response.status_code == 200
@@ -0,0 +1,73 @@
+import datetime as dt
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from hotel.admin_utils import EstimatedCountPaginator
+from hotel.models import Profile, Reservation, Room
+
+User = get_user_model()
+
+
+@pytest.fixture
+def data(db):
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=10, price_per_day=100)
+    anna = User.objects.create(username="anna", email="anna.nowak@example.com", last_name="Nowak")
+    Profile.objects.create(user=anna, phone_number="501200300")
+    jan = User.objects.create(username="jan", email="jan@example.com", last_name="Kowalski")
+    Reservation.objects.bulk_create([
+        Reservation(user=anna, room=room, dog_name="Reksio", start_date=dt.date(2030, 1, 5), end_date=dt.date(2030, 1, 7)),
+        Reservation(user=jan, room=room, dog_name="Azor", start_date=dt.date(2030, 2, 5), end_date=dt.date(2030, 2, 7)),
+        Reservation(user=jan, room=room, dog_name="Burek", start_date=dt.date(2030, 3, 5), end_date=dt.date(2030, 3, 7)),
+    ])
+
+
+@pytest.fixture
+def changelist(admin_client):
+    def get(**params):
+        response = admin_client.get(reverse("admin:hotel_reservation_changelist"), params)
+        assert response.status_code == 200
+        return sorted(r.dog_name for r in response.context["cl"].result_list)
+    return get
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("rek", ["Reksio"]),
+    ("anna.no", ["Reksio"]),
+    ("kowal", ["Azor", "Burek"]),
+    ("501", ["Reksio"]),
+    ("jan kowal", ["Azor", "Burek"]),
+    ("nowak burek", []),
+])
+def test_search_by_dog_email_surname_and_phone(data, changelist, term, expected):
+    assert changelist(q=term) == expected
+
+
+def test_date_range_filter(data, changelist):
+    assert changelist(start_date__gte="2030-02-01") == ["Azor", "Burek"]
+    assert changelist(start_date__gte="2030-02-01", start_date__lte="2030-02-28") == ["Azor"]
+
+
+def test_date_range_filter_rejects_bad_dates(data, admin_client):
+    response = admin_client.get(reverse("admin:hotel_reservation_changelist"), {"start_date__gte": "jutro"})
+    assert response.status_code == 302
+
+
+def test_estimated_paginator_counts_exactly_below_limit(data, monkeypatch):
+    monkeypatch.setattr(EstimatedCountPaginator, "exact_limit", 2)
+    assert EstimatedCountPaginator(Reservation.objects.filter(dog_name="Azor"), 10).count == 1
+    # powyżej limitu bez estymatora bazy (SQLite) zostaje dolne ograniczenie
+    assert EstimatedCountPaginator(Reservation.objects.all(), 10).count >= 3
+
+
+def test_search_matches_every_owner_of_a_broad_term(data, changelist):
+    room = Room.objects.get()
+    owners = User.objects.bulk_create([
+        User(username=f"n{i}", email=f"n{i}@example.com", last_name=f"Nowicki{i}") for i in range(1200)
+    ])
+    Reservation.objects.bulk_create([
+        Reservation(user=owners[-1], room=room, dog_name="Ostatni",
+                    start_date=dt.date(2030, 4, 5), end_date=dt.date(2030, 4, 7)),
+    ])
+    assert changelist(q="nowi") == ["Ostatni"]
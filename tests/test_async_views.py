@@ -0,0 +1,37 @@
+import datetime as dt
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from hotel.models import Reservation, Room
+
+User = get_user_model()
+
+
+@pytest.fixture
+def reservation():
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=2, price_per_day=130)
+    return Reservation.objects.create(
+        user=User.objects.create(username="owner"), room=room, dog_name="Reksio",
+        start_date=dt.date(2025, 8, 10), end_date=dt.date(2025, 8, 12),
+    )
+
+
+@pytest.mark.django_db
+def test_async_views_through_asgi_handler(async_client, reservation, settings):
+    settings.WEATHER_BACKGROUND_REFRESH = False
+    url = reverse("reservation_confirmation", args=[reservation.pk])
+
+    async_client.force_login(reservation.user)
+    resp = async_to_sync(async_client.get)(url)
+    assert resp.status_code == 200
+    assert resp.context["total"] == 390
+
+    assert async_to_sync(async_client.get)(reverse("home")).status_code == 200
+    resp = async_to_sync(async_client.get)(reverse("availability_api"), {"room": reservation.room_id})
+    assert resp.status_code == 200
+
+    async_client.force_login(User.objects.create(username="other"))
+    assert async_to_sync(async_client.get)(url).status_code == 404
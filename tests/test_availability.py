@@ -0,0 +1,59 @@
+import datetime as dt
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from hotel.models import Room, Reservation
+
+User = get_user_model()
+
+
+@pytest.fixture
+def rooms():
+    yard = Room.objects.create(name="Wybieg", room_type="yard", capacity=3, price_per_day=80)
+    kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+    u = User.objects.create(username="u1")
+    Reservation.objects.create(
+        user=u, room=yard, dog_name="Reksio",
+        start_date=dt.date(2025, 8, 10), end_date=dt.date(2025, 8, 11),
+    )
+    Reservation.objects.create(
+        user=u, room=kennel, dog_name="Azor",
+        start_date=dt.date(2025, 8, 11), end_date=dt.date(2025, 8, 11),
+    )
+    return yard, kennel
+
+
+@pytest.mark.django_db
+def test_single_room_days(client, rooms):
+    yard, _ = rooms
+    resp = client.get(reverse("availability_api"), {"room": yard.pk, "start": "2025-08-10", "end": "2025-08-12"})
+
+    assert resp.status_code == 200
+    assert [(d["taken"], d["free"]) for d in resp.json()["days"]] == [(1, 2), (1, 2), (0, 3)]
+
+
+@pytest.mark.django_db
+def test_batch_matrix_for_several_rooms(client, rooms, django_assert_max_num_queries):
+    yard, kennel = rooms
+    with django_assert_max_num_queries(2):
+        resp = client.get(reverse("availability_api"), {
+            "rooms": f"{yard.pk},{kennel.pk}", "start": "2025-08-10", "end": "2025-08-12",
+        })
+
+    data = resp.json()
+    assert data["dates"] == ["2025-08-10", "2025-08-11", "2025-08-12"]
+    by_room = {row["room"]: row for row in data["rooms"]}
+    assert by_room[yard.pk]["free"] == [2, 2, 3]
+    assert by_room[kennel.pk]["taken"] == [0, 1, 0]
+    assert by_room[kennel.pk]["free"] == [1, 0, 1]
+
+
+@pytest.mark.django_db
+def test_batch_by_room_type_and_bad_date(client, rooms):
+    resp = client.get(reverse("availability_api"), {"room_type": "kennel", "start": "2025-08-10", "end": "2025-08-10"})
+    assert [row["room_name"] for row in resp.json()["rooms"]] == ["Kojec"]
+
+    resp = client.get(reverse("availability_api"), {"room_type": "kennel", "start": "10.08.2025"})
+    assert resp.status_code == 400
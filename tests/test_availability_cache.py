@@ -0,0 +1,73 @@
+import datetime as dt
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel.models import Room, Reservation
+
+User = get_user_model()
+
+PARAMS = {"start": "2025-08-10", "end": "2025-08-12"}
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(name="Wybieg", room_type="yard", capacity=2, price_per_day=80)
+
+
+def get(client, room, etag=None):
+    headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+    return client.get(reverse("availability_api"), {"room": room.pk, **PARAMS}, **headers)
+
+
+def book(room, django_capture_on_commit_callbacks):
+    # wersja podbijana jest dopiero po commicie, więc wykonujemy callbacki on_commit
+    with django_capture_on_commit_callbacks(execute=True):
+        return Reservation.objects.create(
+            user=User.objects.create(username=f"u{Reservation.objects.count()}"),
+            room=room, dog_name="Reksio",
+            start_date=dt.date(2025, 8, 10), end_date=dt.date(2025, 8, 11),
+        )
+
+
+@pytest.mark.django_db
+def test_if_none_match_returns_304_without_occupancy_queries(client, room):
+    first = get(client, room)
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = get(client, room, etag)
+
+    assert second.status_code == 304
+    assert second["ETag"] == etag
+    assert not [q for q in ctx.captured_queries if "roomday" in q["sql"].lower()]
+
+
+@pytest.mark.django_db
+def test_allocation_invalidates_cached_response(client, room, django_capture_on_commit_callbacks):
+    etag = get(client, room)["ETag"]
+
+    book(room, django_capture_on_commit_callbacks)
+
+    resp = get(client, room, etag)
+    assert resp.status_code == 200
+    assert resp["ETag"] != etag
+    assert [d["taken"] for d in resp.json()["days"]] == [1, 1, 0]
+
+
+@pytest.mark.django_db
+def test_delete_invalidates_cached_response(client, room, django_capture_on_commit_callbacks):
+    reservation = book(room, django_capture_on_commit_callbacks)
+    resp = get(client, room)
+    assert [d["taken"] for d in resp.json()["days"]] == [1, 1, 0]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.delete()
+
+    resp = get(client, room, resp["ETag"])
+    assert resp.status_code == 200
+    assert [d["taken"] for d in resp.json()["days"]] == [0, 0, 0]
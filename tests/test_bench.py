@@ -0,0 +1,37 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from hotel import bench
+from hotel.models import Reservation, RoomDayOccupancy, RoomDaySlot
+
+
+@pytest.mark.django_db
+def test_generated_data_respects_capacity():
+    dataset = bench.generate(rooms=3, users=5, reservations=200, days=60)
+
+    assert Reservation.objects.count() == dataset.reservations
+    assert RoomDaySlot.objects.count() == dataset.slots
+    assert not RoomDayOccupancy.objects.filter(taken__gt=F("room__capacity")).exists()
+    per_day = {
+        (row["room_id"], row["date"]): row["n"]
+        for row in RoomDaySlot.objects.values("room_id", "date").annotate(n=Count("id")).order_by()
+    }
+    counters = {(room_id, day): taken for room_id, day, taken in RoomDayOccupancy.objects.values_list("room_id", "date", "taken")}
+    assert per_day == counters
+
+
+@pytest.mark.django_db
+def test_bench_command_writes_report_and_rolls_back(tmp_path):
+    output = tmp_path / "bench.json"
+    call_command(
+        "bench", rooms=2, users=3, reservations=20, days=30, repeat=2, output=str(output), stdout=io.StringIO(),
+    )
+
+    report = json.loads(output.read_text())
+    assert {"reservation_save", "availability_api", "account_reservations"} <= report["results"].keys()
+    assert report["results"]["availability_api_cached"]["queries"] == 0
+    assert Reservation.objects.count() == 0
@@ -2,8 +2,9 @@
 import datetime as dt
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import transaction
-from hotel.models import Room, Reservation  # dostosuj import
+from hotel.models import Room, Reservation, RoomDayOccupancy  # dostosuj import
 
 User = get_user_model()
 
@@ -24,3 +25,73 @@ def test_cannot_overbook_room_by_slots():
             start_date=dt.date(2025, 8, 11),
             end_date=dt.date(2025, 8, 13),
         )
+
+
+@pytest.mark.django_db
+def test_allocation_picks_lowest_free_slot_per_day():
+    u = User.objects.create(username="u2")
+    room = Room.objects.create(name="Wybieg", room_type="yard", capacity=2, price_per_day=80)
+
+    Reservation.objects.create(
+        user=u, room=room, dog_name="Reksio",
+        start_date=dt.date(2025, 8, 10),
+        end_date=dt.date(2025, 8, 11),
+    )
+    b = Reservation.objects.create(
+        user=u, room=room, dog_name="Azor",
+        start_date=dt.date(2025, 8, 11),
+        end_date=dt.date(2025, 8, 12),
+    )
+
+    assert list(b.day_slots.order_by("date").values_list("date", "slot")) == [
+        (dt.date(2025, 8, 11), 2),
+        (dt.date(2025, 8, 12), 1),
+    ]
+
+
+@pytest.mark.django_db
+def test_full_day_reports_date_and_leaves_no_slots():
+    u = User.objects.create(username="u3")
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+    Reservation.objects.create(
+        user=u, room=room, dog_name="Reksio",
+        start_date=dt.date(2025, 8, 12),
+        end_date=dt.date(2025, 8, 12),
+    )
+
+    with pytest.raises(ValidationError, match="dnia 2025-08-12"):
+        with transaction.atomic():
+            Reservation.objects.create(
+                user=u, room=room, dog_name="Azor",
+                start_date=dt.date(2025, 8, 10),
+                end_date=dt.date(2025, 8, 13),
+            )
+
+    assert not Reservation.objects.filter(dog_name="Azor").exists()
+    assert room.day_slots.count() == 1
+
+
+@pytest.mark.django_db
+def test_occupancy_counters_follow_reservations():
+    u = User.objects.create(username="u4")
+    room = Room.objects.create(name="Wybieg", room_type="yard", capacity=3, price_per_day=80)
+    a = Reservation.objects.create(
+        user=u, room=room, dog_name="Reksio",
+        start_date=dt.date(2025, 8, 10), end_date=dt.date(2025, 8, 11),
+    )
+    Reservation.objects.create(
+        user=u, room=room, dog_name="Azor",
+        start_date=dt.date(2025, 8, 11), end_date=dt.date(2025, 8, 12),
+    )
+
+    def counters():
+        return dict(RoomDayOccupancy.objects.filter(room=room).values_list("date", "taken"))
+
+    assert counters() == {dt.date(2025, 8, 10): 1, dt.date(2025, 8, 11): 2, dt.date(2025, 8, 12): 1}
+
+    a.delete()
+    assert counters() == {dt.date(2025, 8, 10): 0, dt.date(2025, 8, 11): 1, dt.date(2025, 8, 12): 1}
+
+    # usuwanie zbiorcze (np. akcja w adminie) też zwalnia liczniki
+    Reservation.objects.filter(room=room).delete()
+    assert set(counters().values()) == {0}
@@ -0,0 +1,100 @@
+import datetime as dt
+import io
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.urls import reverse
+
+from hotel.allocation import lock_occupancy
+from hotel.capacity import sweep
+from hotel.models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+
+User = get_user_model()
+
+
+def book(user, room, start, end, name="Reksio"):
+    return Reservation.objects.create(user=user, room=room, dog_name=name, start_date=start, end_date=end)
+
+
+def taken(client, room, start, end):
+    response = client.get(reverse("availability_api"), {"room": room.pk, "start": start, "end": end})
+    return [day["taken"] for day in response.json()["days"]]
+
+
+def test_sweep_counts_inclusive_ranges():
+    stays = [(dt.date(2030, 1, 1), dt.date(2030, 1, 3)), (dt.date(2030, 1, 3), dt.date(2030, 1, 8))]
+    assert sweep(stays, dt.date(2030, 1, 2), dt.date(2030, 1, 5)) == [1, 2, 1, 1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_backends_enforce_capacity_and_report_availability(backend, settings, client, django_capture_on_commit_callbacks):
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    user = User.objects.create(username="u1")
+    room = Room.objects.create(name="Wybieg", room_type="yard", capacity=2, price_per_day=80)
+
+    book(user, room, dt.date(2030, 1, 1), dt.date(2030, 1, 3))
+    second = book(user, room, dt.date(2030, 1, 3), dt.date(2030, 1, 4), name="Azor")
+    with pytest.raises(ValidationError):
+        book(user, room, dt.date(2030, 1, 2), dt.date(2030, 1, 3), name="Burek")
+
+    assert taken(client, room, "2030-01-01", "2030-01-05") == [1, 1, 2, 1, 0]
+    assert RoomDaySlot.objects.exists() == (backend == "slots")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert taken(client, room, "2030-01-01", "2030-01-05") == [1, 1, 1, 0, 0]
+    book(user, room, dt.date(2030, 1, 2), dt.date(2030, 1, 3), name="Burek")
+
+
+@pytest.mark.django_db
+def test_convert_between_backends(settings, client):
+    user = User.objects.create(username="u2")
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=2, price_per_day=100)
+    book(user, room, dt.date(2030, 2, 1), dt.date(2030, 2, 4))
+    book(user, room, dt.date(2030, 2, 3), dt.date(2030, 2, 5), name="Azor")
+    expected = taken(client, room, "2030-02-01", "2030-02-06")
+
+    settings.HOTEL_CAPACITY_BACKEND = "range"
+    call_command("convert_capacity", to="range", stdout=io.StringIO())
+    assert not RoomDaySlot.objects.exists() and not RoomDayOccupancy.objects.exists()
+    assert taken(client, room, "2030-02-01", "2030-02-06") == expected
+    book(user, room, dt.date(2030, 2, 5), dt.date(2030, 2, 6), name="Burek")
+
+    settings.HOTEL_CAPACITY_BACKEND = "slots"
+    call_command("convert_capacity", to="slots", stdout=io.StringIO())
+    call_command("rebuild_occupancy", verify=True, stdout=io.StringIO())
+    assert RoomDaySlot.objects.count() == 4 + 3 + 2
+    with pytest.raises(ValidationError):
+        book(user, room, dt.date(2030, 2, 4), dt.date(2030, 2, 4), name="Fafik")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_occupancy_blocks_bookings_creating_counters():
+    if connection.vendor != "postgresql":
+        pytest.skip("wymaga PostgreSQL – blokada tabeli widziana z drugiego połączenia")
+    room = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=100)
+    day = dt.date.today() + dt.timedelta(days=30)
+    blocked = []
+
+    def book():
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = '200ms'")
+                lock_occupancy(room, [day])
+        except OperationalError:
+            blocked.append(day)
+        finally:
+            connections.close_all()
+
+    with transaction.atomic():
+        call_command("rebuild_occupancy", stdout=io.StringIO())
+        thread = threading.Thread(target=book)
+        thread.start()
+        thread.join()
+    assert blocked == [day]
@@ -0,0 +1,96 @@
+import datetime as dt
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel.catalog import get_catalog
+from hotel.models import Reservation, Room
+
+User = get_user_model()
+
+
+@pytest.fixture
+def rooms():
+    return [
+        Room.objects.create(name="Pokój", room_type="indoor", capacity=5, price_per_day=180),
+        Room.objects.create(name="Wybieg B", room_type="yard", capacity=10, price_per_day=90),
+        Room.objects.create(name="Wybieg A", room_type="yard", capacity=10, price_per_day=80),
+    ]
+
+
+def room_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if 'FROM "hotel_room"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_views_do_not_query_rooms_once_catalog_is_warm(client, rooms, settings):
+    settings.WEATHER_BACKGROUND_REFRESH = False
+    client.force_login(User.objects.create(username="u1"))
+    urls = [
+        reverse("home"),
+        reverse("room_list"),
+        reverse("create_reservation") + "?room_type=yard",
+        reverse("availability_api") + f"?room={rooms[0].pk}",
+        reverse("availability_api") + "?room_type=yard",
+    ]
+    for url in urls:
+        client.get(url)
+
+    with CaptureQueriesContext(connection) as ctx:
+        for url in urls:
+            assert client.get(url).status_code == 200
+
+    assert room_queries(ctx) == []
+
+
+@pytest.mark.django_db
+def test_catalog_indexes_and_invalidation(rooms, django_capture_on_commit_callbacks):
+    catalog = get_catalog()
+    assert [r.name for r in catalog.of_type("yard")] == ["Wybieg A", "Wybieg B"]
+    assert catalog.cheapest["yard"].name == "Wybieg A"
+    assert get_catalog() is catalog
+
+    room = rooms[1]
+    room.price_per_day = 50
+    with django_capture_on_commit_callbacks(execute=True):
+        room.save()
+
+    fresh = get_catalog()
+    assert fresh is not catalog
+    assert fresh.cheapest["yard"].name == "Wybieg B"
+
+
+@pytest.mark.django_db
+def test_reservation_form_posts_catalog_room(client, rooms):
+    user = User.objects.create(username="u2")
+    client.force_login(user)
+    start = dt.date.today() + dt.timedelta(days=3)
+
+    resp = client.post(reverse("create_reservation"), {
+        "dog_name": "Reksio", "room": rooms[2].pk,
+        "start_date": start.isoformat(), "end_date": (start + dt.timedelta(days=2)).isoformat(),
+    })
+
+    reservation = Reservation.objects.get(user=user)
+    assert resp.status_code == 302
+    assert reservation.room_id == rooms[2].pk
+    assert reservation.day_slots.count() == 3
+
+
+@pytest.mark.django_db
+def test_booking_checks_capacity_from_database_not_catalog(rooms):
+    user = User.objects.create(username="u3")
+    start = dt.date.today() + dt.timedelta(days=3)
+    indoor = rooms[0]
+    Reservation.objects.create(user=user, room=indoor, dog_name="Azor", start_date=start, end_date=start)
+    stale = get_catalog().get(indoor.pk).as_room()
+    # zmiana bez sygnałów: katalog procesu dalej widzi pojemność 5
+    Room.objects.filter(pk=indoor.pk).update(capacity=1)
+
+    with pytest.raises(ValidationError, match="Brak wolnych miejsc"):
+        Reservation.objects.create(user=user, room=stale, dog_name="Reks", start_date=start, end_date=start)
+    assert Reservation.objects.filter(room=indoor).count() == 1
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+
+from hotel import dbpool
+
+
+@pytest.mark.django_db
+def test_pool_stats_requires_staff(client):
+    user = User.objects.create_user("guest", "guest@example.com", "pass")
+    client.force_login(user)
+    assert client.get(reverse("db_pool_stats")).status_code == 302
+
+    user.is_staff = True
+    user.save()
+    stats = client.get(reverse("db_pool_stats")).json()
+    assert stats["pid"] == os.getpid()
+    assert stats["mode"] in {"pool", "persistent", "per-request"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pool_reuses_connections():
+    if connection.vendor != "postgresql" or connection.pool is None:
+        pytest.skip("wymaga PostgreSQL z OPTIONS['pool']")
+
+    connection.close()
+    before = dbpool.pool_stats()
+    for _ in range(20):
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.close()  # z pulą: zwrot połączenia, nie rozłączenie
+    after = dbpool.pool_stats()
+
+    assert after["connects"] - before["connects"] == 20
+    assert after.get("connections_num", 0) - before.get("connections_num", 0) <= 1
+    assert after["pool_size"] <= after["pool_max"]
+
+
+def test_fork_forgets_inherited_pool():
+    pools = type(connection).__dict__.get("_connection_pools")
+    sentinel = object()
+    if pools is not None:
+        pools["sentinel"] = sentinel
+    pid = os.fork()
+    if pid == 0:
+        ok = pools is None or "sentinel" not in pools
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    if pools is not None:
+        pools.pop("sentinel", None)
+    assert os.waitstatus_to_exitcode(status) == 0
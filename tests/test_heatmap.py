@@ -0,0 +1,70 @@
+import csv
+import datetime as dt
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from hotel.models import Reservation, Room
+
+User = get_user_model()
+
+
+@pytest.fixture
+def booked(db):
+    user = User.objects.create(username="u")
+    a = Room.objects.create(name="Kojec A", room_type="kennel", capacity=1, price_per_day=100)
+    b = Room.objects.create(name="Kojec B", room_type="kennel", capacity=2, price_per_day=100)
+    Room.objects.create(name="Wybieg", room_type="yard", capacity=5, price_per_day=80)
+    Reservation.objects.create(user=user, room=a, dog_name="Reksio", start_date=dt.date(2030, 1, 2), end_date=dt.date(2030, 1, 3))
+    Reservation.objects.create(user=user, room=b, dog_name="Azor", start_date=dt.date(2030, 1, 3), end_date=dt.date(2030, 1, 4))
+    return a, b
+
+
+def test_heatmap_requires_staff(client, booked):
+    response = client.get(reverse("staff_occupancy"))
+    assert response.status_code == 302
+
+
+def test_heatmap_json_rooms_and_types(admin_client, booked):
+    a, b = booked
+    data = admin_client.get(
+        reverse("staff_occupancy"), {"start": "2030-01-01", "end": "2030-01-05", "format": "json"},
+    ).json()
+
+    rooms = {r["room"]: r["taken"] for r in data["rooms"]}
+    assert rooms[a.pk] == [0, 1, 1, 0, 0]
+    assert rooms[b.pk] == [0, 0, 1, 1, 0]
+    types = {t["room_type"]: (t["capacity"], t["taken"]) for t in data["room_types"]}
+    assert types["kennel"] == (3, [0, 1, 2, 1, 0])
+    assert types["yard"] == (5, [0] * 5)
+
+
+def test_heatmap_csv_and_page(admin_client, booked):
+    url = reverse("staff_occupancy")
+    response = admin_client.get(url, {"start": "2030-01-01", "end": "2030-01-05", "format": "csv"})
+    rows = list(csv.reader(io.StringIO(response.content.decode())))
+    assert rows[0][:4] == ["typ", "miejsce", "pojemność", "2030-01-01"]
+    assert ["room", "Kojec A", "1", "0", "1", "1", "0", "0"] in rows
+
+    page = admin_client.get(url, {"start": "2030-01-01", "end": "2030-12-31"})
+    assert page.status_code == 200
+    assert len(page.context["dates"]) == 365
+    assert admin_client.get(url, {"start": "2030-01-01", "end": "2031-06-01"}).status_code == 400
+
+
+def test_heatmap_is_cached_until_occupancy_changes(admin_client, booked, django_assert_num_queries, django_capture_on_commit_callbacks):
+    a, _ = booked
+    params = {"start": "2030-01-01", "end": "2030-01-05", "format": "json"}
+    url = reverse("staff_occupancy")
+    admin_client.get(url, params)
+
+    with django_assert_num_queries(2):  # sesja i użytkownik – macierz z cache
+        admin_client.get(url, params)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Reservation.objects.create(user=a.reservations.first().user, room=a, dog_name="Burek",
+                                   start_date=dt.date(2030, 1, 5), end_date=dt.date(2030, 1, 5))
+    data = admin_client.get(url, params).json()
+    assert [r["taken"] for r in data["rooms"] if r["room"] == a.pk] == [[0, 1, 1, 0, 1]]
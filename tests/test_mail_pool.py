@@ -0,0 +1,47 @@
+import pytest
+from django.core.mail import EmailMessage, get_connection
+
+from hotel import mail_backends
+
+
+@pytest.fixture
+def pooled(smtp_server, settings):
+    settings.EMAIL_BACKEND = "hotel.mail_backends.PooledSMTPBackend"
+    settings.EMAIL_POOL_CHECK_AFTER = 0
+    mail_backends._pool.clear()
+    return smtp_server
+
+
+def send(n, subject="Test"):
+    connection = get_connection()
+    messages = [EmailMessage(f"{subject} {i}", "Treść", "hotel@example.com", ["a@example.com"]) for i in range(n)]
+    return connection.send_messages(messages)
+
+
+def test_batches_reuse_one_connection(pooled):
+    before = mail_backends.stats()
+
+    assert send(3) == 3
+    assert send(2) == 2
+
+    after = mail_backends.stats()
+    assert pooled.connections == 1
+    assert len(pooled.messages) == 5
+    assert after["connections_opened"] - before["connections_opened"] == 1
+    assert after["messages_sent"] - before["messages_sent"] == 5
+
+
+def test_reconnects_after_server_drops_idle_connection(pooled, settings):
+    assert send(1) == 1
+
+    # serwer zrywa połączenie; sprawdzenie NOOP przy pobraniu z puli to wykrywa
+    pooled.drop_idle = True
+    assert send(1) == 1
+
+    # zerwanie w trakcie wysyłki (bez NOOP) też jest obsłużone
+    settings.EMAIL_POOL_CHECK_AFTER = 3600
+    pooled.drop_idle = True
+    assert send(1) == 1
+
+    assert len(pooled.messages) == 3
+    assert pooled.connections == 3
@@ -0,0 +1,111 @@
+import io
+
+import pytest
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import call_command
+from django.urls import reverse
+
+from hotel import mail_backends, outbox
+from hotel.models import OutboxMessage
+
+
+def queue_message(subject="Test", to="klient@example.com", bcc="kopia@example.com"):
+    msg = EmailMultiAlternatives(
+        subject=subject, body="Treść", from_email="hotel@example.com",
+        to=[to], bcc=[bcc] if bcc else [], reply_to=["rezerwacje@example.com"],
+    )
+    msg.attach_alternative("<p>Treść</p>", "text/html")
+    return outbox.enqueue(msg)
+
+
+@pytest.mark.django_db
+def test_contact_form_queues_instead_of_sending(client, smtp_server):
+    resp = client.post(reverse("contact"), {
+        "fullname": "Jan Kowalski", "email": "jan@example.com", "subject": "Pytanie", "message": "Czy są miejsca?",
+    })
+
+    assert resp.status_code == 302
+    assert smtp_server.connections == 0
+    message = OutboxMessage.objects.get()
+    assert message.status == OutboxMessage.PENDING
+    assert message.reply_to == ["jan@example.com"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_delivers_batch_over_one_connection(smtp_server):
+    queued = [queue_message(f"Wiadomość {i}") for i in range(3)]
+
+    call_command("deliver_outbox", once=True, stdout=io.StringIO())
+
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 3
+    assert any("kopia@example.com" in r for r in smtp_server.messages[0]["rcpts"])
+    assert b"text/html" in smtp_server.messages[0]["data"]
+    for message in OutboxMessage.objects.filter(pk__in=[m.pk for m in queued]):
+        assert message.status == OutboxMessage.SENT
+        assert message.delivery_ms is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_delivery_is_retried_with_backoff(smtp_server):
+    smtp_server.fail_data = True
+    message = queue_message()
+
+    call_command("deliver_outbox", once=True, stdout=io.StringIO())
+
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.PENDING
+    assert message.attempts == 1
+    assert "451" in message.last_error
+    assert outbox.claim_batch() == []  # następna próba dopiero po backoffie
+
+
+@pytest.mark.django_db(transaction=True)
+def test_claimed_batch_is_one_send_messages_call(smtp_server, settings):
+    settings.EMAIL_BACKEND = "hotel.mail_backends.PooledSMTPBackend"
+    mail_backends._pool.clear()
+    smtp_server.reject = {"nieznany@example.com"}
+    good = [queue_message(f"Wiadomość {i}") for i in range(3)]
+    bad = queue_message("Odrzucona", to="nieznany@example.com", bcc=None)
+    before = mail_backends.stats()
+
+    assert outbox.deliver(outbox.claim_batch()) == (3, 1)
+
+    after = mail_backends.stats()
+    assert after["batches"] - before["batches"] == 1
+    assert after["messages_sent"] - before["messages_sent"] == 3
+    assert set(OutboxMessage.objects.filter(pk__in=[m.pk for m in good]).values_list("status", flat=True)) == {
+        OutboxMessage.SENT,
+    }
+    bad.refresh_from_db()
+    assert (bad.status, bad.attempts) == (OutboxMessage.PENDING, 1)
+    assert "550" in bad.last_error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_reconnect_requeues_rest_of_batch(smtp_server, settings):
+    settings.EMAIL_BACKEND = "hotel.mail_backends.PooledSMTPBackend"
+    mail_backends._pool.clear()
+    smtp_server.drop_after_messages = 1
+    queued = [queue_message(f"Wiadomość {i}") for i in range(3)]
+
+    assert outbox.deliver(outbox.claim_batch()) == (1, 2)
+
+    assert len(smtp_server.messages) == 1
+    statuses = [OutboxMessage.objects.get(pk=m.pk).status for m in queued]
+    assert statuses == [OutboxMessage.SENT, OutboxMessage.PENDING, OutboxMessage.PENDING]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unexpected_error_requeues_unconfirmed_messages(smtp_server, settings):
+    settings.EMAIL_BACKEND = "hotel.mail_backends.PooledSMTPBackend"
+    mail_backends._pool.clear()
+    queued = [queue_message(f"Wiadomość {i}") for i in range(3)]
+    # nagłówek z nową linią: message() rzuca BadHeaderError, spoza błędów SMTP
+    OutboxMessage.objects.filter(pk=queued[1].pk).update(headers={"X-Zle": "a\nb"})
+
+    assert outbox.deliver(outbox.claim_batch()) == (1, 2)
+
+    assert len(smtp_server.messages) == 1
+    statuses = [OutboxMessage.objects.get(pk=m.pk).status for m in queued]
+    assert statuses == [OutboxMessage.SENT, OutboxMessage.PENDING, OutboxMessage.PENDING]
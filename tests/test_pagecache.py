@@ -0,0 +1,51 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from hotel.models import Room
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["room_list", "about", "terms"])
+def test_anonymous_pages_come_from_cache(client, name, django_capture_on_commit_callbacks):
+    url = reverse(name)
+    first = client.get(url)
+    assert first.status_code == 200 and first.templates
+    second = client.get(url)
+    assert second.templates == []  # nic nie renderowano
+    assert second.content == first.content
+
+    # każda zmiana pokoi daje nową wersję katalogu, więc i nowy klucz strony
+    with django_capture_on_commit_callbacks(execute=True):
+        Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+    assert client.get(url).templates
+
+
+@pytest.mark.django_db
+def test_logged_in_render_shares_fragments_not_user_menu(client, django_capture_on_commit_callbacks):
+    url = reverse("about")
+    assert "Zaloguj" in client.get(url).content.decode()
+
+    ala = User.objects.create(username="ala", first_name="Ala")
+    client.force_login(ala)
+    resp = client.get(url)
+    body = resp.content.decode()
+    assert resp.templates  # zalogowani nie dostają strony z cache
+    assert "Ala" in body and "csrfmiddlewaretoken" in body and "Zaloguj" not in body
+
+    client.force_login(User.objects.create(username="bartek"))
+    body = client.get(url).content.decode()
+    assert "bartek" in body and "Ala" not in body
+
+    client.logout()
+    assert "bartek" not in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_template_cache_can_be_disabled(client, settings):
+    settings.TEMPLATE_CACHE_TIMEOUT = 0
+    url = reverse("terms")
+    client.get(url)
+    assert client.get(url).templates
@@ -0,0 +1,165 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel import pricing
+from hotel.models import OutboxMessage, PriceOverride, Reservation, Room, Service
+
+User = get_user_model()
+
+
+@pytest.fixture
+def rooms():
+    return [
+        Room.objects.create(name="Pokój", room_type="indoor", capacity=5, price_per_day=100),
+        Room.objects.create(name="Wybieg", room_type="yard", capacity=10, price_per_day=50),
+    ]
+
+
+def naive_total(room, start, end, overrides):
+    """Reference: price each night separately, most specific (then newest) override wins."""
+    total = Decimal(0)
+    day = start
+    while day <= end:
+        matching = [
+            o for o in overrides
+            if o.start_date <= day <= o.end_date
+            and (o.room_id in (None, room.pk)) and (o.room_type in ("", room.room_type))
+        ]
+        matching.sort(key=lambda o: (2 if o.room_id else 1 if o.room_type else 0, o.pk))
+        total += matching[-1].price_per_day if matching else room.price_per_day
+        day += dt.timedelta(days=1)
+    return total
+
+
+@pytest.mark.django_db
+def test_overrides_and_prefix_sums_match_night_by_night_pricing(rooms, settings):
+    settings.PRICE_HORIZON_DAYS = 60
+    today = timezone.localdate()
+    indoor, yard = rooms
+    overrides = [
+        PriceOverride.objects.create(label="Lato", start_date=today + dt.timedelta(days=5),
+                                     end_date=today + dt.timedelta(days=40), price_per_day=Decimal("70.50")),
+        PriceOverride.objects.create(label="Wybiegi", room_type="yard", start_date=today + dt.timedelta(days=10),
+                                     end_date=today + dt.timedelta(days=20), price_per_day=Decimal("30")),
+        PriceOverride.objects.create(label="Święta", room=indoor, start_date=today + dt.timedelta(days=15),
+                                     end_date=today + dt.timedelta(days=17), price_per_day=Decimal("250")),
+        # poza horyzontem kalendarza
+        PriceOverride.objects.create(label="Sylwester", start_date=today + dt.timedelta(days=70),
+                                     end_date=today + dt.timedelta(days=71), price_per_day=Decimal("300")),
+    ]
+
+    for room in rooms:
+        for start_offset, end_offset in [(0, 0), (0, 59), (3, 12), (14, 18), (39, 41), (55, 75), (-5, 2)]:
+            start = today + dt.timedelta(days=start_offset)
+            end = today + dt.timedelta(days=end_offset)
+            q = pricing.quote(room.pk, start, end)
+            assert q.nights == end_offset - start_offset + 1
+            assert q.total == naive_total(room, start, end, overrides), (room, start_offset, end_offset)
+
+
+@pytest.mark.django_db
+def test_room_created_in_the_same_transaction_is_priced(rooms):
+    today = timezone.localdate()
+    summer = PriceOverride.objects.create(label="Kojce", room_type="kennel", start_date=today + dt.timedelta(days=2),
+                                          end_date=today + dt.timedelta(days=3), price_per_day=Decimal("99"))
+    pricing.quote(rooms[0].pk, today, today)  # kalendarz i katalog już zbudowane, bez nowego pokoju
+    start, end = today + dt.timedelta(days=1), today + dt.timedelta(days=4)
+
+    with transaction.atomic():
+        kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+        reservation = Reservation.objects.create(
+            user=User.objects.create(username="ala"), room=kennel, dog_name="Azor", start_date=start, end_date=end,
+        )
+
+    assert reservation.total_price == naive_total(kennel, start, end, [summer]) == Decimal("458")
+    with pytest.raises(Room.DoesNotExist):
+        pricing.quote(999999, start, end)
+
+
+@pytest.mark.django_db
+def test_quotes_are_query_free_once_warm_and_rebuilt_on_change(rooms, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    room = rooms[0]
+    stay = (room.pk, today, today + dt.timedelta(days=2))
+    assert pricing.quote(*stay).total == Decimal("300.00")
+
+    with CaptureQueriesContext(connection) as ctx:
+        quotes = pricing.quote_many([stay] * 50)
+    assert len(ctx.captured_queries) == 0
+    assert {q.total for q in quotes} == {Decimal("300.00")}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PriceOverride.objects.create(room=room, start_date=today, end_date=today, price_per_day=10)
+    assert pricing.quote(*stay).total == Decimal("210.00")
+
+    room.price_per_day = 20
+    with django_capture_on_commit_callbacks(execute=True):
+        room.save()
+    assert pricing.quote(*stay).total == Decimal("50.00")
+
+
+@pytest.mark.django_db
+def test_quote_api_batches_rooms_and_pairs(client, rooms):
+    today = timezone.localdate()
+    grooming = Service.objects.create(name="Strzyżenie", price=Decimal("40"))
+    end = today + dt.timedelta(days=3)
+
+    resp = client.get(reverse("quote_api"), {
+        "rooms": ",".join(str(r.pk) for r in rooms),
+        "start": today.isoformat(),
+        "end": end.isoformat(),
+        "services": str(grooming.pk),
+    })
+    assert resp.status_code == 200
+    totals = {q["room"]: (q["nights"], q["total"]) for q in resp.json()["quotes"]}
+    assert totals == {rooms[0].pk: (4, "440.00"), rooms[1].pk: (4, "240.00")}
+
+    items = [f"{rooms[0].pk}:{today}:{today}", f"{rooms[1].pk}:{today}:{end}"]
+    resp = client.get(reverse("quote_api"), {"items": items})
+    assert [q["total"] for q in resp.json()["quotes"]] == ["100.00", "200.00"]
+
+    assert client.get(reverse("quote_api"), {"items": f"{rooms[0].pk}:{end}:{today}"}).status_code == 400
+    assert client.get(reverse("quote_api"), {"items": "x:y"}).status_code == 400
+    assert client.get(reverse("quote_api"), {"items": f"999999:{today}:{today}"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_booking_stores_quoted_price_with_services(client, rooms, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    room = rooms[1]
+    walk = Service.objects.create(name="Spacer", price=Decimal("15"))
+    with django_capture_on_commit_callbacks(execute=True):
+        PriceOverride.objects.create(room_type="yard", start_date=today + dt.timedelta(days=2),
+                                     end_date=today + dt.timedelta(days=2), price_per_day=80)
+    user = User.objects.create(username="u1", email="u1@example.com")
+    client.force_login(user)
+
+    resp = client.post(reverse("create_reservation"), {
+        "dog_name": "Burek",
+        "room": room.pk,
+        "start_date": (today + dt.timedelta(days=1)).isoformat(),
+        "end_date": (today + dt.timedelta(days=3)).isoformat(),
+        "services": [walk.pk],
+    })
+    assert resp.status_code == 302
+    reservation = Reservation.objects.get(user=user)
+    assert reservation.total_price == Decimal("195.00")
+    assert list(reservation.services.all()) == [walk]
+    assert "Razem: 195.00 zł" in OutboxMessage.objects.get().body
+
+    # cena zapisana przy rezerwacji nie zmienia się razem z cennikiem
+    with django_capture_on_commit_callbacks(execute=True):
+        PriceOverride.objects.all().delete()
+    assert Reservation.objects.with_totals().get(pk=reservation.pk).total == Decimal("195.00")
+    assert "195,00" in client.get(reverse("reservation_confirmation", args=[reservation.pk])).content.decode()
+
+    # wiersze sprzed wyceny: stawka bazowa
+    Reservation.objects.filter(pk=reservation.pk).update(total_price=None)
+    assert Reservation.objects.with_totals().get(pk=reservation.pk).total == Decimal("150.00")
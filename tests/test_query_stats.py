@@ -0,0 +1,67 @@
+import json
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.urls import reverse
+
+from hotel.middleware import QueryStatsMiddleware
+from hotel.models import Reservation, Room
+
+
+@pytest.fixture(autouse=True)
+def server_timing(settings):
+    # nagłówek domyślnie tylko przy DEBUG – nie pokazujemy liczby zapytań anonimowym klientom
+    settings.PERF_SERVER_TIMING = True
+
+
+@pytest.fixture
+def guest(client):
+    user = User.objects.create_user("guest", "guest@example.com", "pass")
+    client.force_login(user)
+    return user
+
+
+@pytest.mark.django_db
+def test_server_timing_header_counts_queries(client, guest):
+    response = client.get(reverse("account_reservations"))
+
+    db, app, total = response.headers["Server-Timing"].split(", ")
+    assert db.startswith("db;dur=") and 'desc="' in db
+    assert int(db.split('desc="')[1].split()[0]) > 0
+    assert app.startswith("app;dur=") and total.startswith("total;dur=")
+
+
+@pytest.mark.django_db
+def test_async_view_queries_are_counted(client):
+    Room.objects.create(name="A", room_type="kennel", capacity=1, price_per_day=100)
+
+    response = client.get(reverse("availability_api"), {"room_type": "kennel"})
+
+    assert 'desc="0 queries"' not in response.headers["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_repeated_queries_are_logged(rf, settings, caplog):
+    settings.PERF_REPEATED_QUERY_THRESHOLD = 3
+    rooms = [Room.objects.create(name=f"R{i}", room_type="kennel", capacity=1, price_per_day=100) for i in range(4)]
+
+    def n_plus_one(request):
+        for room in rooms:
+            Reservation.objects.filter(room=room).count()
+        return HttpResponse("ok")
+
+    with caplog.at_level(logging.WARNING, logger="hotel.perf"):
+        QueryStatsMiddleware(n_plus_one)(rf.get("/"))
+
+    (entry,) = [json.loads(r.getMessage()) for r in caplog.records if r.name == "hotel.perf"]
+    assert entry["event"] == "repeated_queries"
+    assert entry["queries"] == 4
+    assert entry["repeated"][0]["count"] == 4
+
+
+@pytest.mark.django_db
+def test_server_timing_is_off_unless_enabled(client, settings):
+    settings.PERF_SERVER_TIMING = False
+    assert "Server-Timing" not in client.get(reverse("about")).headers
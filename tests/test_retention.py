@@ -0,0 +1,100 @@
+import datetime as dt
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from hotel.capacity import get_backend
+from hotel.catalog import get_catalog
+from hotel.models import Reservation, Room, RoomDayHistory, RoomDayOccupancy, RoomDaySlot, RoomDaySlotArchive
+
+User = get_user_model()
+
+
+@pytest.fixture
+def past():
+    today = timezone.localdate()
+    yard = Room.objects.create(name="Wybieg", room_type="yard", capacity=2, price_per_day=80)
+    owner = User.objects.create(username="wlasciciel")
+    stays = [
+        (today - dt.timedelta(days=200), today - dt.timedelta(days=150)),
+        (today - dt.timedelta(days=160), today - dt.timedelta(days=100)),
+        (today - dt.timedelta(days=5), today + dt.timedelta(days=5)),
+    ]
+    for i, (start, end) in enumerate(stays):
+        Reservation.objects.create(user=owner, room=yard, dog_name=f"Pies {i}", start_date=start, end_date=end)
+    return yard, today
+
+
+@pytest.mark.django_db
+def test_archive_slots_keeps_daily_counts(past):
+    yard, today = past
+    first = today - dt.timedelta(days=200)
+    cutoff = today - dt.timedelta(days=90)
+    before = get_backend().taken_matrix([yard.pk], first, today)[yard.pk]
+
+    out = io.StringIO()
+    call_command("archive_slots", days_per_batch=7, stdout=out)
+    assert "Przeniesiono slotów: 112" in out.getvalue()
+
+    assert not RoomDaySlot.objects.filter(date__lt=cutoff).exists()
+    assert not RoomDayOccupancy.objects.filter(date__lt=cutoff).exists()
+    assert RoomDaySlotArchive.objects.count() == 112
+    assert RoomDayHistory.objects.get(room=yard, date=today - dt.timedelta(days=155)).taken == 2
+    assert RoomDayHistory.objects.count() == 101
+    assert RoomDaySlot.objects.count() == 11
+
+    # podsumowanie zastępuje sloty w odczytach zajętości, a liczniki zostają zgodne
+    assert get_backend().taken_matrix([yard.pk], first, today)[yard.pk] == before
+    call_command("rebuild_occupancy", verify=True, stdout=io.StringIO())
+
+    # drugi przebieg nie ma już czego przenosić
+    out = io.StringIO()
+    call_command("archive_slots", stdout=out)
+    assert "Przeniesiono slotów: 0" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_archive_slots_without_detail_and_limits(past, settings):
+    yard, today = past
+    call_command("archive_slots", before=today - dt.timedelta(days=120), no_detail=True, stdout=io.StringIO())
+    assert not RoomDaySlotArchive.objects.exists()
+    assert RoomDayHistory.objects.filter(date__gte=today - dt.timedelta(days=120)).count() == 0
+
+    with pytest.raises(CommandError, match="dni przeszłe"):
+        call_command("archive_slots", before=today + dt.timedelta(days=1))
+    settings.HOTEL_CAPACITY_BACKEND = "range"
+    with pytest.raises(CommandError, match="HOTEL_CAPACITY_BACKEND=slots"):
+        call_command("archive_slots")
+
+
+@pytest.mark.django_db
+def test_archive_does_not_depend_on_the_process_catalog(past):
+    yard, today = past
+    get_catalog()  # katalog procesu zbudowany przed dodaniem pokoju
+    kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+    day = today - dt.timedelta(days=120)
+    Reservation.objects.create(user=User.objects.get(), room=kennel, dog_name="Reks", start_date=day, end_date=day)
+
+    call_command("archive_slots", stdout=io.StringIO())
+    assert RoomDayHistory.objects.get(room=kennel, date=day).capacity == 1
+
+
+@pytest.mark.django_db
+def test_convert_to_slots_skips_archived_days(past, settings):
+    yard, today = past
+    call_command("archive_slots", stdout=io.StringIO())
+    live = RoomDaySlot.objects.count()
+    # archiwalne dni miały 2 psy; dziś wybieg ma już tylko 1 miejsce
+    Room.objects.filter(pk=yard.pk).update(capacity=1)
+
+    settings.HOTEL_CAPACITY_BACKEND = "range"
+    call_command("convert_capacity", to="range", stdout=io.StringIO())
+    settings.HOTEL_CAPACITY_BACKEND = "slots"
+    call_command("convert_capacity", to="slots", stdout=io.StringIO())
+
+    assert RoomDaySlot.objects.count() == live
+    assert not RoomDaySlot.objects.filter(date__lte=RoomDayHistory.objects.latest("date").date).exists()
+    call_command("rebuild_occupancy", verify=True, stdout=io.StringIO())
@@ -0,0 +1,152 @@
+import datetime as dt
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel.models import PriceOverride, Reservation, Room
+from hotel.search import best_available, earliest_window, first_fit
+
+User = get_user_model()
+
+
+@pytest.fixture
+def rooms():
+    return {
+        "kennel": Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130),
+        "cheap_yard": Room.objects.create(name="Wybieg A", room_type="yard", capacity=2, price_per_day=60),
+        "yard": Room.objects.create(name="Wybieg B", room_type="yard", capacity=4, price_per_day=80),
+        "indoor": Room.objects.create(name="Pokój", room_type="indoor", capacity=3, price_per_day=180),
+    }
+
+
+def book(room, start, end, n=1):
+    user = User.objects.create(username=f"u{Reservation.objects.count()}-{room.pk}")
+    for i in range(n):
+        Reservation.objects.create(user=user, room=room, dog_name=f"Pies {i}", start_date=start, end_date=end)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_only_rooms_free_every_night_ranked_by_price(rooms, settings, backend, django_assert_max_num_queries):
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    start = timezone.localdate() + dt.timedelta(days=10)
+    end = start + dt.timedelta(days=4)
+    book(rooms["kennel"], end, end)
+    book(rooms["cheap_yard"], start + dt.timedelta(days=1), start + dt.timedelta(days=1))
+    best_available(start, end)  # rozgrzewa katalog i kalendarz cen
+
+    with django_assert_max_num_queries(1):
+        matches = best_available(start, end)
+    assert [(m.room.name, m.free) for m in matches] == [("Wybieg A", 1), ("Wybieg B", 4), ("Pokój", 3)]
+    assert matches[0].quote.total == 5 * 60
+
+    assert [m.room.name for m in best_available(start, end, dogs=2)] == ["Wybieg B", "Pokój"]
+    assert [m.room.name for m in best_available(start, end, room_type="yard", dogs=4)] == ["Wybieg B"]
+    assert best_available(start, end, room_type="kennel") == []
+
+
+@pytest.mark.django_db
+def test_search_api_ranks_by_seasonal_price_and_follows_bookings(client, rooms, django_capture_on_commit_callbacks):
+    start = timezone.localdate() + dt.timedelta(days=3)
+    end = start + dt.timedelta(days=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        PriceOverride.objects.create(room=rooms["cheap_yard"], start_date=start, end_date=end, price_per_day=200)
+    params = {"start": start.isoformat(), "end": end.isoformat(), "room_type": "yard", "dogs": 2}
+
+    resp = client.get(reverse("room_search_api"), params)
+    assert resp.status_code == 200
+    assert [(r["room_name"], r["price"], r["total"]) for r in resp.json()["rooms"]] == [
+        ("Wybieg B", "160.00", "320.00"),
+        ("Wybieg A", "400.00", "800.00"),
+    ]
+    etag = resp["ETag"]
+    assert client.get(reverse("room_search_api"), params, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book(rooms["yard"], start, start, n=3)
+    resp = client.get(reverse("room_search_api"), params, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert [r["room_name"] for r in resp.json()["rooms"]] == ["Wybieg A"]
+
+    assert client.get(reverse("room_search_api"), {**params, "dogs": "0"}).status_code == 400
+    assert client.get(reverse("room_search_api"), {**params, "end": "2000-01-01"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_form_rejects_full_room_before_allocation(client, rooms):
+    start = timezone.localdate() + dt.timedelta(days=2)
+    book(rooms["kennel"], start, start)
+    client.force_login(User.objects.create(username="klient"))
+
+    resp = client.post(reverse("create_reservation"), {
+        "dog_name": "Burek",
+        "room": rooms["kennel"].pk,
+        "start_date": start.isoformat(),
+        "end_date": (start + dt.timedelta(days=1)).isoformat(),
+    })
+    assert resp.status_code == 200
+    assert "To miejsce jest zajęte" in resp.content.decode()
+    assert Reservation.objects.filter(dog_name="Burek").count() == 0
+
+
+def test_first_fit_scans_runs():
+    assert first_fit([1, 1, 0, 1, 1, 1], 3, 1) == 3
+    assert first_fit([2, 1, 2, 2], 2, 2) == 2
+    assert first_fit([1, 0, 1], 2, 1) is None
+    assert first_fit([3], 1, 1) == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_earliest_window_skips_full_days(rooms, settings, backend, django_assert_max_num_queries):
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    today = timezone.localdate()
+    kennel = rooms["kennel"]
+    book(kennel, today + dt.timedelta(days=2), today + dt.timedelta(days=2))
+    book(kennel, today + dt.timedelta(days=5), today + dt.timedelta(days=6))
+    earliest_window(today, 30, 1, room_id=kennel.pk)
+
+    with django_assert_max_num_queries(1):
+        window = earliest_window(today, 30, 3, room_id=kennel.pk)
+    assert (window.start, window.end) == (today + dt.timedelta(days=7), today + dt.timedelta(days=9))
+    assert window.quote.total == 3 * 130
+
+    assert earliest_window(today, 7, 3, room_id=kennel.pk) is None
+    assert earliest_window(today, 8, 3, room_id=kennel.pk).start == today + dt.timedelta(days=7)
+
+    # dwa wolne miejsca mają tylko większe wybiegi; przy tym samym dniu wygrywa tańszy
+    book(rooms["cheap_yard"], today, today)
+    window = earliest_window(today, 30, 2, room_type="yard", places=2)
+    assert (window.room.name, window.start) == ("Wybieg B", today)
+    window = earliest_window(today + dt.timedelta(days=1), 30, 2, room_type="yard", places=2)
+    assert (window.room.name, window.start) == ("Wybieg A", today + dt.timedelta(days=1))
+
+
+@pytest.mark.django_db
+def test_earliest_window_api_and_form_suggestion(client, rooms):
+    today = timezone.localdate()
+    kennel = rooms["kennel"]
+    book(kennel, today + dt.timedelta(days=1), today + dt.timedelta(days=3))
+
+    resp = client.get(reverse("earliest_window_api"), {"room": kennel.pk, "nights": 2, "start": today.isoformat()})
+    assert resp.status_code == 200
+    window = resp.json()["window"]
+    assert (window["start"], window["end"], window["price"]) == (
+        (today + dt.timedelta(days=4)).isoformat(), (today + dt.timedelta(days=5)).isoformat(), "260.00",
+    )
+    resp = client.get(reverse("earliest_window_api"), {"room": kennel.pk, "nights": 2, "places": 2})
+    assert resp.json() == {"window": None}
+    assert client.get(reverse("earliest_window_api"), {"room": kennel.pk}).status_code == 400
+    assert client.get(reverse("earliest_window_api"), {"room": 999999, "nights": 1}).status_code == 404
+
+    client.force_login(User.objects.create(username="klient"))
+    resp = client.post(reverse("create_reservation"), {
+        "dog_name": "Burek",
+        "room": kennel.pk,
+        "start_date": (today + dt.timedelta(days=2)).isoformat(),
+        "end_date": (today + dt.timedelta(days=3)).isoformat(),
+    })
+    start, end = today + dt.timedelta(days=4), today + dt.timedelta(days=5)
+    assert f"Najbliższy wolny termin tej długości: {start} – {end}." in resp.content.decode()
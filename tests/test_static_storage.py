@@ -0,0 +1,43 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.templatetags.static import static
+
+from hotel import storage
+
+
+@pytest.fixture
+def hashed_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "hotel.storage.PrecompressedManifestStaticFilesStorage"},
+    }
+    return tmp_path
+
+
+def collect():
+    out = io.StringIO()
+    call_command("collectstatic", interactive=False, stdout=out)
+    return out.getvalue()
+
+
+def test_collectstatic_writes_hashed_precompressed_files(hashed_static):
+    collect()
+    manifest = json.loads((hashed_static / "staticfiles.json").read_text())["paths"]
+
+    css = hashed_static / manifest["admin/css/base.css"]
+    assert gzip.decompress(css.with_name(css.name + ".gz").read_bytes()) == css.read_bytes()
+    assert css.with_name(css.name + ".br").exists() == (storage.brotli is not None)
+    logo = hashed_static / manifest["images/logo.png"]
+    assert logo.exists() and not logo.with_name(logo.name + ".gz").exists()
+    assert static("css/mobile.css") == f"/static/{manifest['css/mobile.css']}"
+
+    # drugi przebieg: nic nie kopiuje i nie kompresuje ponownie
+    compressed = css.with_name(css.name + ".gz")
+    before = compressed.stat().st_mtime_ns
+    assert "0 static files copied" in collect()
+    assert compressed.stat().st_mtime_ns == before
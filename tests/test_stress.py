@@ -0,0 +1,17 @@
+import pytest
+from django.db import connection
+
+from hotel import stress
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_bookings_never_exceed_capacity():
+    if connection.vendor != "postgresql":
+        pytest.skip("wymaga PostgreSQL – procesy muszą widzieć zatwierdzone dane i blokady wierszy")
+
+    report = stress.run(workers=6, bookings=20, capacity=2, days=7, max_nights=4)
+
+    assert report["overbooked"] == []
+    assert report["counter_drift"] == 0
+    assert report["ok"] > 0
+    assert report["errors"] == report["deadlocks"] == 0
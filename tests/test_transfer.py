@@ -0,0 +1,182 @@
+import datetime as dt
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel.capacity import overbooked
+from hotel.catalog import get_catalog
+from hotel import transfer
+from hotel.models import Reservation, Room, RoomDayOccupancy, RoomDaySlot
+
+User = get_user_model()
+
+
+@pytest.fixture
+def data():
+    start = timezone.localdate() + dt.timedelta(days=1)
+    yard = Room.objects.create(name="Wybieg", room_type="yard", capacity=2, price_per_day=80)
+    kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=130)
+    alice = User.objects.create(username="ala", email="ala@example.com")
+    bob = User.objects.create(username="bob", email="bob@example.com")
+    for i in range(3):
+        Reservation.objects.create(user=alice, room=yard, dog_name=f"Pies {i}",
+                                   start_date=start + dt.timedelta(days=2 * i), end_date=start + dt.timedelta(days=2 * i + 2))
+    Reservation.objects.create(user=bob, room=kennel, dog_name="Azor, \"mały\"", notes="linia 1\nlinia 2",
+                               start_date=start, end_date=start + dt.timedelta(days=4))
+    return yard, kennel, start
+
+
+def write(tmp_path, name, lines):
+    path = tmp_path / name
+    path.write_text("".join(lines), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.django_db
+def test_staff_export_streams_csv_and_ndjson(client, data):
+    url = reverse("staff_export", args=["reservations"])
+    client.force_login(User.objects.create(username="gosc"))
+    assert client.get(url).status_code == 302
+
+    client.force_login(User.objects.create(username="staff", is_staff=True))
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.streaming
+    body = b"".join(resp.streaming_content).decode()
+    assert body.splitlines()[0] == "id,user_email,user,room_id,room_name,dog_name,start_date,end_date,notes,total_price,created_at"
+    assert '"Azor, ""mały"""' in body
+
+    resp = client.get(reverse("staff_export", args=["slots"]), {"format": "ndjson", "start": data[2].isoformat(),
+                                                                "end": data[2].isoformat()})
+    rows = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+    assert len(rows) == 2 and {r["date"] for r in rows} == {data[2].isoformat()}
+
+    assert client.get(reverse("staff_export", args=["users"])).status_code == 404
+    assert client.get(url, {"start": "wczoraj"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_staff_export_streams_async_under_asgi(async_client, data, monkeypatch):
+    monkeypatch.setattr(transfer, "ASYNC_BATCH_LINES", 2)
+    async_client.force_login(User.objects.create(username="staff", is_staff=True))
+
+    async def fetch():
+        resp = await async_client.get(reverse("staff_export", args=["reservations"]))
+        return resp, [chunk async for chunk in resp.streaming_content]
+
+    resp, chunks = async_to_sync(fetch)()
+    assert resp.status_code == 200
+    # asynchroniczny iterator – ASGI nie zbiera całego eksportu do listy przed wysłaniem
+    assert resp.is_async
+    assert len(chunks) == 3  # nagłówek + 4 rezerwacje po 2 linie na paczkę
+    assert b"".join(chunks).decode().splitlines()[0].startswith("id,user_email,user,room_id")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_export_import_round_trip(tmp_path, data, settings, fmt, backend):
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    yard, kennel, start = data
+    path = str(tmp_path / f"rezerwacje.{fmt}")
+    call_command("export_reservations", "reservations", format=fmt, output=path, stdout=io.StringIO())
+    before = sorted(Reservation.objects.values_list("user__username", "room_id", "dog_name", "notes",
+                                                    "start_date", "end_date", "total_price"))
+    Reservation.objects.all().delete()
+    RoomDayOccupancy.objects.all().delete()
+
+    out = io.StringIO()
+    call_command("import_reservations", path, stdout=out)
+    assert "rezerwacji 4" in out.getvalue()
+    after = sorted(Reservation.objects.values_list("user__username", "room_id", "dog_name", "notes",
+                                                   "start_date", "end_date", "total_price"))
+    assert after == before
+    for room in (yard, kennel):
+        assert overbooked(room, start, start + dt.timedelta(days=10)) == []
+    if backend == "slots":
+        assert RoomDaySlot.objects.count() == 3 * 3 + 5
+        assert RoomDayOccupancy.objects.get(room=yard, date=start + dt.timedelta(days=2)).taken == 2
+
+
+@pytest.mark.django_db
+def test_import_validates_whole_file_before_writing(tmp_path, data):
+    yard, kennel, start = data
+    day = start.isoformat()
+    header = "user,room_id,dog_name,start_date,end_date\n"
+    bad_rows = write(tmp_path, "zle.csv", [
+        header,
+        f"ala,{yard.pk},Reks,{day},{day}\n",
+        f"nikt,{yard.pk},Reks,{day},{day}\n",
+        f"ala,999999,Reks,{day},{day}\n",
+        f"ala,{yard.pk},Reks,{day},wczoraj\n",
+    ])
+    err = io.StringIO()
+    with pytest.raises(CommandError, match="3 błędów"):
+        call_command("import_reservations", bad_rows, stderr=err)
+    assert "wiersz 2: nie ma użytkownika 'nikt'" in err.getvalue()
+
+    # Wybieg ma 2 miejsca: dzień start+2 jest już pełny, a plik dokłada jeszcze jeden pobyt
+    full = write(tmp_path, "pelne.ndjson", [
+        json.dumps({"user": "bob@example.com", "room_id": yard.pk, "dog_name": "Reks",
+                    "start_date": day, "end_date": (start + dt.timedelta(days=1)).isoformat()}) + "\n",
+        json.dumps({"user": "bob", "room_id": yard.pk, "dog_name": "Burek",
+                    "start_date": (start + dt.timedelta(days=2)).isoformat(),
+                    "end_date": (start + dt.timedelta(days=2)).isoformat()}) + "\n",
+    ])
+    err = io.StringIO()
+    with pytest.raises(CommandError, match="nic nie zapisano"):
+        call_command("import_reservations", full, stderr=err)
+    assert "zajęte 2 + z pliku 1 > pojemność 2" in err.getvalue()
+    assert Reservation.objects.count() == 4
+
+    ok = write(tmp_path, "ok.csv", [header, f"bob,{kennel.pk},Reks,{(start + dt.timedelta(days=5)).isoformat()},"
+                                            f"{(start + dt.timedelta(days=6)).isoformat()}\n"])
+    out = io.StringIO()
+    call_command("import_reservations", ok, dry_run=True, stdout=out)
+    assert "bez zapisu" in out.getvalue()
+    assert Reservation.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_import_query_count_does_not_grow_with_rows(tmp_path, data):
+    yard, kennel, start = data
+    far = start + dt.timedelta(days=100)
+    lines = ["user,room_id,dog_name,start_date,end_date\n"]
+    for i in range(300):
+        room = yard if i % 3 else kennel
+        day = far + dt.timedelta(days=i * (1 if room == yard else 3))
+        lines.append(f"ala,{room.pk},Pies {i},{day},{day}\n")
+    path = write(tmp_path, "duzy.csv", lines)
+
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("import_reservations", path, stdout=io.StringIO())
+    assert Reservation.objects.filter(start_date__gte=far).count() == 300
+    assert len(ctx.captured_queries) < 30
+
+
+@pytest.mark.django_db
+def test_import_reports_room_deleted_after_catalog_load(tmp_path, data):
+    yard, kennel, start = data
+    get_catalog()
+    # usunięcie w tej transakcji: wersja katalogu zmieni się dopiero po commicie
+    kennel_id = kennel.pk
+    Reservation.objects.filter(room=kennel).delete()
+    kennel.delete()
+    day = start.isoformat()
+    path = write(tmp_path, "usuniety.csv", [
+        "user,room_id,dog_name,start_date,end_date\n",
+        f"ala,{yard.pk},Reks,{day},{day}\n",
+        f"ala,{kennel_id},Burek,{day},{day}\n",
+    ])
+    err = io.StringIO()
+    with pytest.raises(CommandError, match="1 błędów"):
+        call_command("import_reservations", path, stderr=err)
+    assert f"wiersz 2: nie ma pokoju {kennel_id}" in err.getvalue()
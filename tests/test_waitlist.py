@@ -0,0 +1,168 @@
+import datetime as dt
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from hotel.capacity import overbooked
+from hotel.models import OutboxMessage, Reservation, Room, RoomDaySlot, WaitlistEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def setup():
+    start = timezone.localdate() + dt.timedelta(days=5)
+    end = start + dt.timedelta(days=2)
+    kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=100)
+    owner = User.objects.create(username="wlasciciel")
+    booked = Reservation.objects.create(user=owner, room=kennel, dog_name="Azor", start_date=start, end_date=end)
+    return kennel, booked, start, end
+
+
+def wait(room=None, room_type="", start=None, end=None, username=None):
+    user = User.objects.create(username=username or f"czeka-{WaitlistEntry.objects.count()}",
+                               email=f"{username or WaitlistEntry.objects.count()}@example.com")
+    return WaitlistEntry.objects.create(
+        user=user, room=room, room_type=room_type, dog_name="Burek", start_date=start, end_date=end,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_cancellation_books_oldest_fitting_entries(setup, settings, backend, django_capture_on_commit_callbacks):
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    kennel, booked, start, end = setup
+    Reservation.objects.create(user=booked.user, room=kennel, dog_name="Reks",
+                               start_date=end + dt.timedelta(days=1), end_date=end + dt.timedelta(days=1))
+    too_long = wait(room=kennel, start=start, end=end + dt.timedelta(days=1))
+    first = wait(room=kennel, start=start, end=start + dt.timedelta(days=1))
+    by_type = wait(room_type="kennel", start=end, end=end)
+    second = wait(room=kennel, start=start, end=start)
+    elsewhere = wait(room=kennel, start=end + dt.timedelta(days=10), end=end + dt.timedelta(days=11))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        booked.delete()
+
+    for entry in (too_long, first, by_type, second, elsewhere):
+        entry.refresh_from_db()
+    assert [e.status for e in (first, by_type)] == [WaitlistEntry.BOOKED] * 2
+    assert [e.status for e in (too_long, second, elsewhere)] == [WaitlistEntry.WAITING] * 3
+
+    reservation = first.reservation
+    assert (reservation.room, reservation.start_date, reservation.end_date) == (kennel, first.start_date, first.end_date)
+    assert reservation.total_price == 200
+    assert overbooked(kennel, start, end) == []
+    if backend == "slots":
+        assert RoomDaySlot.objects.filter(reservation__in=[first.reservation, by_type.reservation]).count() == 3
+
+    mails = OutboxMessage.objects.filter(subject__contains="z listy oczekujących")
+    assert sorted(m.to[0] for m in mails) == sorted([first.user.email, by_type.user.email])
+    assert f"/reservations/{reservation.pk}/confirmation/" in mails.get(to=[first.user.email]).body
+
+
+@pytest.mark.django_db
+def test_join_waitlist_view(client, setup):
+    kennel, _, start, end = setup
+    user = User.objects.create(username="klient")
+    client.force_login(user)
+
+    resp = client.get(reverse("join_waitlist"), {"room": kennel.pk, "start_date": start, "end_date": end})
+    assert resp.status_code == 200
+    assert f'value="{start.isoformat()}"' in resp.content.decode()
+
+    resp = client.post(reverse("join_waitlist"), {"dog_name": "Burek", "room": kennel.pk, "room_type": "kennel",
+                                                  "start_date": start, "end_date": end})
+    assert "albo typ" in resp.content.decode()
+
+    resp = client.post(reverse("join_waitlist"), {"dog_name": "Burek", "room": kennel.pk,
+                                                  "start_date": start, "end_date": end})
+    assert resp.status_code == 302
+    entry = WaitlistEntry.objects.get(user=user)
+    assert (entry.room, entry.status) == (kennel, WaitlistEntry.WAITING)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("backend", ["slots", "range"])
+def test_concurrent_cancellations_book_an_entry_once(settings, backend):
+    if connection.vendor != "postgresql":
+        pytest.skip("wymaga PostgreSQL – równoległe transakcje i blokady wierszy")
+    settings.HOTEL_CAPACITY_BACKEND = backend
+    start = timezone.localdate() + dt.timedelta(days=5)
+    owner = User.objects.create(username="wlasciciel")
+    stays = [
+        Reservation.objects.create(
+            user=owner, room=Room.objects.create(name=f"Kojec {i}", room_type="kennel", capacity=1, price_per_day=100),
+            dog_name="Azor", start_date=start, end_date=start,
+        )
+        for i in range(3)  # + połączenie wątku testu = DB_POOL_MAX_SIZE
+    ]
+    entries = [wait(room_type="kennel", start=start, end=start, username=f"czeka-{i}") for i in range(2)]
+
+    barrier = threading.Barrier(len(stays))
+    errors = []
+
+    def cancel(reservation):
+        try:
+            with transaction.atomic():
+                reservation.delete()
+                barrier.wait(timeout=10)
+        except Exception as e:  # noqa: BLE001 – raportowane w asercji
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=cancel, args=(r,)) for r in stays]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    for entry in entries:
+        entry.refresh_from_db()
+        assert entry.status == WaitlistEntry.BOOKED
+    booked = Reservation.objects.filter(start_date=start)
+    assert booked.count() == 2
+    assert sorted(r.user_id for r in booked) == sorted(e.user_id for e in entries)
+    for reservation in booked:
+        assert overbooked(reservation.room, start, start) == []
+
+
+@pytest.mark.django_db
+def test_past_entries_are_not_booked(settings, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    kennel = Room.objects.create(name="Kojec", room_type="kennel", capacity=1, price_per_day=100)
+    owner = User.objects.create(username="wlasciciel")
+    old = Reservation.objects.create(user=owner, room=kennel, dog_name="Azor",
+                                     start_date=today - dt.timedelta(days=10), end_date=today + dt.timedelta(days=3))
+    stale = wait(room=kennel, start=today - dt.timedelta(days=8), end=today - dt.timedelta(days=6))
+    started = wait(room=kennel, start=today - dt.timedelta(days=1), end=today + dt.timedelta(days=1))
+    upcoming = wait(room=kennel, start=today + dt.timedelta(days=2), end=today + dt.timedelta(days=3))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        old.delete()
+
+    for entry in (stale, started, upcoming):
+        entry.refresh_from_db()
+    assert [e.status for e in (stale, started, upcoming)] == [WaitlistEntry.WAITING] * 2 + [WaitlistEntry.BOOKED]
+    assert not Reservation.objects.filter(start_date__lt=today).exists()
+    assert OutboxMessage.objects.filter(subject__contains="z listy oczekujących").count() == 1
+
+
+@pytest.mark.django_db
+def test_waitlist_link_only_for_a_full_room(client, setup):
+    kennel, _, start, end = setup
+    client.force_login(User.objects.create(username="klient"))
+    data = {"dog_name": "Burek", "start_date": start.isoformat(), "end_date": end.isoformat()}
+    link = reverse("join_waitlist")
+
+    resp = client.post(reverse("create_reservation"), {**data, "room": kennel.pk})
+    assert resp.context["form"].room_full and link in resp.content.decode()
+
+    resp = client.post(reverse("create_reservation"), {**data, "room": 999999})
+    assert resp.context["form"].errors["room"]
+    assert link not in resp.content.decode()
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.cache import cache
+
+from hotel import weather
+
+PAYLOAD = {"current": {"temp_c": 21.5, "condition": {"text": "Słonecznie", "icon": "//cdn/sun.png"}}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        time.sleep(self.delay)
+        body = json.dumps(PAYLOAD).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(settings):
+    StubHandler.delay = 0
+    StubHandler.calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.WEATHER_API_URL = f"http://127.0.0.1:{server.server_port}/v1/current.json"
+    settings.WEATHER_TIMEOUT = 2
+    settings.WEATHER_TTL = 60
+    cache.clear()
+    yield StubHandler
+    server.shutdown()
+    cache.clear()
+
+
+def wait_for_cache(location="Warszawa", timeout=3):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        entry = cache.get(weather.CACHE_KEY.format(location))
+        if entry:
+            return entry
+        time.sleep(0.02)
+    return None
+
+
+def test_empty_cache_returns_immediately_and_refreshes_in_background(stub):
+    stub.delay = 0.5
+
+    t0 = time.monotonic()
+    assert weather.get_weather() is None
+    assert time.monotonic() - t0 < 0.2
+
+    assert wait_for_cache()["data"] == PAYLOAD
+    assert weather.get_weather() == PAYLOAD
+    assert stub.calls == 1
+
+
+def test_stale_entry_is_served_while_revalidating(stub):
+    old = {"current": {"temp_c": 3}}
+    cache.set(weather.CACHE_KEY.format("Warszawa"), {"data": old, "fetched_at": time.time() - 3600}, None)
+
+    assert weather.get_weather() == old
+
+    deadline = time.monotonic() + 3
+    while weather.get_weather() == old and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert weather.get_weather() == PAYLOAD
+    assert stub.calls == 1
+
+
+def test_upstream_failure_keeps_page_without_weather(settings):
+    cache.clear()
+    settings.WEATHER_API_URL = "http://127.0.0.1:9/unreachable"
+    settings.WEATHER_TIMEOUT = 1
+    settings.WEATHER_BACKGROUND_REFRESH = False
+
+    assert weather.refresh() is None
+    assert weather.get_weather() is None
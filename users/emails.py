@@ -4,6 +4,7 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
+from hotel.outbox import enqueue
 from .tokens import activation_token
 
 def _absolute_url(path: str, request=None) -> str:
@@ -35,4 +36,6 @@ def send_activation_email(user, request=None) -> bool:
 
     msg.bcc = ["rezerwacje@psihotel.ovh"]
     msg.extra_headers = {"Reply-To": "rezerwacje@psihotel.ovh"}
-    return msg.send() == 1
+    # wysyłkę przejmuje manage.py deliver_outbox
+    enqueue(msg)
+    return True